@@ -0,0 +1,571 @@
+"""
+Suíte de benchmarks reprodutível.
+Autopeças & Assistência 24h - Acompanhamento de desempenho
+
+Uso:
+    python benchmark.py executar --saida base.json
+    python benchmark.py executar --saida novo.json --filtro previsao --rapido
+    python benchmark.py comparar base.json novo.json --limiar 0.10
+    python benchmark.py importacao
+
+`executar` mede cada caso (geração de dados, treino, previsão unitária e em lote,
+cada função de statistical_analysis e os principais gráficos) e grava mediana,
+mínimo, média, p95 e desvio em JSON junto com os metadados da máquina.
+`comparar` aponta os casos cuja mediana piorou além do limiar e sai com código 1
+quando há regressões. `importacao` mede a importação a frio dos módulos e do
+trabalhador de pontuação e falha se passar do orçamento ou carregar plotly/scipy (o
+mesmo orçamento é conferido pela suíte de testes, em tests/test_importacao.py).
+As equivalências numéricas entre implementações otimizadas e de referência ficam na
+suíte de testes (python -m pytest tests).
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from functools import cached_property
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from data_generator import gerar_dados_assistencia, gerar_dados_frota
+from model import (
+    treinar_modelo, treinar_frota, fazer_previsao, fazer_previsao_lote, compilar_modelo, prever_compilado
+)
+import statistical_analysis as sa
+import visualizations as vis
+from exportar_relatorios import montar_pagina
+from bootstrap import bootstrap_kpis, bootstrap_coeficientes, bootstrap_frota
+from hierarchical import treinar_modelo_hierarquico
+from control_charts import monitorar_frota
+import changepoint as cp
+from quantile_sketch import esboco_em_blocos, esbocos_por_grupo, mesclar_esbocos
+from streaming_moments import MomentosFluxo, momentos_em_blocos
+from feature_selection import selecionar_features
+from config import (
+    NUM_MESES_HISTORICO, FEATURES_MODELO, VARIAVEIS_CORRELACAO, KPIS_BOOTSTRAP, KPIS_CONTROLE
+)
+
+# Repetição adaptativa: pelo menos REPETICOES_MINIMAS e até completar TEMPO_MINIMO_SEGUNDOS
+REPETICOES_MINIMAS = 3
+REPETICOES_MAXIMAS = 200
+TEMPO_MINIMO_SEGUNDOS = 0.5
+
+LIMIAR_REGRESSAO = 0.10
+NUM_EMPRESAS_PADRAO = 100
+PACOTES_METADADOS = ['numpy', 'pandas', 'scikit-learn', 'scipy', 'plotly', 'streamlit']
+
+# Orçamento de importação a frio: alvo -> (módulos importados, limite em ms, módulos proibidos).
+# O trabalhador de pontuação e os módulos de src não podem carregar plotly, scipy nem sklearn.
+ORCAMENTOS_IMPORTACAO = {
+    'trabalhador_pontuacao': ('pontuar_cenarios', 900, ['plotly', 'scipy', 'sklearn', 'streamlit']),
+    'servico_previsao': ('servico_previsao', 1000, ['plotly', 'scipy', 'sklearn', 'streamlit']),
+    'modulos_src': ('data_generator, model, statistical_analysis, visualizations, utils, '
+                    'prediction_cache, batch_scheduler, instrumentation, regularization, bootstrap, hierarchical, '
+                    'control_charts, changepoint, quantile_sketch, streaming_moments, feature_selection', 900,
+                    ['plotly', 'scipy', 'sklearn']),
+}
+REPETICOES_IMPORTACAO = 3
+
+# (nome, preparar, pesado): preparar(contexto) devolve a função medida, sem argumentos
+CASOS = []
+
+
+def caso(nome, pesado=False):
+    """Registra um caso de benchmark. Casos pesados ficam de fora com --rapido."""
+    def registrar(preparar):
+        CASOS.append((nome, preparar, pesado))
+        return preparar
+    return registrar
+
+
+class Contexto:
+    """Dados e modelos compartilhados entre os casos, criados sob demanda (fora da medição)."""
+
+    def __init__(self, num_empresas=NUM_EMPRESAS_PADRAO):
+        self.num_empresas = num_empresas
+
+    @cached_property
+    def dados(self):
+        return gerar_dados_assistencia(NUM_MESES_HISTORICO)
+
+    @cached_property
+    def dados_1000(self):
+        return gerar_dados_assistencia(1000)
+
+    @cached_property
+    def frota(self):
+        return gerar_dados_frota(48, self.num_empresas)
+
+    @cached_property
+    def treino(self):
+        return treinar_modelo(self.dados)
+
+    @property
+    def modelo(self):
+        return self.treino[0]
+
+    @property
+    def feature_names(self):
+        return self.treino[1]
+
+    @cached_property
+    def modelo_compilado(self):
+        return compilar_modelo(self.modelo, self.feature_names)
+
+    @cached_property
+    def modelo_compilado_float32(self):
+        return compilar_modelo(self.modelo, self.feature_names, dtype='float32')
+
+    @cached_property
+    def erro_padrao(self):
+        return sa.calcular_erro_padrao_residual(self.modelo_compilado, self.feature_names, self.dados)
+
+    @cached_property
+    def cenario(self):
+        ultimo = self.dados.iloc[-1]
+        cenario = {f: float(ultimo[f]) for f in FEATURES_MODELO if f != 'Faturamento_Mes_Ant'}
+        cenario['Faturamento_Mes_Ant'] = float(ultimo['Faturamento'])
+        cenario['mes_prev'] = 7
+        return cenario
+
+    @cached_property
+    def eventos_1000000(self):
+        return np.random.default_rng(42).lognormal(np.log(50), 0.3, 1_000_000)
+
+    @cached_property
+    def esboco_1000000(self):
+        return esboco_em_blocos(np.array_split(self.eventos_1000000, 10), semente=0)
+
+    @cached_property
+    def cenarios_10000(self):
+        rng = np.random.default_rng(42)
+        cenarios = {chave: valor * rng.uniform(0.9, 1.1, 10_000) for chave, valor in self.cenario.items()
+                    if chave != 'mes_prev'}
+        cenarios['mes_prev'] = rng.integers(1, 13, 10_000)
+        return pd.DataFrame(cenarios)
+
+
+# ----------------------------------------------------------------------
+# Dados e modelo
+# ----------------------------------------------------------------------
+for _meses in (48, 1000, 100_000):
+    caso(f'dados.gerar_dados_assistencia[{_meses}]', pesado=_meses > 1000)(
+        lambda ctx, meses=_meses: lambda: gerar_dados_assistencia(meses)
+    )
+
+caso('dados.gerar_dados_frota[48xN]', pesado=True)(
+    lambda ctx: lambda: gerar_dados_frota(48, ctx.num_empresas)
+)
+
+caso('modelo.treinar_modelo[48]')(lambda ctx: lambda: treinar_modelo(ctx.dados))
+caso('modelo.treinar_modelo[1000]')(lambda ctx: lambda: treinar_modelo(ctx.dados_1000))
+for _penalidade in ('ridge', 'lasso', 'elasticnet'):
+    caso(f'modelo.treinar_modelo_{_penalidade}[48]')(
+        lambda ctx, penalidade=_penalidade: lambda: treinar_modelo(ctx.dados, penalidade=penalidade)
+    )
+caso('modelo.treinar_frota[48xN]', pesado=True)(lambda ctx: lambda: treinar_frota(ctx.frota))
+caso('modelo.treinar_modelo_por_empresa[48xN]', pesado=True)(
+    lambda ctx: lambda: [treinar_modelo(df.drop(columns='Empresa')) for _, df in ctx.frota.groupby('Empresa')]
+)
+caso('modelo.treinar_modelo_hierarquico[48xN]', pesado=True)(lambda ctx: lambda: treinar_modelo_hierarquico(ctx.frota))
+caso('modelo.treinar_modelo_float32[1000]')(lambda ctx: lambda: treinar_modelo(ctx.dados_1000, dtype='float32'))
+for _metodo in ('forward', 'backward', 'exaustiva'):
+    caso(f'modelo.selecionar_features_{_metodo}[48]', pesado=_metodo == 'exaustiva')(
+        lambda ctx, metodo=_metodo: lambda: selecionar_features(ctx.dados, metodo)
+    )
+
+# ----------------------------------------------------------------------
+# Previsão
+# ----------------------------------------------------------------------
+caso('previsao.fazer_previsao')(lambda ctx: lambda: fazer_previsao(ctx.modelo, ctx.feature_names, ctx.cenario))
+caso('previsao.prever_compilado')(lambda ctx: lambda: prever_compilado(ctx.modelo_compilado, ctx.cenario))
+caso('previsao.fazer_previsao_lote[10000]')(
+    lambda ctx: lambda: fazer_previsao_lote(ctx.modelo, ctx.feature_names, ctx.cenarios_10000)
+)
+caso('previsao.fazer_previsao_lote_compilado[10000]')(
+    lambda ctx: lambda: fazer_previsao_lote(ctx.modelo_compilado, ctx.feature_names, ctx.cenarios_10000)
+)
+caso('previsao.fazer_previsao_lote_float32[10000]')(
+    lambda ctx: lambda: fazer_previsao_lote(ctx.modelo_compilado_float32, ctx.feature_names, ctx.cenarios_10000)
+)
+
+# ----------------------------------------------------------------------
+# Bootstrap (10 mil reamostras)
+# ----------------------------------------------------------------------
+caso('bootstrap.intervalo_confianca[48]')(
+    lambda ctx: lambda: sa.calcular_intervalo_confianca(ctx.dados['Sinistralidade_Realizada'].values, metodo='bootstrap')
+)
+caso('bootstrap.bootstrap_kpis[48]')(lambda ctx: lambda: bootstrap_kpis(ctx.dados[KPIS_BOOTSTRAP], tamanho_bloco=4))
+caso('bootstrap.bootstrap_coeficientes[48]')(
+    lambda ctx: lambda: bootstrap_coeficientes(ctx.treino[3][ctx.feature_names], ctx.treino[5], ctx.treino[3]['Mes'])
+)
+caso('bootstrap.bootstrap_frota[48xN]', pesado=True)(lambda ctx: lambda: bootstrap_frota(ctx.frota))
+
+
+# ----------------------------------------------------------------------
+# Cartas de controle
+# ----------------------------------------------------------------------
+def _preparar_fechamento_mensal(ctx):
+    """Monitor com todos os meses da frota menos o último, que é o fechamento medido."""
+    ultimo_mes = ctx.frota['Data'] == ctx.frota['Data'].max()
+    _, monitor = monitorar_frota(ctx.frota[~ultimo_mes])
+    fechamento = ctx.frota[ultimo_mes]
+    empresas, valores = fechamento['Empresa'].to_numpy(), fechamento[monitor.kpis].to_numpy()
+    return lambda: monitor.atualizar(empresas, valores)
+
+
+caso('cartas_controle.monitorar[48]')(lambda ctx: lambda: monitorar_frota(ctx.dados))
+caso('cartas_controle.fechamento_mensal[N]', pesado=True)(_preparar_fechamento_mensal)
+caso('cartas_controle.monitorar_frota[48xN]', pesado=True)(lambda ctx: lambda: monitorar_frota(ctx.frota))
+
+# ----------------------------------------------------------------------
+# Rupturas estruturais
+# ----------------------------------------------------------------------
+caso('rupturas.segmentar_serie[48]')(
+    lambda ctx: lambda: cp.segmentar_serie(ctx.dados['Sinistralidade_Realizada'], ctx.dados['Data'])
+)
+caso('rupturas.detectar_rupturas_pelt[1000]')(
+    lambda ctx: lambda: cp.detectar_rupturas(ctx.dados_1000['Sinistralidade_Realizada'])
+)
+caso('rupturas.detectar_rupturas_binaria[100000]', pesado=True)(
+    lambda ctx: (
+        lambda valores=gerar_dados_assistencia(100_000)['Sinistralidade_Realizada'].to_numpy():
+            cp.detectar_rupturas(valores, metodo='binaria')
+    )
+)
+caso('rupturas.detectar_rupturas_frota[48xN]', pesado=True)(lambda ctx: lambda: cp.detectar_rupturas_frota(ctx.frota))
+
+# ----------------------------------------------------------------------
+# Esboços de quantis (distribuições sem o array inteiro na memória)
+# ----------------------------------------------------------------------
+caso('esboco.esboco_em_blocos[1000000]')(
+    lambda ctx: lambda: esboco_em_blocos(np.array_split(ctx.eventos_1000000, 10), semente=0)
+)
+caso('esboco.mesclar_resumo[1000000]')(lambda ctx: lambda: mesclar_esbocos([ctx.esboco_1000000], semente=0).resumo())
+caso('esboco.mesclar_frota[48xN]', pesado=True)(
+    lambda ctx: lambda: mesclar_esbocos(esbocos_por_grupo(ctx.frota, 'Sinistralidade_Realizada', semente=0))
+)
+caso('analise.analise_distribuicao_esboco[1000000]')(lambda ctx: lambda: sa.analise_distribuicao(ctx.esboco_1000000))
+caso('grafico.criar_boxplot_sinistralidade_esboco[1000000]')(
+    lambda ctx: lambda: vis.criar_boxplot_sinistralidade(ctx.esboco_1000000)
+)
+
+# ----------------------------------------------------------------------
+# Momentos em fluxo (Welford/Chan)
+# ----------------------------------------------------------------------
+def _historico_frota(ctx):
+    """KPIs da frota como (meses, empresas, KPIs), em ordem de data."""
+    frota = ctx.frota.sort_values(['Data', 'Empresa'])
+    return frota[KPIS_CONTROLE].to_numpy().reshape(frota['Data'].nunique(), -1, len(KPIS_CONTROLE))
+
+
+def _preparar_fechamento_momentos(ctx):
+    """Momentos de todos os meses da frota menos o último, que é o fechamento medido."""
+    historico = _historico_frota(ctx)
+    momentos = MomentosFluxo(historico.shape[1:]).adicionar(historico[:-1])
+    return lambda: momentos.atualizar(historico[-1])
+
+
+caso('momentos.momentos_em_blocos[1000000]')(
+    lambda ctx: lambda: momentos_em_blocos(np.array_split(ctx.eventos_1000000, 10))
+)
+caso('momentos.fechamento_mensal[N]', pesado=True)(_preparar_fechamento_momentos)
+caso('momentos.reduzir_frota[N]', pesado=True)(
+    lambda ctx: (
+        lambda momentos=MomentosFluxo((ctx.num_empresas, len(KPIS_CONTROLE))).adicionar(_historico_frota(ctx)):
+            momentos.reduzir()
+    )
+)
+caso('analise.calcular_intervalo_confianca_momentos[1000000]')(
+    lambda ctx: lambda: sa.calcular_intervalo_confianca(ctx.esboco_1000000.momentos)
+)
+caso('analise.calcular_capacidade_processo_momentos[1000000]')(
+    lambda ctx: lambda: sa.calcular_capacidade_processo(ctx.esboco_1000000.momentos, 0, 60)
+)
+
+# ----------------------------------------------------------------------
+# Análises estatísticas (uma por função de statistical_analysis)
+# ----------------------------------------------------------------------
+ANALISES = {
+    'calcular_correlacoes': lambda ctx: (ctx.dados, FEATURES_MODELO),
+    'identificar_correlacoes_fortes': lambda ctx: (ctx.dados, FEATURES_MODELO, 0.4),
+    'analise_tendencia_temporal': lambda ctx: (ctx.dados, 'Faturamento'),
+    'calcular_intervalo_confianca': lambda ctx: (ctx.dados['Sinistralidade_Realizada'].values,),
+    'analise_distribuicao': lambda ctx: (ctx.dados['Sinistralidade_Realizada'].values,),
+    'analise_comparativa_periodos': lambda ctx: (ctx.dados, 'Sinistralidade_Realizada', 6),
+    'analise_pontos_ruptura': lambda ctx: (ctx.dados, 'Sinistralidade_Realizada'),
+    'calcular_capacidade_processo': lambda ctx: (ctx.dados['Sinistralidade_Realizada'].values, 0, 50),
+    'gerar_insights_comerciais': lambda ctx: (ctx.dados, ctx.modelo, ctx.feature_names),
+    'calcular_erro_padrao_residual': lambda ctx: (ctx.modelo_compilado, ctx.feature_names, ctx.dados),
+    'calcular_previsao_com_intervalo': lambda ctx: (ctx.modelo_compilado, ctx.feature_names, ctx.cenario,
+                                                    None, ctx.erro_padrao),
+    'montar_intervalo_previsao': lambda ctx: (52.0, ctx.erro_padrao),
+}
+
+for _nome, _argumentos in ANALISES.items():
+    caso(f'analise.{_nome}')(
+        lambda ctx, nome=_nome, argumentos=_argumentos: (
+            lambda funcao=getattr(sa, nome), args=argumentos(ctx): funcao(*args)
+        )
+    )
+
+caso('analise.analise_pontos_ruptura[1000]')(
+    lambda ctx: lambda: sa.analise_pontos_ruptura(ctx.dados_1000, 'Faturamento')
+)
+
+# ----------------------------------------------------------------------
+# Gráficos
+# ----------------------------------------------------------------------
+GRAFICOS = {
+    'criar_grafico_faturamento': lambda dados, ctx: (dados,),
+    'criar_grafico_sinistralidade': lambda dados, ctx: (dados,),
+    'criar_grafico_comparativo_sinistralidade': lambda dados, ctx: (dados,),
+    'criar_grafico_evolucao_faturamento': lambda dados, ctx: (dados,),
+    'criar_grafico_nps': lambda dados, ctx: (dados,),
+    'criar_grafico_atendimentos': lambda dados, ctx: (dados,),
+    'criar_grafico_ticket_medio': lambda dados, ctx: (dados,),
+    'criar_heatmap_correlacao': lambda dados, ctx: (dados, VARIAVEIS_CORRELACAO),
+    'criar_boxplot_sinistralidade': lambda dados, ctx: (dados,),
+    'criar_boxplot_faturamento': lambda dados, ctx: (dados,),
+    'criar_gauge_sinistralidade': lambda dados, ctx: (52.0,),
+    'criar_grafico_importancia_features': lambda dados, ctx: (ctx.modelo, ctx.feature_names),
+    'criar_grafico_pontos_ruptura': lambda dados, ctx: (
+        sa.analise_pontos_ruptura(dados, 'Sinistralidade_Realizada'), 'Sinistralidade_Realizada'
+    ),
+}
+
+# Gráficos que não dependem do tamanho do histórico são medidos uma vez só
+GRAFICOS_SEM_HISTORICO = {'criar_gauge_sinistralidade', 'criar_grafico_importancia_features'}
+
+for _nome, _argumentos in GRAFICOS.items():
+    for _base in ('dados',) if _nome in GRAFICOS_SEM_HISTORICO else ('dados', 'dados_1000'):
+        _meses = 48 if _base == 'dados' else 1000
+        caso(f'grafico.{_nome}[{_meses}]')(
+            lambda ctx, nome=_nome, argumentos=_argumentos, base=_base: (
+                lambda funcao=getattr(vis, nome), args=argumentos(getattr(ctx, base), ctx): funcao(*args)
+            )
+        )
+
+# Página completa do relatório executivo de uma empresa (treino, gráficos e HTML)
+caso('relatorio.montar_pagina')(lambda ctx: lambda: montar_pagina('Empresa_0001', ctx.dados, 'compartilhado'))
+
+
+# ----------------------------------------------------------------------
+# Execução
+# ----------------------------------------------------------------------
+def medir(funcao):
+    """Aquece uma vez e repete até TEMPO_MINIMO_SEGUNDOS (mínimo de REPETICOES_MINIMAS)."""
+    funcao()
+    duracoes = []
+    inicio = time.perf_counter()
+    while len(duracoes) < REPETICOES_MAXIMAS:
+        t0 = time.perf_counter()
+        funcao()
+        duracoes.append(time.perf_counter() - t0)
+        if len(duracoes) >= REPETICOES_MINIMAS and time.perf_counter() - inicio >= TEMPO_MINIMO_SEGUNDOS:
+            break
+    duracoes = np.asarray(duracoes)
+    return {
+        'repeticoes': int(duracoes.size),
+        'mediana_s': float(np.median(duracoes)),
+        'minimo_s': float(duracoes.min()),
+        'media_s': float(duracoes.mean()),
+        'p95_s': float(np.percentile(duracoes, 95)),
+        'desvio_s': float(duracoes.std(ddof=1)) if duracoes.size > 1 else 0.0
+    }
+
+
+def metadados_maquina():
+    versoes = {}
+    for pacote in PACOTES_METADADOS:
+        try:
+            versoes[pacote] = metadata.version(pacote)
+        except metadata.PackageNotFoundError:
+            versoes[pacote] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'plataforma': platform.platform(),
+        'maquina': platform.machine(),
+        'processador': platform.processor() or None,
+        'cpus': os.cpu_count(),
+        'commit': commit,
+        'pacotes': versoes
+    }
+
+
+def executar(filtro=None, rapido=False, num_empresas=NUM_EMPRESAS_PADRAO, relatar=print):
+    """
+    Roda os casos selecionados.
+
+    Args:
+        filtro (str, optional): Padrão glob ou trecho do nome do caso
+        rapido (bool): Pula os casos pesados
+        num_empresas (int): N da geração de dados por frota
+
+    Returns:
+        dict: {'metadados', 'resultados'}
+    """
+    contexto = Contexto(num_empresas)
+    resultados = {}
+    for nome, preparar, pesado in CASOS:
+        if rapido and pesado:
+            continue
+        if filtro and not (fnmatch.fnmatch(nome, filtro) or filtro in nome):
+            continue
+        resultado = medir(preparar(contexto))
+        resultados[nome] = resultado
+        if relatar:
+            relatar(f"{nome:<60} {resultado['mediana_s'] * 1000:>11.3f} ms  (n={resultado['repeticoes']})")
+
+    metadados = metadados_maquina()
+    metadados['num_empresas'] = num_empresas
+    return {'metadados': metadados, 'resultados': resultados}
+
+
+def medir_importacao(modulos, proibidos, repeticoes=REPETICOES_IMPORTACAO):
+    """
+    Tempo de importação a frio, cada repetição em um interpretador novo.
+
+    Returns:
+        dict: {'ms': menor tempo entre as repetições, 'proibidos_carregados': [...]}
+    """
+    codigo = (
+        "import json, sys, time\n"
+        f"sys.path.insert(0, {str(Path(__file__).parent / 'src')!r})\n"
+        "inicio = time.perf_counter()\n"
+        f"import {modulos}\n"
+        "ms = (time.perf_counter() - inicio) * 1000\n"
+        f"print(json.dumps({{'ms': ms, 'proibidos_carregados': [m for m in {proibidos!r} if m in sys.modules]}}))\n"
+    )
+    medidas = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True,
+                               cwd=Path(__file__).parent)
+        medidas.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return {'ms': min(m['ms'] for m in medidas), 'proibidos_carregados': medidas[0]['proibidos_carregados']}
+
+
+def verificar_importacao(orcamentos=None, fator=1.0):
+    """
+    Confere o tempo de importação a frio de cada alvo contra o orçamento.
+
+    Args:
+        fator (float): Multiplica os limites (máquinas mais lentas)
+
+    Returns:
+        list: Um dict por alvo com 'ms', 'limite_ms', 'proibidos_carregados' e 'ok'
+    """
+    orcamentos = ORCAMENTOS_IMPORTACAO if orcamentos is None else orcamentos
+    linhas = []
+    for alvo, (modulos, limite_ms, proibidos) in orcamentos.items():
+        medida = medir_importacao(modulos, proibidos)
+        limite = limite_ms * fator
+        linhas.append({
+            'alvo': alvo,
+            'ms': medida['ms'],
+            'limite_ms': limite,
+            'proibidos_carregados': medida['proibidos_carregados'],
+            'ok': medida['ms'] <= limite and not medida['proibidos_carregados']
+        })
+    return linhas
+
+
+# ----------------------------------------------------------------------
+# Comparação entre execuções
+# ----------------------------------------------------------------------
+def comparar(base, novo, limiar=LIMIAR_REGRESSAO):
+    """
+    Compara as medianas de duas execuções.
+
+    Returns:
+        list: Um dict por caso comum, com 'razao' (novo/base) e 'situacao'
+            ('regressao', 'melhoria' ou 'estavel')
+    """
+    linhas = []
+    for nome in sorted(set(base['resultados']) & set(novo['resultados'])):
+        antes = base['resultados'][nome]['mediana_s']
+        depois = novo['resultados'][nome]['mediana_s']
+        razao = depois / antes if antes > 0 else float('inf')
+        if razao > 1 + limiar:
+            situacao = 'regressao'
+        elif razao < 1 - limiar:
+            situacao = 'melhoria'
+        else:
+            situacao = 'estavel'
+        linhas.append({'caso': nome, 'base_s': antes, 'novo_s': depois, 'razao': razao, 'situacao': situacao})
+    return linhas
+
+
+def _ler_json(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks do sistema de análise preditiva.')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_exec = sub.add_parser('executar', help='Roda os benchmarks e grava o JSON')
+    p_exec.add_argument('--saida', default='benchmark.json')
+    p_exec.add_argument('--filtro', default=None, help='Glob ou trecho do nome dos casos')
+    p_exec.add_argument('--rapido', action='store_true', help='Pula os casos pesados (100k meses, frota)')
+    p_exec.add_argument('--empresas', type=int, default=NUM_EMPRESAS_PADRAO, help='N da geração por frota')
+
+    p_comp = sub.add_parser('comparar', help='Compara duas execuções e aponta regressões')
+    p_comp.add_argument('base')
+    p_comp.add_argument('novo')
+    p_comp.add_argument('--limiar', type=float, default=LIMIAR_REGRESSAO,
+                        help='Piora relativa da mediana tratada como regressão (padrão: 0.10)')
+
+    p_imp = sub.add_parser('importacao', help='Confere o tempo de importação a frio contra o orçamento')
+    p_imp.add_argument('--fator', type=float, default=1.0, help='Multiplica os limites (padrão: 1.0)')
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'importacao':
+        linhas = verificar_importacao(fator=args.fator)
+        for linha in linhas:
+            proibidos = f" carregou {', '.join(linha['proibidos_carregados'])}" if linha['proibidos_carregados'] else ''
+            print(f"{linha['alvo']:<25} {linha['ms']:>8.0f} ms / {linha['limite_ms']:.0f} ms "
+                  f"{'ok' if linha['ok'] else '!! FALHOU'}{proibidos}")
+        return 0 if all(linha['ok'] for linha in linhas) else 1
+
+    if args.comando == 'executar':
+        resultado = executar(args.filtro, args.rapido, args.empresas)
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        print(f"{len(resultado['resultados'])} casos -> {args.saida}")
+        return 0
+
+    base, novo = _ler_json(args.base), _ler_json(args.novo)
+    linhas = comparar(base, novo, args.limiar)
+    marcas = {'regressao': '!! REGRESSÃO', 'melhoria': 'melhoria', 'estavel': ''}
+    for linha in linhas:
+        print(f"{linha['caso']:<60} {linha['base_s'] * 1000:>11.3f} -> {linha['novo_s'] * 1000:>11.3f} ms "
+              f"x{linha['razao']:.2f} {marcas[linha['situacao']]}")
+    so_em_um = set(base['resultados']) ^ set(novo['resultados'])
+    if so_em_um:
+        print(f"{len(so_em_um)} caso(s) presentes em apenas uma execução foram ignorados")
+    regressoes = [l for l in linhas if l['situacao'] == 'regressao']
+    print(f"{len(regressoes)} regressão(ões) acima de {args.limiar:.0%}")
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
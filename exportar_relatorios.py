@@ -0,0 +1,274 @@
+"""
+Exportação do relatório executivo (HTML estático) por empresa, sem Streamlit.
+Autopeças & Assistência 24h - Fechamento mensal para a diretoria
+
+Uso:
+    python exportar_relatorios.py relatorios/ --empresas 500 --processos 8
+    python exportar_relatorios.py relatorios/ --historico frota.csv --plotlyjs compartilhado
+
+Gera uma página HTML autocontida por empresa com os KPIs, a qualidade do modelo e os
+gráficos do dashboard de storytelling, além de um index.html com links para todas.
+As figuras de cada empresa são montadas em um pool de processos e cada página é
+gravada em disco assim que fica pronta. O plotly.js entra uma única vez por página
+('inline', padrão) ou uma única vez no diretório ('compartilhado', plotly.min.js
+referenciado pelas páginas), nunca uma vez por figura.
+"""
+import argparse
+import html
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from data_generator import gerar_dados_assistencia
+from changepoint import segmentar_serie
+from model import treinar_modelo
+from visualizations import (
+    criar_boxplot_faturamento, criar_boxplot_sinistralidade, criar_gauge_sinistralidade,
+    criar_grafico_atendimentos, criar_grafico_evolucao_faturamento, criar_grafico_importancia_features,
+    criar_grafico_nps, criar_grafico_sinistralidade, criar_heatmap_correlacao
+)
+from config import APP_TITLE, NUM_MESES_HISTORICO, VARIAVEIS_CORRELACAO, META_SINISTRALIDADE
+
+MODOS_PLOTLYJS = ('inline', 'compartilhado')
+ARQUIVO_PLOTLYJS = 'plotly.min.js'
+
+# Gráficos do relatório, na ordem da página: (título, função(dados, modelo, feature_names) -> figura)
+GRAFICOS_RELATORIO = [
+    ('Sinistralidade atual', lambda dados, modelo, features: criar_gauge_sinistralidade(
+        dados['Sinistralidade_Realizada'].iloc[-1])),
+    ('Evolução do faturamento', lambda dados, modelo, features: criar_grafico_evolucao_faturamento(dados)),
+    ('Sinistralidade realizada x orçada', lambda dados, modelo, features: criar_grafico_sinistralidade(
+        dados, rupturas=segmentar_serie(dados['Sinistralidade_Realizada'], dados['Data']))),
+    ('Distribuição da sinistralidade', lambda dados, modelo, features: criar_boxplot_sinistralidade(dados)),
+    ('Distribuição do faturamento', lambda dados, modelo, features: criar_boxplot_faturamento(dados)),
+    ('NPS', lambda dados, modelo, features: criar_grafico_nps(dados)),
+    ('Volume de atendimentos', lambda dados, modelo, features: criar_grafico_atendimentos(dados)),
+    ('Correlações', lambda dados, modelo, features: criar_heatmap_correlacao(dados, VARIAVEIS_CORRELACAO)),
+    ('Importância das variáveis', lambda dados, modelo, features: criar_grafico_importancia_features(
+        modelo, features)),
+]
+
+ESTILO_PAGINA = """
+body { font-family: Arial, sans-serif; color: #2c3e50; margin: 24px auto; max-width: 1200px; }
+h1 { margin-bottom: 0; }
+.subtitulo { color: #7f8c8d; margin-top: 4px; }
+.kpis { display: flex; flex-wrap: wrap; gap: 12px; margin: 24px 0; }
+.kpi { flex: 1 1 160px; background: #f4f6f8; border-radius: 8px; padding: 12px 16px; }
+.kpi .valor { font-size: 1.6em; font-weight: bold; }
+.kpi .rotulo { color: #7f8c8d; font-size: 0.9em; }
+.grafico { break-inside: avoid; margin-bottom: 24px; }
+@media print { .grafico { page-break-inside: avoid; } }
+"""
+
+# Estado de cada processo de trabalho (definido pelo inicializador do pool)
+_OPCOES = {}
+
+
+def _iniciar_processo(diretorio, modo_plotlyjs, num_meses, semente):
+    _OPCOES.update(diretorio=Path(diretorio), modo_plotlyjs=modo_plotlyjs, num_meses=num_meses,
+                   semente=semente, plotlyjs=None)
+
+
+def _script_plotlyjs(modo_plotlyjs):
+    """Tag <script> do plotly.js: o código inteiro ('inline') ou a referência ao arquivo comum."""
+    if modo_plotlyjs == 'compartilhado':
+        return f'<script src="{ARQUIVO_PLOTLYJS}"></script>'
+    if _OPCOES.get('plotlyjs') is None:
+        from plotly.offline import get_plotlyjs
+
+        _OPCOES['plotlyjs'] = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+    return _OPCOES['plotlyjs']
+
+
+def _kpis(dados, metricas):
+    """Cartões de KPI do topo da página: (rótulo, valor formatado)."""
+    ultimo = dados.iloc[-1]
+    sinistralidade = dados['Sinistralidade_Realizada']
+    return [
+        ('Meses analisados', f'{len(dados)}'),
+        ('Atendimentos realizados', f"{dados['Qtd_Atendimentos'].sum():,.0f}"),
+        ('Faturamento acumulado', f"R$ {dados['Faturamento'].sum() / 1_000_000:,.1f}M"),
+        ('Faturamento do último mês', f"R$ {ultimo['Faturamento'] / 1000:,.0f}K"),
+        ('Sinistralidade média', f'{sinistralidade.mean():.1f}%'),
+        ('Meses dentro da meta', f'{(sinistralidade <= META_SINISTRALIDADE).mean():.0%}'),
+        ('NPS atual', f"{ultimo['NPS']:.0f}"),
+        ('Acurácia do modelo (R²)', f"{metricas['r2']:.1%}"),
+    ]
+
+
+def montar_pagina(empresa, dados, modo_plotlyjs='inline'):
+    """
+    Monta a página HTML do relatório de uma empresa.
+
+    Args:
+        empresa (str): Nome da empresa
+        dados (pd.DataFrame): Histórico da empresa (formato de gerar_dados_assistencia)
+        modo_plotlyjs (str): 'inline' ou 'compartilhado'
+
+    Returns:
+        str: Documento HTML completo
+    """
+    modelo, feature_names, metricas, *_ = treinar_modelo(dados)
+
+    cartoes = ''.join(
+        f'<div class="kpi"><div class="valor">{html.escape(valor)}</div>'
+        f'<div class="rotulo">{html.escape(rotulo)}</div></div>'
+        for rotulo, valor in _kpis(dados, metricas)
+    )
+    graficos = []
+    for titulo, criar in GRAFICOS_RELATORIO:
+        fig = criar(dados, modelo, feature_names)
+        div = fig.to_html(full_html=False, include_plotlyjs=False, default_height='480px',
+                          config={'displaylogo': False, 'responsive': True})
+        graficos.append(f'<section class="grafico"><h2>{html.escape(titulo)}</h2>{div}</section>')
+
+    periodo = f"{dados['Data'].min():%m/%Y} a {dados['Data'].max():%m/%Y}"
+    return (
+        '<!DOCTYPE html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>{html.escape(empresa)} - Relatório Executivo</title>\n'
+        f'<style>{ESTILO_PAGINA}</style>\n{_script_plotlyjs(modo_plotlyjs)}\n</head>\n<body>\n'
+        f'<h1>{html.escape(empresa)}</h1>\n'
+        f'<p class="subtitulo">{html.escape(APP_TITLE)} &middot; {periodo}</p>\n'
+        f'<div class="kpis">{cartoes}</div>\n' + '\n'.join(graficos) + '\n</body>\n</html>\n'
+    )
+
+
+def exportar_empresa(empresa, dados=None, indice=0):
+    """
+    Gera e grava a página de uma empresa no diretório do processo.
+    Sem dados, o histórico é gerado no próprio processo (semente + indice).
+
+    Returns:
+        tuple: (empresa, nome do arquivo, bytes gravados)
+    """
+    if dados is None:
+        dados = gerar_dados_assistencia(_OPCOES['num_meses'], semente=_OPCOES['semente'] + indice)
+    pagina = montar_pagina(empresa, dados, _OPCOES['modo_plotlyjs']).encode('utf-8')
+    arquivo = f'{nome_arquivo(empresa)}.html'
+    (_OPCOES['diretorio'] / arquivo).write_bytes(pagina)
+    return empresa, arquivo, len(pagina)
+
+
+def nome_arquivo(empresa):
+    """Nome de arquivo seguro para a empresa (sem extensão)."""
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(empresa))
+
+
+def _tarefas(historico, num_empresas):
+    """Itera (empresa, dados, indice): por empresa do histórico, ou empresas geradas sob demanda."""
+    if historico is None:
+        for i in range(num_empresas):
+            yield f'Empresa_{i + 1:04d}', None, i
+    else:
+        for i, (empresa, dados) in enumerate(historico.groupby('Empresa', sort=False)):
+            yield empresa, dados.drop(columns='Empresa').reset_index(drop=True), i
+
+
+def _gravar_indice(diretorio, paginas):
+    itens = ''.join(
+        f'<li><a href="{html.escape(arquivo)}">{html.escape(empresa)}</a></li>'
+        for empresa, arquivo, _ in sorted(paginas)
+    )
+    (diretorio / 'index.html').write_text(
+        '<!DOCTYPE html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>Relatórios Executivos</title>\n<style>{ESTILO_PAGINA}</style>\n</head>\n<body>\n'
+        f'<h1>Relatórios Executivos</h1>\n<ul>{itens}</ul>\n</body>\n</html>\n',
+        encoding='utf-8'
+    )
+
+
+def exportar_relatorios(diretorio, historico=None, num_empresas=10, num_meses=NUM_MESES_HISTORICO,
+                        semente=42, modo_plotlyjs='inline', processos=None, relatar=None):
+    """
+    Exporta o relatório de cada empresa em paralelo, gravando as páginas conforme ficam prontas.
+    Mantém no máximo 2 empresas por processo em voo.
+
+    Args:
+        diretorio (str | Path): Diretório de saída (criado se não existir)
+        historico (pd.DataFrame, optional): Histórico com a coluna 'Empresa' (gerar_dados_frota);
+            sem ele, num_empresas históricos são gerados nos processos de trabalho
+        modo_plotlyjs (str): 'inline' (plotly.js uma vez por página) ou 'compartilhado'
+            (um plotly.min.js no diretório, referenciado pelas páginas)
+        relatar (callable, optional): relatar(empresas, decorrido) a cada página gravada
+
+    Returns:
+        dict: {'empresas', 'bytes', 'segundos', 'empresas_por_minuto'}
+    """
+    if modo_plotlyjs not in MODOS_PLOTLYJS:
+        raise ValueError(f"modo_plotlyjs deve ser um de {MODOS_PLOTLYJS}, não '{modo_plotlyjs}'")
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    if modo_plotlyjs == 'compartilhado':
+        from plotly.offline import get_plotlyjs
+
+        (diretorio / ARQUIVO_PLOTLYJS).write_text(get_plotlyjs(), encoding='utf-8')
+
+    processos = processos or os.cpu_count() or 1
+    pendentes = deque()
+    paginas = []
+    inicio = time.perf_counter()
+
+    def _concluir_proxima():
+        paginas.append(pendentes.popleft().result())
+        if relatar:
+            relatar(len(paginas), time.perf_counter() - inicio)
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                             initargs=(diretorio, modo_plotlyjs, num_meses, semente)) as pool:
+        for empresa, dados, indice in _tarefas(historico, num_empresas):
+            if len(pendentes) >= 2 * processos:
+                _concluir_proxima()
+            pendentes.append(pool.submit(exportar_empresa, empresa, dados, indice))
+        while pendentes:
+            _concluir_proxima()
+
+    _gravar_indice(diretorio, paginas)
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'empresas': len(paginas),
+        'bytes': sum(tamanho for *_, tamanho in paginas),
+        'segundos': segundos,
+        'empresas_por_minuto': len(paginas) * 60 / segundos if segundos > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exporta o relatório executivo em HTML de cada empresa.')
+    parser.add_argument('saida', help='Diretório de saída das páginas')
+    parser.add_argument('--empresas', type=int, default=10, help='Empresas geradas quando não há --historico')
+    parser.add_argument('--meses', type=int, default=NUM_MESES_HISTORICO, help='Meses gerados por empresa')
+    parser.add_argument('--historico', default=None,
+                        help="CSV ou Parquet com a coluna 'Empresa' (formato de gerar_dados_frota)")
+    parser.add_argument('--plotlyjs', choices=MODOS_PLOTLYJS, default='inline',
+                        help="'inline': plotly.js embutido uma vez por página (autocontida); "
+                             "'compartilhado': um plotly.min.js para todas as páginas")
+    parser.add_argument('--processos', type=int, default=None, help='Processos de trabalho (padrão: núcleos da máquina)')
+    args = parser.parse_args(argv)
+
+    historico = None
+    if args.historico:
+        if Path(args.historico).suffix.lower() == '.parquet':
+            historico = pd.read_parquet(args.historico)
+        else:
+            historico = pd.read_csv(args.historico, parse_dates=['Data'])
+
+    def relatar(empresas, decorrido):
+        print(f'{empresas:,} empresas | {empresas * 60 / decorrido:,.1f} empresas/min', file=sys.stderr)
+
+    resumo = exportar_relatorios(args.saida, historico, num_empresas=args.empresas, num_meses=args.meses,
+                                 modo_plotlyjs=args.plotlyjs, processos=args.processos, relatar=relatar)
+    print(f"Concluído: {resumo['empresas']:,} empresas em {resumo['segundos']:.1f}s "
+          f"({resumo['empresas_por_minuto']:,.1f} empresas/min, {resumo['bytes'] / 1e6:,.1f} MB) -> {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Gerador de carga local para o serviço de previsões.
+Autopeças & Assistência 24h - Teste de carga
+
+Uso:
+    python servico_previsao.py --porta 8080 &
+    python gerador_carga.py --url http://127.0.0.1:8080/previsao --conexoes 64 --requisicoes 20000
+
+Abre N conexões keep-alive simultâneas, envia cenários aleatórios em torno do último
+mês do histórico e relata vazão e latência (p50/p95/p99) vistas pelo cliente.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from data_generator import gerar_dados_assistencia
+from config import NUM_MESES_HISTORICO
+
+
+def gerar_cenarios(quantidade, semente=42):
+    """Cenários perturbados (±10%) a partir do último mês do histórico."""
+    ultimo = gerar_dados_assistencia(NUM_MESES_HISTORICO).iloc[-1]
+    rng = random.Random(semente)
+    campos = ['Qtd_Atendimentos', 'Ticket_Medio', 'Perc_Atend_Com_Pecas', 'Tempo_Medio_Atend_Horas',
+              'Taxa_Reincidencia', 'NPS', 'Taxa_Juros', 'Indice_Acidentes']
+    cenarios = []
+    for _ in range(quantidade):
+        cenario = {campo: float(ultimo[campo]) * rng.uniform(0.9, 1.1) for campo in campos}
+        cenario['Faturamento_Mes_Ant'] = float(ultimo['Faturamento'])
+        cenario['Sinistralidade_Mes_Ant'] = float(ultimo['Sinistralidade_Realizada'])
+        cenario['mes_prev'] = rng.randint(1, 12)
+        cenarios.append(cenario)
+    return cenarios
+
+
+async def _ler_resposta(reader):
+    linha_status = await reader.readline()
+    if not linha_status:
+        raise ConnectionError('conexão encerrada pelo servidor')
+    tamanho = 0
+    while True:
+        cabecalho = await reader.readline()
+        if cabecalho in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = cabecalho.decode('latin-1').partition(':')
+        if nome.strip().lower() == 'content-length':
+            tamanho = int(valor)
+    corpo = await reader.readexactly(tamanho)
+    return int(linha_status.split()[1]), corpo
+
+
+async def _conexao(host, porta, caminho, corpos, latencias, erros):
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        for corpo in corpos:
+            inicio = time.perf_counter()
+            writer.write(
+                f'POST {caminho} HTTP/1.1\r\nHost: {host}\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n'.encode('latin-1') + corpo
+            )
+            await writer.drain()
+            status, _ = await _ler_resposta(reader)
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                erros.append(status)
+    finally:
+        writer.close()
+
+
+async def executar_carga(url, conexoes=64, requisicoes=20000):
+    """
+    Dispara a carga e devolve o resumo.
+
+    Returns:
+        dict: {'requisicoes', 'erros', 'segundos', 'req_por_segundo', 'p50_ms', 'p95_ms', 'p99_ms'}
+    """
+    partes = urlsplit(url)
+    cenarios = gerar_cenarios(min(requisicoes, 1000))
+    corpos = [json.dumps(cenarios[i % len(cenarios)]).encode('utf-8') for i in range(requisicoes)]
+
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _conexao(partes.hostname, partes.port or 80, partes.path or '/', corpos[i::conexoes], latencias, erros)
+        for i in range(conexoes)
+    ))
+    segundos = time.perf_counter() - inicio
+
+    ms = np.asarray(latencias) * 1000
+    return {
+        'requisicoes': len(latencias),
+        'erros': len(erros),
+        'segundos': segundos,
+        'req_por_segundo': len(latencias) / segundos,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gerador de carga para o serviço de previsões.')
+    parser.add_argument('--url', default='http://127.0.0.1:8080/previsao')
+    parser.add_argument('--conexoes', type=int, default=64)
+    parser.add_argument('--requisicoes', type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    resumo = asyncio.run(executar_carga(args.url, args.conexoes, args.requisicoes))
+    print(f"{resumo['requisicoes']:,} requisições ({resumo['erros']} erros) em {resumo['segundos']:.2f}s "
+          f"-> {resumo['req_por_segundo']:,.0f} req/s")
+    print(f"Latência cliente: p50 {resumo['p50_ms']:.2f} ms | p95 {resumo['p95_ms']:.2f} ms | "
+          f"p99 {resumo['p99_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Monitoramento dos KPIs da frota por cartas de controle (Shewhart, EWMA e CUSUM), sem Streamlit.
+Autopeças & Assistência 24h - Rodada a cada fechamento mensal
+
+Uso:
+    python monitorar_kpis.py estado.npz --fechamento fechamento_2026_09.csv --alarmes alarmes.csv
+    python monitorar_kpis.py estado.npz --fechamento historico_frota.csv
+    python monitorar_kpis.py estado.npz --empresas 2000
+
+Lê o estado gravado na execução anterior (ou começa um novo), incorpora os meses do
+arquivo de fechamento (colunas Data, Empresa e os KPIs; um arquivo com vários meses é
+processado mês a mês, como um histórico inicial), grava o estado atualizado e lista as
+empresas e KPIs com alarme no último mês. Meses que o estado já incorporou são ignorados,
+de modo que repetir um fechamento não altera as cartas. Sem --fechamento, usa a frota gerada.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from data_generator import gerar_dados_frota
+from control_charts import MonitorControle, monitorar_frota
+from config import NUM_MESES_HISTORICO, KPIS_CONTROLE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cartas de controle dos KPIs da frota a cada fechamento mensal.')
+    parser.add_argument('estado', help='Arquivo .npz com o estado das cartas (criado se não existir)')
+    parser.add_argument('--fechamento', default=None,
+                        help='CSV ou Parquet com Data, Empresa e os KPIs (padrão: frota gerada)')
+    parser.add_argument('--empresas', type=int, default=10, help='Empresas da frota gerada (padrão: 10)')
+    parser.add_argument('--kpis', nargs='+', default=KPIS_CONTROLE,
+                        help='KPIs de um estado novo (padrão: KPIS_CONTROLE)')
+    parser.add_argument('--alarmes', default=None, help='CSV com as linhas em alarme do último mês')
+    args = parser.parse_args(argv)
+
+    if args.fechamento is None:
+        fechamento = gerar_dados_frota(NUM_MESES_HISTORICO, args.empresas)
+    elif Path(args.fechamento).suffix.lower() == '.parquet':
+        fechamento = pd.read_parquet(args.fechamento)
+    else:
+        fechamento = pd.read_csv(args.fechamento, parse_dates=['Data'])
+
+    estado = Path(args.estado)
+    monitor = MonitorControle.carregar(estado) if estado.exists() else MonitorControle(args.kpis)
+
+    inicio = time.perf_counter()
+    resultado, monitor = monitorar_frota(fechamento, monitor=monitor)
+    segundos = time.perf_counter() - inicio
+    monitor.salvar(estado)
+
+    incorporadas = len(resultado) // len(monitor.kpis)
+    print(f'{incorporadas:,} de {len(fechamento):,} observações incorporadas ({len(monitor.empresas):,} empresas) '
+          f'em {segundos:.2f}s -> {estado}')
+    if incorporadas < len(fechamento):
+        print(f'{len(fechamento) - incorporadas:,} observação(ões) de meses já incorporados ignorada(s)')
+    if resultado.empty:
+        return
+
+    ultimo_mes = resultado.xs(resultado.index.get_level_values('Data').max(), level='Data')
+    alarmes = ultimo_mes[ultimo_mes['Alarme']]
+    if args.alarmes:
+        alarmes.to_csv(args.alarmes)
+
+    print(f'Último mês: {len(alarmes)} alarme(s) em {len(ultimo_mes):,} séries')
+    for kpi, quantidade in alarmes.groupby(level='KPI').size().items():
+        print(f'  {kpi}: {quantidade}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Pontuação em lote de cenários, sem Streamlit.
+Autopeças & Assistência 24h - Execução noturna por empresa e cenário
+
+Uso:
+    python pontuar_cenarios.py cenarios.csv previsoes.csv --processos 8 --tamanho-bloco 100000 --dtype float32
+
+Lê um CSV/Parquet de cenários em blocos (memória constante), pontua cada bloco em um
+pool de processos e grava previsão, margem bruta, ticket real e status da sinistralidade.
+As colunas de entrada seguem as chaves usadas pelo simulador (Faturamento_Mes_Ant,
+Qtd_Atendimentos, Ticket_Medio, ..., mes_prev).
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from data_generator import gerar_dados_assistencia
+from model import treinar_modelo, compilar_modelo, fazer_previsao_lote
+from utils import calcular_metricas_derivadas_lote, determinar_status_sinistralidade_lote
+from config import NUM_MESES_HISTORICO, DTYPE_CALCULO, DTYPES_SUPORTADOS
+
+# Modelo compilado de cada processo de trabalho (definido pelo inicializador do pool)
+_MODELO_COMPILADO = None
+
+
+def _iniciar_processo(modelo_compilado):
+    global _MODELO_COMPILADO
+    _MODELO_COMPILADO = modelo_compilado
+
+
+def pontuar_bloco(cenarios, modelo_compilado=None):
+    """
+    Pontua um bloco de cenários.
+
+    Args:
+        cenarios (pd.DataFrame): Um cenário por linha
+        modelo_compilado (dict, optional): Saída de compilar_modelo; usa o do processo se omitido
+
+    Returns:
+        pd.DataFrame: Cenários com as colunas de resultado
+    """
+    modelo_compilado = modelo_compilado or _MODELO_COMPILADO
+
+    predicao = fazer_previsao_lote(modelo_compilado, modelo_compilado['feature_names'], cenarios)
+    metricas = calcular_metricas_derivadas_lote(
+        predicao, cenarios['Sinistralidade_Mes_Ant'], cenarios['Qtd_Atendimentos']
+    )
+    mensagens, cores = determinar_status_sinistralidade_lote(cenarios['Sinistralidade_Mes_Ant'])
+
+    resultado = cenarios.copy()
+    resultado['Faturamento_Previsto'] = predicao
+    resultado['Margem_Bruta'] = metricas['margem_bruta']
+    resultado['Ticket_Real'] = metricas['ticket_real']
+    resultado['Status_Sinistralidade'] = cores
+    resultado['Status_Descricao'] = mensagens
+    return resultado
+
+
+def _importar_pyarrow():
+    """pyarrow e pyarrow.parquet, importados só quando há arquivo Parquet."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as erro:
+        raise ImportError('arquivos .parquet precisam do pacote pyarrow: pip install pyarrow '
+                          '(ou use .csv)') from erro
+    return pa, pq
+
+
+def ler_blocos(caminho, tamanho_bloco):
+    """Itera sobre o arquivo de cenários em blocos de até tamanho_bloco linhas."""
+    caminho = Path(caminho)
+    if caminho.suffix.lower() == '.parquet':
+        _, pq = _importar_pyarrow()
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco)
+
+
+class _EscritorSaida:
+    """Grava os blocos pontuados incrementalmente em CSV ou Parquet."""
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.parquet = self.caminho.suffix.lower() == '.parquet'
+        self._escritor = None
+        self._primeiro = True
+
+    def gravar(self, bloco):
+        if self.parquet:
+            pa, pq = _importar_pyarrow()
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if self._escritor is None:
+                self._escritor = pq.ParquetWriter(self.caminho, tabela.schema)
+            self._escritor.write_table(tabela)
+        else:
+            bloco.to_csv(self.caminho, mode='w' if self._primeiro else 'a', header=self._primeiro, index=False)
+        self._primeiro = False
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def pontuar_arquivo(entrada, saida, modelo_compilado, tamanho_bloco=100_000, processos=None, relatar=None):
+    """
+    Pontua o arquivo de entrada em blocos, em paralelo, preservando a ordem das linhas.
+    Mantém no máximo 2 blocos por processo em voo, de modo que a memória não cresce
+    com o tamanho do arquivo.
+
+    Returns:
+        dict: {'linhas', 'segundos', 'linhas_por_segundo'}
+    """
+    processos = processos or os.cpu_count() or 1
+    escritor = _EscritorSaida(saida)
+    pendentes = deque()
+    linhas = 0
+    inicio = time.perf_counter()
+
+    def _gravar_proximo():
+        nonlocal linhas
+        bloco = pendentes.popleft().result()
+        escritor.gravar(bloco)
+        linhas += len(bloco)
+        if relatar:
+            decorrido = time.perf_counter() - inicio
+            relatar(linhas, decorrido)
+
+    try:
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                                 initargs=(modelo_compilado,)) as pool:
+            for bloco in ler_blocos(entrada, tamanho_bloco):
+                if len(pendentes) >= 2 * processos:
+                    _gravar_proximo()
+                pendentes.append(pool.submit(pontuar_bloco, bloco))
+            while pendentes:
+                _gravar_proximo()
+    finally:
+        escritor.fechar()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'linhas': linhas,
+        'segundos': segundos,
+        'linhas_por_segundo': linhas / segundos if segundos > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pontuação em lote de cenários de faturamento.')
+    parser.add_argument('entrada', help='CSV ou Parquet com um cenário por linha')
+    parser.add_argument('saida', help='Arquivo de saída (.csv ou .parquet)')
+    parser.add_argument('--tamanho-bloco', type=int, default=100_000, help='Linhas por bloco (padrão: 100000)')
+    parser.add_argument('--processos', type=int, default=None, help='Processos de trabalho (padrão: núcleos da máquina)')
+    parser.add_argument('--historico', default=None, help='CSV de histórico para treinar o modelo (padrão: dados gerados)')
+    parser.add_argument('--dtype', choices=DTYPES_SUPORTADOS, default=DTYPE_CALCULO,
+                        help='Precisão da pontuação (padrão: DTYPE_CALCULO); float32 usa metade da memória')
+    args = parser.parse_args(argv)
+    if any(Path(caminho).suffix.lower() == '.parquet' for caminho in (args.entrada, args.saida)):
+        try:
+            _importar_pyarrow()
+        except ImportError as erro:
+            parser.error(str(erro))
+
+    if args.historico:
+        historico = pd.read_csv(args.historico, parse_dates=['Data'])
+    else:
+        historico = gerar_dados_assistencia(NUM_MESES_HISTORICO)
+    modelo, feature_names, *_ = treinar_modelo(historico)
+    modelo_compilado = compilar_modelo(modelo, feature_names, dtype=args.dtype)
+
+    def relatar(linhas, decorrido):
+        print(f'{linhas:,} linhas | {linhas / decorrido:,.0f} linhas/s', file=sys.stderr)
+
+    resumo = pontuar_arquivo(args.entrada, args.saida, modelo_compilado,
+                             tamanho_bloco=args.tamanho_bloco, processos=args.processos, relatar=relatar)
+    print(f"Concluído: {resumo['linhas']:,} linhas em {resumo['segundos']:.1f}s "
+          f"({resumo['linhas_por_segundo']:,.0f} linhas/s) -> {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Distribuição de uma coluna de um arquivo grande por esboço de quantis, sem Streamlit.
+Autopeças & Assistência 24h - Resumos de volumes que não cabem na memória
+
+Uso:
+    python resumir_distribuicao.py eventos.csv --coluna Valor_Sinistro --salvar parte_01.npz
+    python resumir_distribuicao.py eventos_*.parquet --coluna Valor_Sinistro --tamanho-bloco 1000000
+    python resumir_distribuicao.py --mesclar parte_01.npz parte_02.npz --salvar total.npz
+
+Lê cada CSV/Parquet em blocos (memória constante), incorpora a coluna a um esboço de
+quantis (KLL) e imprime média e desvio (exatos), quartis, limites de outliers (1,5 IQR)
+e o erro de posto garantido dos quartis. Esboços gravados com --salvar, de arquivos,
+meses ou máquinas diferentes, podem ser mesclados depois com --mesclar no resumo de
+qualquer recorte.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from pontuar_cenarios import ler_blocos
+from quantile_sketch import EsbocoQuantis, mesclar_esbocos
+from config import K_ESBOCO_QUANTIS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Quartis e outliers de uma coluna de arquivos grandes, por esboço de quantis.')
+    parser.add_argument('entradas', nargs='*', help='Arquivos CSV ou Parquet')
+    parser.add_argument('--coluna', help='Coluna resumida (obrigatória com arquivos de entrada)')
+    parser.add_argument('--mesclar', nargs='+', default=[], help='Esboços .npz gravados antes, mesclados ao resultado')
+    parser.add_argument('--salvar', default=None, help='Grava o esboço resultante em .npz')
+    parser.add_argument('--tamanho-bloco', type=int, default=1_000_000, help='Linhas lidas por vez (padrão: 1.000.000)')
+    parser.add_argument('-k', type=int, default=K_ESBOCO_QUANTIS, help='Capacidade do esboço (padrão: K_ESBOCO_QUANTIS)')
+    args = parser.parse_args(argv)
+    if not args.entradas and not args.mesclar:
+        parser.error('informe arquivos de entrada ou esboços em --mesclar')
+    if args.entradas and not args.coluna:
+        parser.error('--coluna é obrigatória com arquivos de entrada')
+
+    inicio = time.perf_counter()
+    esboco = mesclar_esbocos([EsbocoQuantis.carregar(caminho) for caminho in args.mesclar],
+                             k=None if args.mesclar else args.k)
+    for entrada in args.entradas:
+        for bloco in ler_blocos(entrada, args.tamanho_bloco):
+            esboco.adicionar(bloco[args.coluna])
+    segundos = time.perf_counter() - inicio
+    if args.salvar:
+        esboco.salvar(args.salvar)
+
+    resumo = esboco.resumo()
+    print(f'{esboco.n:,} observações em {segundos:.2f}s; {esboco.num_itens:,} valores no esboço '
+          f'(erro de posto até {resumo["erro_rank"]:.2%})')
+    media, desvio = esboco.media_desvio()
+    print(f'Média {media:,.2f} | Desvio padrão {desvio:,.2f} | Assimetria {float(esboco.momentos.assimetria()):.2f}')
+    print(f'Mínimo {resumo["minimo"]:,.2f} | Q1 {resumo["q1"]:,.2f} | Mediana {resumo["mediana"]:,.2f} | '
+          f'Q3 {resumo["q3"]:,.2f} | Máximo {resumo["maximo"]:,.2f}')
+    print(f'Outliers fora de [{resumo["limite_inferior"]:,.2f}; {resumo["limite_superior"]:,.2f}]: '
+          f'{resumo["num_outliers"]:,} ({resumo["pct_outliers"]:.2f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Serviço HTTP local de previsões, com o modelo mantido em memória.
+Autopeças & Assistência 24h - Integração com sistemas internos
+
+Uso:
+    python servico_previsao.py --porta 8080
+
+Rotas:
+    POST /previsao            corpo: cenário (dict) ou lista de cenários -> faturamento previsto
+    POST /previsao/intervalo  corpo: cenário (dict) ou lista de cenários -> previsão com IC 95%
+    GET  /metricas            latências p50/p99 por rota, profundidade da fila e preenchimento dos lotes
+    GET  /saude               verificação simples
+
+Requisições concorrentes que chegam dentro da janela de agrupamento são pontuadas
+juntas, em um único produto matriz-vetor sobre o modelo compilado.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+# Adicionar src ao path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from data_generator import gerar_dados_assistencia
+from model import treinar_modelo, compilar_modelo, preparar_entrada_compilada, prever_preparados
+from statistical_analysis import calcular_erro_padrao_residual, montar_intervalo_previsao
+from batch_scheduler import AgendadorLotes
+from config import NUM_MESES_HISTORICO, JANELA_LOTE_MS, TAMANHO_MAXIMO_LOTE, DTYPE_CALCULO, DTYPES_SUPORTADOS
+
+# Amostras de latência mantidas por rota para os percentis
+AMOSTRAS_LATENCIA = 10_000
+
+# Rotas com latência própria; qualquer outro caminho cai em uma única chave
+ROTAS = ('/previsao', '/previsao/intervalo', '/metricas', '/saude')
+ROTA_DESCONHECIDA = '<desconhecido>'
+
+STATUS_HTTP = {200: '200 OK', 400: '400 Bad Request', 404: '404 Not Found', 405: '405 Method Not Allowed',
+               500: '500 Internal Server Error'}
+
+
+class ServicoPrevisao:
+    """Servidor asyncio com modelo compilado em memória e agrupamento de requisições."""
+
+    def __init__(self, modelo_compilado, erro_padrao, janela_ms=JANELA_LOTE_MS,
+                 tamanho_maximo_lote=TAMANHO_MAXIMO_LOTE):
+        self.modelo_compilado = modelo_compilado
+        self.erro_padrao = erro_padrao
+        self.agendador = AgendadorLotes(
+            lambda lote: prever_preparados(modelo_compilado, lote),
+            janela_ms=janela_ms, tamanho_maximo_lote=tamanho_maximo_lote,
+            preparar=lambda inputs: preparar_entrada_compilada(modelo_compilado, inputs)
+        )
+        self._latencias = {}
+
+    async def prever(self, inputs):
+        """Enfileira um cenário e aguarda a previsão bruta do lote em que ele cair."""
+        return float(await self.agendador.submeter(inputs))
+
+    # ------------------------------------------------------------------
+    # Rotas
+    # ------------------------------------------------------------------
+    async def _rotear(self, metodo, caminho, corpo):
+        if caminho == '/saude':
+            return 200, {'status': 'ok'}
+        if caminho == '/metricas':
+            return 200, self.metricas()
+        if caminho not in ('/previsao', '/previsao/intervalo'):
+            return 404, {'erro': f'rota desconhecida: {caminho}'}
+        if metodo != 'POST':
+            return 405, {'erro': 'use POST'}
+
+        try:
+            cenarios = json.loads(corpo or b'{}')
+        except json.JSONDecodeError as erro:
+            return 400, {'erro': f'JSON inválido: {erro}'}
+        unico = isinstance(cenarios, dict)
+        if unico:
+            cenarios = [cenarios]
+        if not isinstance(cenarios, list) or not cenarios:
+            return 400, {'erro': 'o corpo deve ser um cenário (objeto JSON) ou uma lista não vazia de cenários'}
+
+        # Cada cenário é validado (tipos, mes_prev entre 1 e 12) antes de entrar no lote
+        try:
+            predicoes = await asyncio.gather(*(self.prever(c) for c in cenarios))
+        except (TypeError, ValueError) as erro:
+            return 400, {'erro': str(erro)}
+
+        if caminho == '/previsao':
+            resultados = [{'faturamento_previsto': float(np.clip(p, 100000, 2000000))} for p in predicoes]
+        else:
+            resultados = [montar_intervalo_previsao(p, self.erro_padrao) for p in predicoes]
+        return 200, resultados[0] if unico else resultados
+
+    def _registrar_latencia(self, caminho, segundos):
+        if caminho not in ROTAS:
+            caminho = ROTA_DESCONHECIDA  # caminhos arbitrários não podem criar chaves sem limite
+        if caminho not in self._latencias:
+            self._latencias[caminho] = deque(maxlen=AMOSTRAS_LATENCIA)
+        self._latencias[caminho].append(segundos)
+
+    def metricas(self):
+        """Latências por rota (ms) e métricas do agendador de lotes."""
+        rotas = {}
+        for caminho, amostras in self._latencias.items():
+            ms = np.asarray(amostras) * 1000
+            rotas[caminho] = {
+                'amostras': len(ms),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p99_ms': float(np.percentile(ms, 99)),
+                'max_ms': float(ms.max())
+            }
+        return {'rotas': rotas, 'lotes': self.agendador.metricas()}
+
+    # ------------------------------------------------------------------
+    # HTTP/1.1 mínimo (keep-alive, Content-Length)
+    # ------------------------------------------------------------------
+    async def _tratar_conexao(self, reader, writer):
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha.strip():
+                    break
+                inicio = time.perf_counter()
+                metodo, caminho, _ = linha.decode('latin-1').split(' ', 2)
+
+                cabecalhos = {}
+                while True:
+                    cabecalho = await reader.readline()
+                    if cabecalho in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = cabecalho.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                tamanho = int(cabecalhos.get('content-length', 0))
+                corpo = await reader.readexactly(tamanho) if tamanho else b''
+
+                try:
+                    status, resposta = await self._rotear(metodo, caminho, corpo)
+                except Exception as erro:
+                    # Falha inesperada: responder 500 em vez de fechar a conexão sem resposta
+                    status, resposta = 500, {'erro': f'erro interno: {type(erro).__name__}: {erro}'}
+                dados = json.dumps(resposta).encode('utf-8')
+                writer.write(
+                    f'HTTP/1.1 {STATUS_HTTP[status]}\r\n'
+                    f'Content-Type: application/json\r\n'
+                    f'Content-Length: {len(dados)}\r\n\r\n'.encode('latin-1') + dados
+                )
+                await writer.drain()
+                self._registrar_latencia(caminho, time.perf_counter() - inicio)
+
+                if cabecalhos.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host='127.0.0.1', porta=8080, pronto=None):
+        """Inicia o servidor e o laço de lotes; roda até ser cancelado."""
+        self.agendador.iniciar()
+        servidor = await asyncio.start_server(self._tratar_conexao, host, porta)
+        if pronto is not None:
+            pronto.set()
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await self.agendador.parar()
+
+
+def carregar_servico(historico=None, dtype=None, **kwargs):
+    """Treina e compila o modelo uma vez e devolve o serviço pronto para servir."""
+    if historico is None:
+        historico = gerar_dados_assistencia(NUM_MESES_HISTORICO)
+    modelo, feature_names, *_ = treinar_modelo(historico)
+    modelo_compilado = compilar_modelo(modelo, feature_names, dtype=dtype)
+    erro_padrao = calcular_erro_padrao_residual(modelo_compilado, feature_names, historico)
+    return ServicoPrevisao(modelo_compilado, erro_padrao, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serviço HTTP local de previsões.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('--janela-ms', type=float, default=JANELA_LOTE_MS,
+                        help='Janela de agrupamento de requisições (ms)')
+    parser.add_argument('--lote-maximo', type=int, default=TAMANHO_MAXIMO_LOTE)
+    parser.add_argument('--dtype', choices=DTYPES_SUPORTADOS, default=DTYPE_CALCULO,
+                        help='Precisão da pontuação (padrão: DTYPE_CALCULO)')
+    args = parser.parse_args(argv)
+
+    servico = carregar_servico(dtype=args.dtype, janela_ms=args.janela_ms, tamanho_maximo_lote=args.lote_maximo)
+    print(f'Servindo em http://{args.host}:{args.porta}')
+    try:
+        asyncio.run(servico.servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Agendador de micro-lotes para previsões concorrentes.
+
+Junta as previsões que chegam dentro de uma janela curta (ou até completar o lote),
+pontua todas em uma única chamada vetorizada e resolve o futuro de cada chamador.
+Cada item é validado antes de entrar no lote, e um lote que falha é repontuado item a
+item, de modo que uma requisição inválida só derruba o próprio futuro.
+"""
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+from config import JANELA_LOTE_MS, TAMANHO_MAXIMO_LOTE
+
+# Lotes recentes considerados nas métricas de fila e preenchimento
+HISTORICO_METRICAS_LOTES = 10_000
+
+
+class AgendadorLotes:
+    """
+    Agrupa chamadas individuais em lotes.
+
+    Args:
+        funcao_lote (callable): Recebe a lista de itens do lote e devolve uma sequência
+            de resultados na mesma ordem
+        janela_ms (float): Tempo máximo de espera a partir do primeiro item do lote
+        tamanho_maximo_lote (int): O lote é pontuado assim que atingir esse tamanho
+        preparar (callable, optional): Valida e converte cada item ao ser submetido; a
+            exceção vai direto ao chamador e o item não entra no lote
+    """
+
+    def __init__(self, funcao_lote, janela_ms=JANELA_LOTE_MS, tamanho_maximo_lote=TAMANHO_MAXIMO_LOTE,
+                 preparar=None):
+        if tamanho_maximo_lote < 1:
+            raise ValueError('tamanho_maximo_lote deve ser >= 1')
+        self.funcao_lote = funcao_lote
+        self.preparar = preparar
+        self.janela = janela_ms / 1000
+        self.tamanho_maximo_lote = tamanho_maximo_lote
+        self._fila = None
+        self._tarefa = None
+        self._tamanhos = deque(maxlen=HISTORICO_METRICAS_LOTES)
+        self._profundidades = deque(maxlen=HISTORICO_METRICAS_LOTES)
+        self._esperas = deque(maxlen=HISTORICO_METRICAS_LOTES)
+        self._lotes = 0
+        self._itens = 0
+        self._profundidade_maxima = 0
+
+    # ------------------------------------------------------------------
+    # Uso dentro de um laço asyncio
+    # ------------------------------------------------------------------
+    def iniciar(self):
+        """Cria a fila e a tarefa de lotes no laço asyncio em execução."""
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.get_running_loop().create_task(self._laco())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    async def submeter(self, item):
+        """Enfileira um item e aguarda o seu resultado."""
+        if self.preparar is not None:
+            item = self.preparar(item)
+        futuro = asyncio.get_running_loop().create_future()
+        self._fila.put_nowait((item, futuro, time.perf_counter()))
+        self._profundidade_maxima = max(self._profundidade_maxima, self._fila.qsize())
+        return await futuro
+
+    async def _laco(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self._fila.get()]
+            prazo = loop.time() + self.janela
+            while len(lote) < self.tamanho_maximo_lote:
+                # Esvaziar o que já está na fila antes de esperar
+                while not self._fila.empty() and len(lote) < self.tamanho_maximo_lote:
+                    lote.append(self._fila.get_nowait())
+                restante = prazo - loop.time()
+                if len(lote) >= self.tamanho_maximo_lote or restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            self._processar(lote)
+
+    def _processar(self, lote):
+        agora = time.perf_counter()
+        self._profundidades.append(self._fila.qsize())
+        self._tamanhos.append(len(lote))
+        self._esperas.extend(agora - entrada for _, _, entrada in lote)
+        self._lotes += 1
+        self._itens += len(lote)
+
+        try:
+            resultados = self.funcao_lote([item for item, _, _ in lote])
+        except Exception:
+            # Repontuar item a item: só o futuro do item com problema recebe a exceção
+            self._processar_um_a_um(lote)
+            return
+
+        for (_, futuro, _), resultado in zip(lote, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def _processar_um_a_um(self, lote):
+        for item, futuro, _ in lote:
+            if futuro.done():
+                continue
+            try:
+                futuro.set_result(self.funcao_lote([item])[0])
+            except Exception as erro:
+                futuro.set_exception(erro)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+    def metricas(self):
+        """
+        Profundidade da fila e preenchimento dos lotes.
+
+        Returns:
+            dict: Contadores totais, profundidade atual/máxima/média (amostrada a cada lote),
+                tamanho médio do lote, preenchimento médio (tamanho / máximo) e
+                espera na fila p50/p99 (ms)
+        """
+        tamanhos = np.asarray(self._tamanhos, dtype=float)
+        esperas = np.asarray(self._esperas) * 1000
+        return {
+            'lotes': self._lotes,
+            'itens': self._itens,
+            'profundidade_fila': self._fila.qsize() if self._fila is not None else 0,
+            'profundidade_fila_maxima': self._profundidade_maxima,
+            'profundidade_fila_media': float(np.mean(self._profundidades)) if self._profundidades else 0.0,
+            'tamanho_medio_lote': float(tamanhos.mean()) if tamanhos.size else 0.0,
+            'preenchimento_medio_lote': float(tamanhos.mean() / self.tamanho_maximo_lote) if tamanhos.size else 0.0,
+            'lotes_cheios': int((tamanhos >= self.tamanho_maximo_lote).sum()),
+            'espera_fila_p50_ms': float(np.percentile(esperas, 50)) if esperas.size else 0.0,
+            'espera_fila_p99_ms': float(np.percentile(esperas, 99)) if esperas.size else 0.0
+        }
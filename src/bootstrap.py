@@ -0,0 +1,264 @@
+"""
+Intervalos de confiança por bootstrap, vetorizados.
+
+Os índices de todas as reamostras são sorteados de uma vez, como uma única matriz inteira
+(num_reamostras, n): reamostragem simples das linhas ou, para séries temporais, em blocos
+circulares de meses consecutivos (moving block bootstrap), que preservam a dependência
+entre meses vizinhos. As estatísticas dos KPIs saem de reduções sobre a pilha inteira de
+reamostras, e os coeficientes do ModeloInterceptoMensal de todas as reamostras (de
+resíduos, em blocos) saem de um único produto com a pseudo-inversa, sem laço por reamostra.
+
+Os intervalos são os percentis da distribuição bootstrap.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from model import preparar_features, ModeloInterceptoMensal, _medias_por_mes
+from config import NUM_REAMOSTRAS_BOOTSTRAP, LOTE_REAMOSTRAS_BOOTSTRAP, KPIS_BOOTSTRAP
+
+__all__ = [
+    'tamanho_bloco_padrao',
+    'indices_reamostragem',
+    'bootstrap_kpis',
+    'intervalo_bootstrap',
+    'bootstrap_coeficientes',
+    'intervalos_coeficientes',
+    'bootstrap_empresa',
+    'bootstrap_frota'
+]
+
+
+def tamanho_bloco_padrao(n):
+    """Tamanho de bloco usual para o moving block bootstrap: n^(1/3), arredondado."""
+    return max(1, int(round(n ** (1 / 3))))
+
+
+def indices_reamostragem(n, num_reamostras=NUM_REAMOSTRAS_BOOTSTRAP, tamanho_bloco=1, semente=None):
+    """
+    Índices de todas as reamostras em uma única matriz inteira.
+
+    Args:
+        n (int): Número de observações
+        num_reamostras (int): Número de reamostras
+        tamanho_bloco (int): 1 para a reamostragem simples; acima de 1, blocos circulares
+            de tamanho_bloco observações consecutivas
+        semente (int | np.random.SeedSequence | np.random.Generator, optional): Semente
+
+    Returns:
+        np.ndarray: (num_reamostras, n) com índices em [0, n)
+    """
+    rng = np.random.default_rng(semente)
+    dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+    if tamanho_bloco <= 1:
+        return rng.integers(0, n, size=(num_reamostras, n), dtype=dtype)
+    num_blocos = -(-n // tamanho_bloco)
+    inicios = rng.integers(0, n, size=(num_reamostras, num_blocos, 1), dtype=dtype)
+    blocos = (inicios + np.arange(tamanho_bloco, dtype=dtype)) % n
+    return blocos.reshape(num_reamostras, -1)[:, :n]
+
+
+def _percentis(distribuicao, confianca):
+    """Limites inferior e superior do intervalo percentil (ao longo do eixo 0)."""
+    alfa = 1 - confianca
+    return np.quantile(distribuicao, [alfa / 2, 1 - alfa / 2], axis=0)
+
+
+def bootstrap_kpis(valores, confianca=0.95, num_reamostras=NUM_REAMOSTRAS_BOOTSTRAP, quantis=(0.5,),
+                   tamanho_bloco=1, semente=None):
+    """
+    Intervalos bootstrap da média e de quantis de um ou vários KPIs.
+
+    Args:
+        valores (pd.DataFrame | pd.Series | np.ndarray): Um KPI por coluna, observações nas linhas
+        confianca (float): Nível de confiança dos intervalos
+        num_reamostras (int): Número de reamostras
+        quantis (tuple): Quantis avaliados além da média (0.5 é a mediana)
+        tamanho_bloco (int): 1 para a reamostragem simples; acima de 1, blocos de meses
+        semente (int, optional): Semente dos sorteios
+
+    Returns:
+        pd.DataFrame: Linhas (KPI, estatística) e colunas 'Estimativa', 'Erro_Padrao',
+            'Inferior' e 'Superior'
+    """
+    if isinstance(valores, pd.Series):
+        valores = valores.to_frame()
+    nomes = list(valores.columns) if isinstance(valores, pd.DataFrame) else None
+    valores = np.asarray(valores, dtype=np.float64)
+    if valores.ndim == 1:
+        valores = valores[:, None]
+    nomes = nomes or [f'kpi_{j}' for j in range(valores.shape[1])]
+    estatisticas = ['media'] + [f'q{round(q * 100):02d}' for q in quantis]
+
+    indices = indices_reamostragem(len(valores), num_reamostras, tamanho_bloco, semente)
+    # (reamostras, estatística, KPI), por lotes para limitar a pilha (lote, n, KPIs)
+    distribuicao = np.empty((num_reamostras, len(estatisticas), valores.shape[1]))
+    for inicio in range(0, num_reamostras, LOTE_REAMOSTRAS_BOOTSTRAP):
+        lote = slice(inicio, inicio + LOTE_REAMOSTRAS_BOOTSTRAP)
+        amostras = valores[indices[lote]]
+        distribuicao[lote, 0] = amostras.mean(axis=1)
+        if len(quantis):
+            distribuicao[lote, 1:] = np.moveaxis(np.quantile(amostras, quantis, axis=1), 0, 1)
+
+    estimativa = np.vstack([valores.mean(axis=0), np.quantile(valores, quantis, axis=0).reshape(-1, valores.shape[1])])
+    inferior, superior = _percentis(distribuicao, confianca)
+    indice = pd.MultiIndex.from_product([nomes, estatisticas], names=['KPI', 'Estatistica'])
+    return pd.DataFrame({
+        'Estimativa': estimativa.T.ravel(),
+        'Erro_Padrao': distribuicao.std(axis=0, ddof=1).T.ravel(),
+        'Inferior': inferior.T.ravel(),
+        'Superior': superior.T.ravel()
+    }, index=indice)
+
+
+def intervalo_bootstrap(valores, confianca=0.95, num_reamostras=NUM_REAMOSTRAS_BOOTSTRAP, tamanho_bloco=1,
+                        semente=None):
+    """
+    Intervalo bootstrap (percentil) da média, no formato de calcular_intervalo_confianca.
+
+    Returns:
+        tuple: (media, limite_inferior, limite_superior)
+    """
+    linha = bootstrap_kpis(np.asarray(valores), confianca, num_reamostras, (), tamanho_bloco, semente).iloc[0]
+    return float(linha['Estimativa']), float(linha['Inferior']), float(linha['Superior'])
+
+
+def bootstrap_coeficientes(X, y, meses, num_reamostras=NUM_REAMOSTRAS_BOOTSTRAP, tamanho_bloco=None, semente=None):
+    """
+    Distribuição bootstrap dos coeficientes do ModeloInterceptoMensal por reamostragem dos
+    resíduos em blocos de meses consecutivos (as linhas devem estar em ordem temporal).
+
+    Reamostrar as linhas não serve aqui: com um intercepto por mês e poucos anos de
+    histórico, muitas reamostras deixam um mês com uma única linha distinta e o ajuste
+    fica singular. Com o desenho fixo, cada reamostra é y* = ajustado + e*, com e* os
+    resíduos (corrigidos por √(n / (n - graus de liberdade))) sorteados em blocos. Como a
+    pseudo-inversa das features centradas no mês anula qualquer vetor constante dentro do
+    mês, o reajuste de todas as reamostras é um único produto: coef* = coef + e* P⁺ᵀ.
+
+    Args:
+        X (pd.DataFrame | np.ndarray): Features (n, p)
+        y (array-like): Alvo
+        meses (array-like): Mês (1 a 12) de cada linha
+        num_reamostras (int): Número de reamostras
+        tamanho_bloco (int, optional): Meses por bloco (padrão: tamanho_bloco_padrao(n))
+        semente (int, optional): Semente dos sorteios
+
+    Returns:
+        np.ndarray: (num_reamostras, p)
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    grupo = np.asarray(meses, dtype=np.intp) - 1
+    n, p = X.shape
+    media_X, media_y, presentes = _medias_por_mes(X, y, grupo)
+    X_centrado = X - media_X[grupo]
+
+    # Pseudo-inversa pela SVD, com o mesmo corte de posto do lstsq
+    U, s, Vt = np.linalg.svd(X_centrado, full_matrices=False)
+    mantidos = s > s[0] * max(n, p) * np.finfo(np.float64).eps
+    pseudo_inversa = (Vt[mantidos].T / s[mantidos]) @ U[:, mantidos].T
+    coef = pseudo_inversa @ (y - media_y[grupo])
+    residuos = y - media_y[grupo] - X_centrado @ coef
+    graus_liberdade = int(presentes.sum() + mantidos.sum())
+    if n > graus_liberdade:
+        residuos = residuos * np.sqrt(n / (n - graus_liberdade))
+
+    indices = indices_reamostragem(n, num_reamostras, tamanho_bloco or tamanho_bloco_padrao(n), semente)
+    coefs = np.empty((num_reamostras, p))
+    for inicio in range(0, num_reamostras, LOTE_REAMOSTRAS_BOOTSTRAP):
+        lote = slice(inicio, inicio + LOTE_REAMOSTRAS_BOOTSTRAP)
+        coefs[lote] = coef + residuos[indices[lote]] @ pseudo_inversa.T
+    return coefs
+
+
+def intervalos_coeficientes(modelo, X, y, meses=None, confianca=0.95, num_reamostras=NUM_REAMOSTRAS_BOOTSTRAP,
+                            tamanho_bloco=None, semente=None):
+    """
+    Intervalos de confiança bootstrap dos coeficientes de um modelo ajustado.
+
+    Args:
+        modelo (ModeloInterceptoMensal): Modelo ajustado sobre X, y
+        X (pd.DataFrame): Features do ajuste, em ordem temporal; pode trazer a coluna 'Mes'
+        y (array-like): Alvo do ajuste
+        meses (array-like, optional): Mês de cada linha (padrão: coluna 'Mes' de X)
+
+    Returns:
+        pd.DataFrame: Uma linha por feature com 'Coeficiente', 'Erro_Padrao', 'Inferior',
+            'Superior' e 'Significativo' (intervalo não contém zero)
+    """
+    if meses is None:
+        meses = X['Mes']
+    features = list(getattr(modelo, 'feature_names_in_', X.columns))
+    coefs = bootstrap_coeficientes(X[features], y, meses, num_reamostras, tamanho_bloco, semente)
+    inferior, superior = _percentis(coefs, confianca)
+    return pd.DataFrame({
+        'Coeficiente': np.asarray(modelo.coef_, dtype=np.float64),
+        'Erro_Padrao': coefs.std(axis=0, ddof=1),
+        'Inferior': inferior,
+        'Superior': superior,
+        'Significativo': (inferior > 0) | (superior < 0)
+    }, index=pd.Index(features, name='Feature'))
+
+
+def bootstrap_empresa(df, confianca=0.95, num_reamostras=NUM_REAMOSTRAS_BOOTSTRAP, semente=None):
+    """
+    Intervalos bootstrap de uma empresa: KPIs mensais (reamostragem em blocos) e coeficientes
+    do modelo de faturamento, ajustado no mesmo período de treino de treinar_modelo.
+
+    Args:
+        semente (int | np.random.SeedSequence, optional): Semente dos sorteios
+
+    Returns:
+        dict: {'kpis': DataFrame de bootstrap_kpis, 'coeficientes': DataFrame de intervalos_coeficientes}
+    """
+    if not isinstance(semente, np.random.SeedSequence):
+        semente = np.random.SeedSequence(semente)
+    semente_kpis, semente_coef = semente.spawn(2)
+    kpis = bootstrap_kpis(df[KPIS_BOOTSTRAP], confianca, num_reamostras,
+                          tamanho_bloco=tamanho_bloco_padrao(len(df)), semente=semente_kpis)
+
+    df_modelo, feature_names = preparar_features(df)
+    treino = df_modelo.iloc[:len(df_modelo) - int(np.ceil(0.2 * len(df_modelo)))]
+    modelo = ModeloInterceptoMensal(dtype='float64').fit(treino[feature_names], treino['Faturamento'], treino['Mes'])
+    coeficientes = intervalos_coeficientes(modelo, treino, treino['Faturamento'], confianca=confianca,
+                                           num_reamostras=num_reamostras, semente=semente_coef)
+    return {'kpis': kpis, 'coeficientes': coeficientes}
+
+
+def _bootstrap_tarefa(argumentos):
+    empresa, df, confianca, num_reamostras, semente = argumentos
+    return empresa, bootstrap_empresa(df, confianca, num_reamostras, semente)
+
+
+def bootstrap_frota(df_frota, confianca=0.95, num_reamostras=NUM_REAMOSTRAS_BOOTSTRAP, processos=None, semente=42):
+    """
+    bootstrap_empresa para cada empresa de gerar_dados_frota, distribuído em processos.
+    Cada empresa recebe uma semente própria derivada de semente, de modo que o resultado
+    não depende do número de processos.
+
+    Args:
+        df_frota (pd.DataFrame): Históricos com a coluna 'Empresa'
+        processos (int, optional): Processos de trabalho (padrão: núcleos da máquina;
+            1 calcula no próprio processo)
+
+    Returns:
+        dict: {'kpis': DataFrame, 'coeficientes': DataFrame}, com 'Empresa' no primeiro nível do índice
+    """
+    grupos = list(df_frota.groupby('Empresa', sort=False))
+    sementes = np.random.SeedSequence(semente).spawn(len(grupos))
+    tarefas = [(empresa, df.drop(columns='Empresa').reset_index(drop=True), confianca, num_reamostras, sequencia)
+               for (empresa, df), sequencia in zip(grupos, sementes)]
+
+    processos = processos or os.cpu_count() or 1
+    if processos == 1:
+        resultados = list(map(_bootstrap_tarefa, tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resultados = list(pool.map(_bootstrap_tarefa, tarefas, chunksize=max(1, len(tarefas) // (4 * processos))))
+
+    empresas = [empresa for empresa, _ in resultados]
+    return {
+        chave: pd.concat([resultado[chave] for _, resultado in resultados], keys=empresas, names=['Empresa'])
+        for chave in ('kpis', 'coeficientes')
+    }
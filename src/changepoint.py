@@ -0,0 +1,362 @@
+"""
+Detecção de pontos de mudança estrutural (renegociação de contrato, reajuste de preços)
+nas séries de cada empresa, por PELT (Pruned Exact Linear Time) ou segmentação binária.
+
+O custo de um segmento é a soma dos quadrados dos resíduos em torno da sua média
+('media') ou da sua reta ('tendencia', para séries que crescem, como o faturamento),
+dividida pela variância do ruído. Ele sai em O(1) de somas acumuladas de 1, t, t², x, t·x
+e x², de modo que a busca exata pela segmentação de menor custo penalizado custa perto
+de O(n) com a poda do PELT. A variância do ruído é estimada pelas diferenças entre meses
+consecutivos (MAD), pouco sensível aos próprios saltos, e a penalidade por ruptura é a do
+BIC: (parâmetros por segmento + 1) x log(n).
+
+O PELT encontra o ótimo exato, mas sem rupturas quase nada é podado e o custo cresce com
+n²; para séries muito longas a segmentação binária (divide o trecho no melhor corte
+enquanto o ganho superar a penalidade) custa O(n log n), com todos os cortes de um
+trecho avaliados de uma vez.
+
+Na frota as séries de mesmo tamanho são segmentadas juntas: a mesma programação dinâmica
+exata, vetorizada sobre as séries (sem poda, que difere de série para série), e os
+blocos de séries são distribuídos em processos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from instrumentation import instrumentar
+from config import MODELOS_RUPTURA, METODO_RUPTURA, MIN_MESES_SEGMENTO, FATOR_PENALIDADE_RUPTURA
+
+__all__ = [
+    'MODELOS_SEGMENTO',
+    'METODOS_RUPTURA',
+    'CONSTANTE_MAD',
+    'SERIES_POR_TAREFA',
+    'variancia_ruido',
+    'somas_acumuladas',
+    'custo_segmentos',
+    'penalidade_padrao',
+    'detectar_rupturas',
+    'detectar_rupturas_lote',
+    'segmentar_serie',
+    'detectar_rupturas_frota'
+]
+
+# Modelo de cada segmento -> parâmetros estimados por segmento
+MODELOS_SEGMENTO = {'media': 1, 'tendencia': 2}
+
+METODOS_RUPTURA = ('pelt', 'binaria')
+
+# Desvio padrão = MAD / 0,6745 para a distribuição normal
+CONSTANTE_MAD = 0.6745
+
+# Séries de cada tarefa do pool em detectar_rupturas_frota; frotas menores ficam no processo
+SERIES_POR_TAREFA = 2000
+
+
+def variancia_ruido(valores):
+    """
+    Variância do ruído de cada série (último eixo) pela mediana dos desvios absolutos das
+    diferenças entre meses consecutivos; a diferença de dois ruídos independentes tem o dobro
+    da variância. Saltos e tendências afetam poucas diferenças ou só deslocam todas.
+    """
+    diferencas = np.diff(np.asarray(valores, dtype=np.float64), axis=-1)
+    if diferencas.shape[-1] == 0:
+        return np.ones(diferencas.shape[:-1])[()]
+    desvios = np.abs(diferencas - np.median(diferencas, axis=-1, keepdims=True))
+    variancia = (np.median(desvios, axis=-1) / CONSTANTE_MAD) ** 2 / 2
+    reserva = np.maximum(np.var(diferencas, axis=-1) / 2, np.finfo(np.float64).tiny)
+    return np.where(variancia > 0, variancia, reserva)[()]
+
+
+def somas_acumuladas(valores):
+    """
+    Somas acumuladas (com zero na frente) de 1, t, t², x, t·x e x² ao longo do último eixo,
+    com x centrado na média de cada série.
+
+    Returns:
+        np.ndarray: (6, ..., n + 1); a soma sobre o segmento [s, e) é o índice e menos o índice s
+    """
+    x = np.asarray(valores, dtype=np.float64)
+    x = x - x.mean(axis=-1, keepdims=True)
+    t = np.broadcast_to(np.arange(x.shape[-1], dtype=np.float64), x.shape)
+    termos = np.stack([np.ones_like(x), t, t * t, x, t * x, x * x])
+    zeros = np.zeros(termos.shape[:-1] + (1,))
+    return np.concatenate([zeros, np.cumsum(termos, axis=-1)], axis=-1)
+
+
+def _somas_segmentos(somas, inicio, fim):
+    inicio, fim = np.broadcast_arrays(inicio, fim)
+    return somas[..., fim] - somas[..., inicio]
+
+
+def custo_segmentos(somas, inicio, fim, modelo='media'):
+    """
+    Soma dos quadrados dos resíduos de cada segmento [inicio, fim) em torno da sua média ou
+    da sua reta, em O(1) por segmento. inicio e fim são arrays de formas compatíveis,
+    aplicados ao último eixo de somas.
+    """
+    n, st, stt, sx, stx, sxx = _somas_segmentos(somas, inicio, fim)
+    residuo = sxx - sx * sx / n
+    if modelo == 'tendencia':
+        variacao_t = stt - st * st / n
+        covariacao = stx - st * sx / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            residuo = residuo - np.where(variacao_t > 0, covariacao * covariacao / variacao_t, 0.0)
+    elif modelo != 'media':
+        raise ValueError(f"modelo deve ser um de {tuple(MODELOS_SEGMENTO)}, não '{modelo}'")
+    return np.maximum(residuo, 0.0)
+
+
+def penalidade_padrao(n, modelo='media'):
+    """Penalidade BIC por ruptura: FATOR_PENALIDADE_RUPTURA x (parâmetros do segmento + 1) x log(n)."""
+    return FATOR_PENALIDADE_RUPTURA * (MODELOS_SEGMENTO[modelo] + 1) * np.log(n)
+
+
+def _validar(modelo, min_tamanho, metodo=METODO_RUPTURA):
+    if modelo not in MODELOS_SEGMENTO:
+        raise ValueError(f"modelo deve ser um de {tuple(MODELOS_SEGMENTO)}, não '{modelo}'")
+    if metodo not in METODOS_RUPTURA:
+        raise ValueError(f"metodo deve ser um de {METODOS_RUPTURA}, não '{metodo}'")
+    return max(int(min_tamanho), MODELOS_SEGMENTO[modelo] + 1)
+
+
+def _pelt(somas, n, modelo, min_tamanho, penalidade):
+    """Ótimo exato do custo penalizado; devolve o início de cada segmento após o primeiro."""
+    custo_otimo = np.full(n + 1, np.inf)
+    custo_otimo[0] = -penalidade
+    anterior = np.zeros(n + 1, dtype=np.intp)
+    candidatos = np.zeros(1, dtype=np.intp)
+
+    for fim in range(min_tamanho, n + 1):
+        if fim - min_tamanho >= min_tamanho:
+            candidatos = np.append(candidatos, fim - min_tamanho)
+        custos = custo_otimo[candidatos] + custo_segmentos(somas, candidatos, fim, modelo)
+        melhor = np.argmin(custos)
+        custo_otimo[fim] = custos[melhor] + penalidade
+        anterior[fim] = candidatos[melhor]
+        # Poda: um início que já perde por mais que uma penalidade nunca volta a ser o melhor
+        candidatos = candidatos[custos <= custo_otimo[fim]]
+
+    rupturas = []
+    fim = n
+    while fim > 0:
+        fim = anterior[fim]
+        rupturas.append(fim)
+    return rupturas[-2::-1]
+
+
+def _segmentacao_binaria(somas, n, modelo, min_tamanho, penalidade):
+    """Divide cada trecho no corte de maior ganho enquanto o ganho superar a penalidade."""
+    rupturas = []
+    pendentes = [(0, n)]
+    while pendentes:
+        inicio, fim = pendentes.pop()
+        cortes = np.arange(inicio + min_tamanho, fim - min_tamanho + 1)
+        if len(cortes) == 0:
+            continue
+        ganhos = (custo_segmentos(somas, inicio, fim, modelo) - custo_segmentos(somas, inicio, cortes, modelo)
+                  - custo_segmentos(somas, cortes, fim, modelo))
+        melhor = np.argmax(ganhos)
+        if ganhos[melhor] > penalidade:
+            corte = int(cortes[melhor])
+            rupturas.append(corte)
+            pendentes += [(inicio, corte), (corte, fim)]
+    return sorted(rupturas)
+
+
+def detectar_rupturas(valores, modelo='media', min_tamanho=MIN_MESES_SEGMENTO, penalidade=None,
+                      metodo=METODO_RUPTURA):
+    """
+    Segmentação de menor custo penalizado de uma série.
+
+    Args:
+        valores (np.ndarray): Série temporal
+        modelo (str): 'media' (saltos de nível) ou 'tendencia' (mudanças de reta)
+        min_tamanho (int): Meses mínimos de cada segmento
+        penalidade (float, optional): Custo de cada ruptura, na escala da variância do ruído
+            (padrão: penalidade_padrao)
+        metodo (str): 'pelt' (ótimo exato) ou 'binaria' (aproximada, para séries muito longas)
+
+    Returns:
+        np.ndarray: Índice do primeiro mês de cada novo segmento, em ordem
+    """
+    min_tamanho = _validar(modelo, min_tamanho, metodo)
+    valores = np.asarray(valores, dtype=np.float64)
+    n = len(valores)
+    if n < 2 * min_tamanho:
+        return np.zeros(0, dtype=np.intp)
+    penalidade = penalidade_padrao(n, modelo) if penalidade is None else penalidade
+
+    # Somas na escala da variância do ruído: o custo de cada segmento já sai dividido por ela
+    somas = somas_acumuladas(valores / np.sqrt(variancia_ruido(valores)))
+    buscar = _pelt if metodo == 'pelt' else _segmentacao_binaria
+    return np.array(buscar(somas, n, modelo, min_tamanho, penalidade), dtype=np.intp)
+
+
+def detectar_rupturas_lote(valores, modelo='media', min_tamanho=MIN_MESES_SEGMENTO, penalidade=None):
+    """
+    detectar_rupturas (ótimo exato) de várias séries do mesmo tamanho de uma vez: a
+    programação dinâmica avança mês a mês para todas as séries juntas, sem poda.
+
+    Args:
+        valores (np.ndarray): (séries, meses)
+
+    Returns:
+        list: Rupturas de cada série, como em detectar_rupturas
+    """
+    min_tamanho = _validar(modelo, min_tamanho)
+    valores = np.asarray(valores, dtype=np.float64)
+    num_series, n = valores.shape
+    if n < 2 * min_tamanho:
+        return [np.zeros(0, dtype=np.intp) for _ in range(num_series)]
+    penalidade = penalidade_padrao(n, modelo) if penalidade is None else penalidade
+
+    somas = somas_acumuladas(valores / np.sqrt(variancia_ruido(valores))[:, None])
+    custo_otimo = np.full((num_series, n + 1), np.inf)
+    custo_otimo[:, 0] = -penalidade
+    anterior = np.zeros((num_series, n + 1), dtype=np.intp)
+    for fim in range(min_tamanho, n + 1):
+        candidatos = np.concatenate([[0], np.arange(min_tamanho, fim - min_tamanho + 1)])
+        custos = custo_otimo[:, candidatos] + custo_segmentos(somas, candidatos, fim, modelo)
+        melhor = np.argmin(custos, axis=1)
+        custo_otimo[:, fim] = custos[np.arange(num_series), melhor] + penalidade
+        anterior[:, fim] = candidatos[melhor]
+
+    # Volta de n até 0 pelos inícios ótimos, todas as séries juntas
+    series = np.arange(num_series)
+    posicao = np.full(num_series, n)
+    caminho = []
+    while np.any(posicao > 0):
+        posicao = anterior[series, posicao]
+        caminho.append(posicao)
+    caminho = np.array(caminho[::-1]).T
+    return [np.array(linha[linha > 0], dtype=np.intp) for linha in caminho]
+
+
+def _tabela_segmentos(valores, rupturas, modelo):
+    """
+    Nível de cada segmento de várias séries do mesmo tamanho, a partir das somas acumuladas.
+
+    Returns:
+        dict: Arrays por segmento: Serie, Segmento, inicio, fim (exclusivo), Meses, Media,
+            Valor_Inicial, Valor_Final e Variacao_Percentual
+    """
+    valores = np.atleast_2d(np.asarray(valores, dtype=np.float64))
+    n = valores.shape[1]
+    limites = [np.concatenate([[0], r, [n]]) for r in rupturas]
+    serie = np.concatenate([np.full(len(l) - 1, i) for i, l in enumerate(limites)])
+    segmento = np.concatenate([np.arange(len(l) - 1) for l in limites])
+    inicio = np.concatenate([l[:-1] for l in limites])
+    fim = np.concatenate([l[1:] for l in limites])
+
+    somas = somas_acumuladas(valores)
+    meses, st, stt, sx, stx, _ = (somas[:, serie, fim] - somas[:, serie, inicio])
+    media_t = st / meses
+    media = sx / meses + valores.mean(axis=1)[serie]
+    inicial = final = media
+    if modelo == 'tendencia':
+        variacao_t = stt - st * media_t
+        with np.errstate(invalid='ignore', divide='ignore'):
+            inclinacao = np.where(variacao_t > 0, (stx - st * sx / meses) / variacao_t, 0.0)
+        inicial = media + inclinacao * (inicio - media_t)
+        final = media + inclinacao * (fim - 1 - media_t)
+
+    anterior = np.where(segmento > 0, np.roll(media, 1), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variacao = (media - anterior) / anterior * 100
+    return {'Serie': serie, 'Segmento': segmento, 'inicio': inicio, 'fim': fim, 'Meses': meses.astype(np.intp),
+            'Media': media, 'Valor_Inicial': inicial, 'Valor_Final': final, 'Variacao_Percentual': variacao}
+
+
+def segmentar_serie(valores, datas=None, modelo='media', min_tamanho=MIN_MESES_SEGMENTO, penalidade=None,
+                    metodo=METODO_RUPTURA):
+    """
+    Segmentos entre as rupturas de uma série, com o nível de cada um.
+
+    Args:
+        valores (np.ndarray): Série temporal
+        datas (array-like, optional): Rótulo de cada mês (padrão: posição)
+        modelo, min_tamanho, penalidade, metodo: Como em detectar_rupturas
+
+    Returns:
+        pd.DataFrame: Uma linha por segmento: Inicio, Fim (último mês), Meses, Media, Valor_Inicial
+            e Valor_Final (da média ou da reta ajustada) e Variacao_Percentual da média em
+            relação ao segmento anterior
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    datas = np.arange(len(valores)) if datas is None else np.asarray(datas)
+    rupturas = detectar_rupturas(valores, modelo, min_tamanho, penalidade, metodo)
+    tabela = _tabela_segmentos(valores, [rupturas], modelo)
+    return pd.DataFrame({
+        'Inicio': datas[tabela['inicio']],
+        'Fim': datas[tabela['fim'] - 1],
+        **{coluna: tabela[coluna] for coluna in
+           ('Meses', 'Media', 'Valor_Inicial', 'Valor_Final', 'Variacao_Percentual')}
+    })
+
+
+def _segmentar_bloco(tarefa):
+    """Segmenta um bloco de séries do mesmo tamanho: (coluna, empresas, datas, valores)."""
+    coluna, empresas, datas, valores = tarefa
+    modelo = MODELOS_RUPTURA.get(coluna, 'media')
+    tabela = _tabela_segmentos(valores, detectar_rupturas_lote(valores, modelo), modelo)
+    serie = tabela.pop('Serie')
+    inicio, fim = tabela.pop('inicio'), tabela.pop('fim')
+    return pd.DataFrame({
+        'Empresa': empresas[serie],
+        'Coluna': coluna,
+        'Inicio': datas[serie, inicio],
+        'Fim': datas[serie, fim - 1],
+        **tabela
+    })
+
+
+@instrumentar
+def detectar_rupturas_frota(df_frota, colunas=None, processos=None):
+    """
+    Segmentos de cada empresa e coluna da frota. As séries de mesmo tamanho são segmentadas
+    em lote (detectar_rupturas_lote), em blocos de até SERIES_POR_TAREFA distribuídos em
+    processos. O modelo de cada coluna vem de MODELOS_RUPTURA ('media' para as demais).
+
+    Args:
+        df_frota (pd.DataFrame): Históricos com 'Empresa' e 'Data', em ordem temporal por empresa
+        colunas (list, optional): Séries analisadas (padrão: as de MODELOS_RUPTURA)
+        processos (int, optional): Processos de trabalho (padrão: núcleos da máquina;
+            1 calcula no próprio processo)
+
+    Returns:
+        pd.DataFrame: Inicio, Fim, Meses, Media, Valor_Inicial, Valor_Final e
+            Variacao_Percentual por (Empresa, Coluna, Segmento), na ordem da frota
+    """
+    colunas = list(MODELOS_RUPTURA) if colunas is None else list(colunas)
+    empresas = df_frota['Empresa'].to_numpy()
+    ordem_empresas = pd.Index(pd.unique(empresas))
+    codigos = ordem_empresas.get_indexer(empresas)
+    ordem = np.argsort(codigos, kind='stable')
+    tamanhos = np.bincount(codigos, minlength=len(ordem_empresas))
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)])
+
+    # Empresas com o mesmo número de meses formam uma matriz (empresas x meses)
+    tarefas = []
+    for tamanho in np.unique(tamanhos):
+        grupo = np.flatnonzero(tamanhos == tamanho)
+        linhas = ordem[inicios[grupo][:, None] + np.arange(tamanho)]
+        datas = df_frota['Data'].to_numpy()[linhas]
+        for coluna in colunas:
+            valores = df_frota[coluna].to_numpy(dtype=np.float64)[linhas]
+            for parte in range(0, len(grupo), SERIES_POR_TAREFA):
+                fatia = slice(parte, parte + SERIES_POR_TAREFA)
+                tarefas.append((coluna, ordem_empresas.to_numpy()[grupo[fatia]], datas[fatia], valores[fatia]))
+
+    processos = min(processos or os.cpu_count() or 1, len(tarefas))
+    if processos <= 1:
+        resultados = list(map(_segmentar_bloco, tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resultados = list(pool.map(_segmentar_bloco, tarefas))
+
+    segmentos = pd.concat(resultados, ignore_index=True)
+    chave = np.lexsort((segmentos['Segmento'].to_numpy(), pd.Index(colunas).get_indexer(segmentos['Coluna']),
+                        ordem_empresas.get_indexer(segmentos['Empresa'])))
+    return segmentos.iloc[chave].set_index(['Empresa', 'Coluna', 'Segmento'])
@@ -1,6 +1,7 @@
 """
 Configurações gerais do sistema.
 """
+import os
 
 # Configurações da aplicação
 APP_TITLE = "Sistema de Análise Preditiva - Autopeças & Assistência 24h"
@@ -12,6 +13,102 @@ NUM_MESES_HISTORICO = 48
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
 
+# Agrupamento de previsões concorrentes (serviço e agendador de lotes)
+JANELA_LOTE_MS = 2.0
+TAMANHO_MAXIMO_LOTE = 256
+
+# Instrumentação de desempenho (também ativada por ?perf=1 nos apps)
+INSTRUMENTACAO_ATIVA = os.environ.get('INSTRUMENTACAO', '') == '1'
+
+# Penalidade do modelo de faturamento: 'ols' (mínimos quadrados), 'ridge', 'lasso' ou
+# 'elasticnet'. Nas penalizadas o alpha sai da validação cruzada temporal no treino
+PENALIDADE_MODELO = os.environ.get('PENALIDADE_MODELO', 'ols')
+PENALIDADES_MODELO = ('ols', 'ridge', 'lasso', 'elasticnet')
+L1_RATIO_ELASTICNET = 0.5
+DIVISOES_CV_TEMPORAL = 5
+# Treino mínimo de cada divisão: dois anos, para que cada mês tenha ao menos duas
+# observações e os interceptos por mês não absorvam todo o sinal
+MESES_MINIMOS_TREINO_CV = 24
+
+# Precisão numérica do treino e da pontuação ('float64' ou 'float32'). float32 reduz a
+# memória pela metade na pontuação em massa e nas simulações; as previsões ficam dentro
+# de TOLERANCIA_RELATIVA_FLOAT32 das de float64 (conferido por tests/test_float32.py)
+DTYPE_CALCULO = os.environ.get('DTYPE_CALCULO', 'float64')
+DTYPES_SUPORTADOS = ('float32', 'float64')
+TOLERANCIA_RELATIVA_FLOAT32 = 1e-5
+
+# Bootstrap (intervalos de KPIs e dos coeficientes do modelo): número de reamostras e
+# quantas são reajustadas por vez (limita a memória das pilhas de reamostras)
+NUM_REAMOSTRAS_BOOTSTRAP = 10_000
+LOTE_REAMOSTRAS_BOOTSTRAP = 2_500
+KPIS_BOOTSTRAP = ['Faturamento', 'Sinistralidade_Realizada', 'NPS', 'Ticket_Medio']
+
+# Modelo hierárquico da frota: além do intercepto, cada empresa tem inclinação própria
+# (parcialmente agrupada na global) nestas features; variâncias estimadas por EM
+FEATURES_INCLINACAO_ALEATORIA = ['Qtd_Atendimentos', 'Ticket_Medio', 'Volume_x_Ticket']
+MAX_ITER_HIERARQUICO = 500
+TOLERANCIA_HIERARQUICO = 1e-6
+
+# Busca de pontos de ruptura (teste de Welch em todas as divisões): meses mínimos de cada
+# lado e maior janela simétrica avaliada por padrão
+MESES_MINIMOS_PERIODO = 3
+JANELA_MAXIMA_RUPTURA = 60
+
+# Detecção de rupturas estruturais (PELT): modelo de cada série ('media' para saltos de
+# nível, 'tendencia' para mudanças de reta em séries que crescem), meses mínimos de cada
+# segmento e multiplicador da penalidade BIC por ruptura. 'pelt' é exato; 'binaria'
+# (segmentação binária) é aproximada, mas O(n log n) em séries muito longas. Com 1,5 x BIC,
+# em 48 meses sem ruptura cerca de 4% das séries de sinistralidade ganham uma ruptura falsa
+MODELOS_RUPTURA = {'Sinistralidade_Realizada': 'media', 'Faturamento': 'tendencia'}
+METODO_RUPTURA = 'pelt'
+MIN_MESES_SEGMENTO = 6
+FATOR_PENALIDADE_RUPTURA = 1.5
+
+# Cartas de controle (monitoramento mensal da frota): KPIs monitorados, meses da linha de
+# base de cada série, suavização e largura (em desvios) da EWMA, folga e limite de decisão
+# do CUSUM (em desvios) e largura da Shewhart. EWMA (0,2; 2,962) e CUSUM (0,5; 5) dão
+# cerca de 500 meses entre alarmes falsos em um processo sob controle com meses
+# independentes. KPIs que crescem com o tempo (faturamento, volume, ticket) ficariam em
+# alarme permanente contra uma base fixa e por isso não estão no padrão
+KPIS_CONTROLE = ['Sinistralidade_Realizada', 'NPS', 'Tempo_Medio_Atend_Horas', 'Taxa_Reincidencia']
+MESES_BASE_CONTROLE = 12
+LAMBDA_EWMA = 0.2
+LARGURA_EWMA = 2.962
+FOLGA_CUSUM = 0.5
+LIMITE_CUSUM = 5.0
+LIMITE_SHEWHART = 3.0
+
+# Esboço de quantis (KLL) das distribuições grandes demais para a memória: capacidade k do
+# nível mais alto. O esboço guarda no máximo 3k valores; com k = 400 o erro de posto garantido
+# (99% de confiança) fica em torno de 1% das observações com dezenas de milhões de linhas e
+# o observado costuma ser a metade disso (conferido por tests/test_esboco_quantis.py)
+K_ESBOCO_QUANTIS = 400
+
+# Cache de previsões do simulador
+CACHE_PREVISOES_MAX_ITENS = 4096
+CACHE_PREVISOES_TTL_SEGUNDOS = 3600
+
+# Modo ao vivo do simulador: um cenário só é pontuado depois de ficar esse tempo sem mudar
+# (debounce); enquanto o slider se move, fica na tela a previsão anterior
+ATRASO_SIMULADOR_AO_VIVO_S = 0.3
+
+# Resolução de cada entrada do simulador usada na chave do cache de previsões:
+# passo dos sliders (o menor entre os dois apps) e, nos campos numéricos, cujo passo
+# parte do último valor histórico e não forma uma grade, a precisão exibida
+PASSOS_ENTRADAS_SIMULADOR = {
+    'Faturamento_Mes_Ant': 0.01,
+    'Sinistralidade_Mes_Ant': 0.5,
+    'Qtd_Atendimentos': 1,
+    'Ticket_Medio': 0.01,
+    'Perc_Atend_Com_Pecas': 0.01,
+    'Tempo_Medio_Atend_Horas': 0.1,
+    'Taxa_Reincidencia': 0.01,
+    'NPS': 1,
+    'Taxa_Juros': 0.01,
+    'Indice_Acidentes': 0.01,
+    'mes_prev': 1
+}
+
 # Metas e benchmarks
 META_SINISTRALIDADE = 50.0
 META_NPS = 70
@@ -45,6 +142,26 @@ FEATURES_MODELO = [
     'Indice_Acidentes'
 ]
 
+# Variáveis operacionais combinadas duas a duas ('A_x_B') no conjunto de candidatas da
+# seleção de features (preparar_candidatos)
+VARIAVEIS_INTERACAO = [
+    'Qtd_Atendimentos',
+    'Ticket_Medio',
+    'Perc_Atend_Com_Pecas',
+    'Tempo_Medio_Atend_Horas',
+    'Taxa_Reincidencia',
+    'NPS'
+]
+
+# Critério da seleção de features ('aic', 'bic' ou 'gcv') e tamanho máximo dos subconjuntos
+CRITERIO_SELECAO_FEATURES = os.environ.get('CRITERIO_SELECAO_FEATURES', 'bic')
+MAX_FEATURES_SELECAO = 8
+# Teto do tamanho dos subconjuntos mesmo com max_features=None: no máximo uma feature a cada
+# OBSERVACOES_POR_FEATURE_SELECAO observações de treino que sobram depois dos 12 interceptos
+# por mês. Perto da saturação o RSS de treino vai a zero e AIC/GCV premiam o modelo cheio
+# (com 48 meses, o teto cai de 24 para 8 features)
+OBSERVACOES_POR_FEATURE_SELECAO = 3
+
 # Variáveis para correlação
 VARIAVEIS_CORRELACAO = [
     'Faturamento',
@@ -0,0 +1,281 @@
+"""
+Cartas de controle (Shewhart, EWMA e CUSUM) dos KPIs da frota, atualizadas em fluxo.
+
+Cada par empresa x KPI guarda só alguns números (contagem, soma e amplitudes móveis da
+linha de base, última observação, EWMA e as duas somas do CUSUM) em vetores
+(empresas x KPIs). Um fechamento mensal atualiza a frota inteira em O(1) por observação,
+com operações vetorizadas, e o estado é gravado entre execuções em um único .npz, junto
+com o último mês incorporado de cada empresa: repetir um fechamento não conta o mês duas
+vezes.
+
+As primeiras MESES_BASE_CONTROLE observações de cada série formam a linha de base: média
+e desvio pela amplitude móvel média (MR / 1,128, como na carta de valores individuais,
+menos sensível a tendências do que o desvio padrão). A partir daí cada observação é
+padronizada pela base e avaliada nas três cartas; a EWMA usa os limites exatos do
+t-ésimo mês monitorado e o CUSUM volta a zero depois de cada alarme.
+"""
+import numpy as np
+import pandas as pd
+from instrumentation import instrumentar
+from config import (
+    KPIS_CONTROLE, MESES_BASE_CONTROLE, LAMBDA_EWMA, LARGURA_EWMA, FOLGA_CUSUM, LIMITE_CUSUM,
+    LIMITE_SHEWHART
+)
+
+__all__ = [
+    'D2_AMPLITUDE_MOVEL',
+    'CAMPOS_ESTADO',
+    'COLUNAS_CONTROLE',
+    'MonitorControle',
+    'monitorar_frota'
+]
+
+# Constante d2 da amplitude entre duas observações consecutivas (desvio = MR médio / d2)
+D2_AMPLITUDE_MOVEL = 1.128
+
+# Vetores (empresas x KPIs) do estado de cada série, gravados por MonitorControle.salvar
+CAMPOS_ESTADO = ('contagem', 'soma', 'soma_amplitudes', 'ultimo', 'media_base', 'desvio_base',
+                 'ewma', 'cusum_pos', 'cusum_neg')
+
+# Colunas do resultado de cada atualização
+COLUNAS_CONTROLE = ['Valor', 'Em_Base', 'Media_Base', 'Z', 'EWMA', 'LIC_EWMA', 'LSC_EWMA', 'CUSUM_Pos',
+                    'CUSUM_Neg', 'Alarme_Shewhart', 'Alarme_EWMA', 'Alarme_CUSUM', 'Alarme']
+
+
+class MonitorControle:
+    """
+    Estado das cartas de controle de várias empresas e KPIs.
+
+    Args:
+        kpis (list, optional): KPIs monitorados (padrão: KPIS_CONTROLE)
+        meses_base (int): Observações da linha de base de cada série (ao menos 2)
+        lambda_ewma (float): Peso da observação nova na EWMA, em (0, 1]
+        largura_ewma (float): Largura dos limites da EWMA, em desvios da estatística
+        folga_cusum (float): Folga k do CUSUM, em desvios
+        limite_cusum (float): Limite de decisão h do CUSUM, em desvios
+        limite_shewhart (float): Largura dos limites da Shewhart, em desvios
+
+    Attributes:
+        empresas (pd.Index): Empresas já vistas, na ordem das linhas do estado
+        ultimas_datas (np.ndarray): Último mês incorporado de cada empresa (NaT se nenhum)
+    """
+
+    def __init__(self, kpis=None, meses_base=MESES_BASE_CONTROLE, lambda_ewma=LAMBDA_EWMA,
+                 largura_ewma=LARGURA_EWMA, folga_cusum=FOLGA_CUSUM, limite_cusum=LIMITE_CUSUM,
+                 limite_shewhart=LIMITE_SHEWHART):
+        if meses_base < 2:
+            raise ValueError(f"meses_base deve ser ao menos 2 (amplitude móvel); recebido {meses_base}")
+        if not 0 < lambda_ewma <= 1:
+            raise ValueError(f"lambda_ewma deve estar em (0, 1]; recebido {lambda_ewma}")
+        self.kpis = list(KPIS_CONTROLE if kpis is None else kpis)
+        self.meses_base = int(meses_base)
+        self.lambda_ewma = float(lambda_ewma)
+        self.largura_ewma = float(largura_ewma)
+        self.folga_cusum = float(folga_cusum)
+        self.limite_cusum = float(limite_cusum)
+        self.limite_shewhart = float(limite_shewhart)
+        self.empresas = pd.Index([], dtype=object, name='Empresa')
+        self.ultimas_datas = np.array([], dtype='datetime64[ns]')
+        self._estado = {campo: self._novos(campo, 0) for campo in CAMPOS_ESTADO}
+
+    def _novos(self, campo, num_empresas):
+        """Vetores iniciais de um campo do estado para empresas ainda não vistas."""
+        forma = (num_empresas, len(self.kpis))
+        if campo == 'contagem':
+            return np.zeros(forma, dtype=np.int64)
+        if campo in ('ultimo', 'media_base', 'desvio_base', 'ewma'):
+            return np.full(forma, np.nan)
+        return np.zeros(forma)
+
+    def _linhas(self, empresas):
+        """Linha do estado de cada empresa, acrescentando as que ainda não existem."""
+        empresas = pd.Index(np.asarray(empresas, dtype=object))
+        if empresas.has_duplicates:
+            raise ValueError("Cada empresa deve aparecer uma única vez por atualização")
+        linhas = self.empresas.get_indexer(empresas)
+        novas = linhas < 0
+        if novas.any():
+            linhas[novas] = len(self.empresas) + np.arange(novas.sum())
+            self.empresas = self.empresas.append(empresas[novas]).rename('Empresa')
+            self.ultimas_datas = np.concatenate([self.ultimas_datas,
+                                                 np.full(novas.sum(), np.datetime64('NaT', 'ns'))])
+            for campo in CAMPOS_ESTADO:
+                self._estado[campo] = np.concatenate([self._estado[campo], self._novos(campo, novas.sum())])
+        return linhas
+
+    def datas_incorporadas(self, empresas):
+        """Último mês incorporado de cada empresa informada (NaT para as ainda não vistas)."""
+        linhas = self.empresas.get_indexer(pd.Index(np.asarray(empresas, dtype=object)))
+        datas = np.full(len(linhas), np.datetime64('NaT', 'ns'))
+        conhecidas = linhas >= 0
+        datas[conhecidas] = self.ultimas_datas[linhas[conhecidas]]
+        return datas
+
+    def atualizar(self, empresas, valores, data=None):
+        """
+        Incorpora uma observação (um fechamento mensal) de cada empresa informada.
+
+        Args:
+            empresas (sequence): Nome de cada empresa, sem repetições
+            valores (pd.DataFrame ou np.ndarray): Uma linha por empresa; DataFrames são
+                lidos pelas colunas dos KPIs, arrays na ordem de self.kpis. NaN não altera a série
+            data (datetime-like, optional): Mês do fechamento, registrado por empresa; um mês
+                igual ou anterior ao último já incorporado é ValueError
+
+        Returns:
+            pd.DataFrame: COLUNAS_CONTROLE por (Empresa, KPI); na linha de base só Valor é preenchido
+        """
+        if isinstance(valores, pd.DataFrame):
+            valores = valores[self.kpis]
+        x = np.asarray(valores, dtype=np.float64).reshape(len(empresas), len(self.kpis))
+        if data is not None:
+            data = np.datetime64(pd.Timestamp(data), 'ns')
+            repetidas = self.datas_incorporadas(empresas) >= data
+            if repetidas.any():
+                raise ValueError(f"{pd.Timestamp(data):%Y-%m} já foi incorporado para "
+                                 f"{np.asarray(empresas, dtype=object)[repetidas][0]}")
+        linhas = self._linhas(empresas)
+        if data is not None:
+            self.ultimas_datas[linhas] = data
+        estado = {campo: vetor[linhas] for campo, vetor in self._estado.items()}
+        m = self.meses_base
+
+        observado = ~np.isnan(x)
+        contagem = estado['contagem']
+        em_base = observado & (contagem < m)
+        monitorado = observado & (contagem >= m)
+
+        # Linha de base: soma e amplitudes móveis até a m-ésima observação, que fixa média e desvio
+        amplitude = np.abs(x - estado['ultimo'])
+        soma = estado['soma'] + np.where(em_base, x, 0.0)
+        soma_amplitudes = estado['soma_amplitudes'] + np.where(em_base & (contagem > 0), amplitude, 0.0)
+        contagem = contagem + observado
+        fecha_base = em_base & (contagem == m)
+        media = np.where(fecha_base, soma / m, estado['media_base'])
+        desvio = np.where(fecha_base, soma_amplitudes / ((m - 1) * D2_AMPLITUDE_MOVEL), estado['desvio_base'])
+        ewma_anterior = np.where(fecha_base, media, estado['ewma'])
+
+        # Monitoramento; séries constantes na base (desvio zero) não geram alarmes
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = np.where(monitorado & (desvio > 0), (x - media) / desvio, 0.0)
+        lam = self.lambda_ewma
+        ewma = np.where(monitorado, lam * x + (1 - lam) * ewma_anterior, ewma_anterior)
+        meses_monitorados = np.maximum(contagem - m, 0)
+        largura = self.largura_ewma * desvio * np.sqrt(
+            lam / (2 - lam) * (1 - (1 - lam) ** (2 * meses_monitorados))
+        )
+        cusum_pos = np.where(monitorado, np.maximum(0.0, estado['cusum_pos'] + z - self.folga_cusum),
+                             estado['cusum_pos'])
+        cusum_neg = np.where(monitorado, np.maximum(0.0, estado['cusum_neg'] - z - self.folga_cusum),
+                             estado['cusum_neg'])
+
+        alarme_shewhart = monitorado & (np.abs(z) > self.limite_shewhart)
+        alarme_ewma = monitorado & (desvio > 0) & (np.abs(ewma - media) > largura)
+        alarme_cusum = monitorado & ((cusum_pos > self.limite_cusum) | (cusum_neg > self.limite_cusum))
+
+        novo = {
+            'contagem': contagem,
+            'soma': soma,
+            'soma_amplitudes': soma_amplitudes,
+            'ultimo': np.where(observado, x, estado['ultimo']),
+            'media_base': media,
+            'desvio_base': desvio,
+            'ewma': ewma,
+            'cusum_pos': np.where(alarme_cusum, 0.0, cusum_pos),
+            'cusum_neg': np.where(alarme_cusum, 0.0, cusum_neg),
+        }
+        for campo, vetor in novo.items():
+            self._estado[campo][linhas] = vetor
+
+        def _monitorado(vetor):
+            return np.where(monitorado, vetor, np.nan).ravel()
+
+        indice = pd.MultiIndex.from_arrays(
+            [np.repeat(np.asarray(empresas, dtype=object), len(self.kpis)), np.tile(self.kpis, len(linhas))],
+            names=['Empresa', 'KPI']
+        )
+        return pd.DataFrame({
+            'Valor': x.ravel(),
+            'Em_Base': em_base.ravel(),
+            'Media_Base': _monitorado(media),
+            'Z': _monitorado(z),
+            'EWMA': _monitorado(ewma),
+            'LIC_EWMA': _monitorado(media - largura),
+            'LSC_EWMA': _monitorado(media + largura),
+            'CUSUM_Pos': _monitorado(cusum_pos),
+            'CUSUM_Neg': _monitorado(cusum_neg),
+            'Alarme_Shewhart': alarme_shewhart.ravel(),
+            'Alarme_EWMA': alarme_ewma.ravel(),
+            'Alarme_CUSUM': alarme_cusum.ravel(),
+            'Alarme': (alarme_shewhart | alarme_ewma | alarme_cusum).ravel(),
+        }, index=indice)
+
+    def linha_base(self):
+        """
+        Média e desvio da linha de base de cada série (NaN enquanto a base não fecha).
+
+        Returns:
+            pd.DataFrame: Colunas Media e Desvio por (Empresa, KPI)
+        """
+        indice = pd.MultiIndex.from_product([self.empresas, self.kpis], names=['Empresa', 'KPI'])
+        return pd.DataFrame({'Media': self._estado['media_base'].ravel(),
+                             'Desvio': self._estado['desvio_base'].ravel()}, index=indice)
+
+    def salvar(self, caminho):
+        """Grava parâmetros, empresas e estado em um .npz compactado (sem pickle)."""
+        parametros = [self.meses_base, self.lambda_ewma, self.largura_ewma, self.folga_cusum,
+                      self.limite_cusum, self.limite_shewhart]
+        np.savez_compressed(caminho, empresas=np.asarray(self.empresas, dtype=str),
+                            kpis=np.asarray(self.kpis, dtype=str), parametros=np.asarray(parametros),
+                            ultimas_datas=self.ultimas_datas, **self._estado)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Reconstrói um monitor gravado por salvar."""
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            meses_base, *demais = arquivo['parametros'].tolist()
+            monitor = cls(arquivo['kpis'].tolist(), int(meses_base), *demais)
+            monitor.empresas = pd.Index(arquivo['empresas'].tolist(), dtype=object, name='Empresa')
+            # Estados gravados antes do registro de datas não têm o último mês de cada empresa
+            monitor.ultimas_datas = (arquivo['ultimas_datas'].astype('datetime64[ns]') if 'ultimas_datas' in arquivo
+                                     else np.full(len(monitor.empresas), np.datetime64('NaT', 'ns')))
+            monitor._estado = {campo: arquivo[campo] for campo in CAMPOS_ESTADO}
+        return monitor
+
+
+@instrumentar
+def monitorar_frota(dados, kpis=None, monitor=None):
+    """
+    Passa o histórico pelas cartas de controle, um fechamento mensal por vez.
+
+    Meses iguais ou anteriores ao último já incorporado de cada empresa são ignorados, de
+    modo que repetir um fechamento (ou reprocessar o histórico inteiro) não altera o estado.
+
+    Args:
+        dados (pd.DataFrame): Histórico com 'Data' e os KPIs; 'Empresa' identifica as séries
+            (sem ela o histórico é tratado como uma única empresa)
+        kpis (list, optional): KPIs monitorados (padrão: KPIS_CONTROLE ou os do monitor)
+        monitor (MonitorControle, optional): Estado a continuar; um novo se omitido
+
+    Returns:
+        tuple: (resultado, monitor) - COLUNAS_CONTROLE por (Data, Empresa, KPI) dos meses
+            incorporados (vazio se nenhum era novo) e o estado final
+    """
+    monitor = MonitorControle(kpis) if monitor is None else monitor
+    empresas = dados['Empresa'].to_numpy() if 'Empresa' in dados else np.full(len(dados), 'Empresa')
+    datas_linhas = dados['Data'].to_numpy(dtype='datetime64[ns]')
+    ultimas = monitor.datas_incorporadas(empresas)
+    novas = np.isnat(ultimas) | (datas_linhas > ultimas)
+
+    ordem = np.flatnonzero(novas)[np.argsort(datas_linhas[novas], kind='stable')]
+    datas, inicios = np.unique(datas_linhas[ordem], return_index=True)
+    empresas = empresas[ordem]
+    valores = dados[monitor.kpis].to_numpy(dtype=np.float64)[ordem]
+    limites = np.append(inicios, len(ordem))
+    partes = [monitor.atualizar(empresas[inicio:fim], valores[inicio:fim], data)
+              for data, inicio, fim in zip(datas, limites[:-1], limites[1:])]
+    if not partes:
+        indice = pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), [], []], names=['Data', 'Empresa', 'KPI'])
+        return pd.DataFrame(columns=COLUNAS_CONTROLE, index=indice), monitor
+    resultado = pd.concat(partes, keys=pd.DatetimeIndex(datas), names=['Data'])
+    return resultado, monitor
@@ -3,9 +3,15 @@ Módulo para geração de dados sintéticos de empresas de autopeças e assistê
 """
 import pandas as pd
 import numpy as np
+from instrumentation import instrumentar
+from utils import resolver_dtype
 
+# Meses a partir de 2022 que cabem em datetime64[ns]
+MAX_MESES_DATAS_NS = 2400
 
-def gerar_dados_assistencia(num_meses=48, empresa_selecionada=None):
+
+@instrumentar
+def gerar_dados_assistencia(num_meses=48, empresa_selecionada=None, semente=42, dtype=None):
     """
     Gera dados realistas para análise de empresas parceiras do setor de autopeças e assistência 24h.
     Considera: sinistralidade, faturamento, quantidade de atendimentos, sazonalidade e outros KPIs.
@@ -13,14 +19,18 @@ def gerar_dados_assistencia(num_meses=48, empresa_selecionada=None):
     Args:
         num_meses (int): Número de meses de dados históricos a gerar
         empresa_selecionada (str, optional): Nome da empresa específica
+        semente (int): Semente aleatória (reprodutibilidade)
+        dtype (str, optional): Precisão das colunas numéricas contínuas (padrão: DTYPE_CALCULO)
     
     Returns:
         pd.DataFrame: DataFrame com dados históricos simulados
     """
     
-    np.random.seed(42)  # Para reprodutibilidade
+    np.random.seed(semente)  # Para reprodutibilidade
     
-    data = pd.date_range(start='2022-01-01', periods=num_meses, freq='MS')
+    # Históricos muito longos passam do ano 2262, limite das datas em nanossegundos
+    unidade = 'ns' if num_meses <= MAX_MESES_DATAS_NS else 's'
+    data = pd.date_range(start='2022-01-01', periods=num_meses, freq='MS', unit=unidade)
     df = pd.DataFrame(data, columns=['Data'])
     df['Mes'] = df['Data'].dt.month
     df['Trimestre'] = df['Data'].dt.quarter
@@ -139,4 +149,33 @@ def gerar_dados_assistencia(num_meses=48, empresa_selecionada=None):
     df['Sinistralidade_Mes_Ant'] = df['Sinistralidade_Realizada'].shift(1).fillna(df['Sinistralidade_Realizada'].mean())
     df['Sinistralidade_Orcada_Mes_Ant'] = df['Sinistralidade_Orcada'].shift(1).fillna(df['Sinistralidade_Orcada'].mean())
     
+    # A simulação roda em float64; só o resultado é convertido para a precisão pedida
+    dtype = resolver_dtype(dtype)
+    if dtype != np.float64:
+        colunas = df.select_dtypes(include='float64').columns
+        df[colunas] = df[colunas].astype(dtype)
+    
     return df
+
+
+@instrumentar
+def gerar_dados_frota(num_meses=48, num_empresas=10, semente=42, dtype=None):
+    """
+    Gera o histórico de várias empresas parceiras, empilhado em um único DataFrame.
+    Cada empresa usa uma semente própria, de modo que as séries diferem entre si.
+    
+    Args:
+        num_meses (int): Meses de histórico por empresa
+        num_empresas (int): Quantidade de empresas
+        semente (int): Semente da primeira empresa (as demais usam semente + i)
+        dtype (str, optional): Precisão das colunas numéricas contínuas (padrão: DTYPE_CALCULO)
+    
+    Returns:
+        pd.DataFrame: Dados de gerar_dados_assistencia com a coluna 'Empresa' na frente
+    """
+    partes = []
+    for i in range(num_empresas):
+        df = gerar_dados_assistencia(num_meses, semente=semente + i, dtype=dtype)
+        df.insert(0, 'Empresa', f'Empresa_{i + 1:04d}')
+        partes.append(df)
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,369 @@
+"""
+Seleção de features por busca em subconjuntos: forward, backward e best-subset por
+branch-and-bound, sobre as candidatas de preparar_candidatos.
+
+Como no ModeloInterceptoMensal, os interceptos por mês ficam sempre no modelo e a busca
+trabalha com as features centradas dentro do mês (Frisch-Waugh-Lovell): o RSS de um
+subconjunto S sai só da matriz de Gram G = XᵀX e de c = Xᵀy,
+
+    RSS(S) = yᵀy - c_Sᵀ G_SS⁻¹ c_S
+
+Nenhum subconjunto é reajustado do zero. Na forward e no branch-and-bound, incluir uma
+feature acrescenta uma linha ao fator de Cholesky de G_SS (uma resolução triangular,
+O(p²)); na backward, retirar uma feature é uma atualização de posto 1 da inversa de G_SS,
+também O(p²). Os tamanhos de subconjunto são comparados por AIC, BIC ou GCV, com as
+mesmas fórmulas de metricas_analiticas.
+"""
+import numpy as np
+import pandas as pd
+from model import preparar_candidatos, _medias_por_mes
+from config import CRITERIO_SELECAO_FEATURES, MAX_FEATURES_SELECAO, OBSERVACOES_POR_FEATURE_SELECAO
+
+__all__ = [
+    'METODOS_SELECAO',
+    'CRITERIOS_SELECAO',
+    'sistema_normal',
+    'busca_forward',
+    'busca_backward',
+    'busca_exaustiva',
+    'criterio_selecao',
+    'selecionar_features',
+    'selecionar_features_frota'
+]
+
+METODOS_SELECAO = ('forward', 'backward', 'exaustiva')
+CRITERIOS_SELECAO = ('aic', 'bic', 'gcv')
+
+# Uma feature cuja parte não explicada pelas já escolhidas tem norma² abaixo desta fração
+# da sua própria (colunas normalizadas) é tratada como colinear e não entra
+TOLERANCIA_COLINEARIDADE = 1e-8
+
+
+def sistema_normal(X, y, meses):
+    """
+    Matriz de Gram e correlações das features centradas no mês, com as colunas
+    normalizadas (o RSS não depende da escala das features).
+
+    Args:
+        X (np.ndarray): Features (n, p)
+        y (np.ndarray): Alvo (n,)
+        meses (array-like): Mês (1 a 12) de cada linha
+
+    Returns:
+        tuple: (gram (p, p), correlacao (p,), soma_quadrados (yᵀy centrado), num_meses)
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    grupo = np.asarray(meses, dtype=np.intp) - 1
+    media_X, media_y, presentes = _medias_por_mes(X, y, grupo)
+    X_centrado = X - media_X[grupo]
+    y_centrado = y - media_y[grupo]
+
+    # Colunas constantes dentro do mês (norma zero) ficam zeradas e nunca entram
+    norma = np.linalg.norm(X_centrado, axis=0)
+    X_centrado = X_centrado / np.where(norma > 0, norma, np.inf)
+    return X_centrado.T @ X_centrado, X_centrado.T @ y_centrado, float(y_centrado @ y_centrado), int(presentes.sum())
+
+
+def _acrescimos(fator, z, gram, correlacao, escolhidas, candidatas):
+    """
+    Efeito de acrescentar cada candidata ao subconjunto fatorado (fator de Cholesky de
+    G_SS e z = fator⁻¹ c_S), todas de uma vez.
+
+    Returns:
+        tuple: (linhas (k, c) do novo fator, pivôs (c,), novos z (c,), válidas (c,));
+            o RSS cai de z²
+    """
+    from scipy.linalg.lapack import dtrtrs
+
+    diagonal = gram[candidatas, candidatas]
+    if len(escolhidas):
+        linhas = dtrtrs(fator, gram[escolhidas][:, candidatas], lower=1)[0]
+        restante = diagonal - np.einsum('kc,kc->c', linhas, linhas)
+        projecao = correlacao[candidatas] - linhas.T @ z
+    else:
+        linhas = np.zeros((0, len(candidatas)))
+        restante = diagonal
+        projecao = correlacao[candidatas]
+    validas = restante > TOLERANCIA_COLINEARIDADE * np.maximum(diagonal, np.finfo(float).tiny)
+    pivos = np.sqrt(np.where(validas, restante, 1.0))
+    return linhas, pivos, np.where(validas, projecao / pivos, 0.0), validas
+
+
+def _ampliar(fator, z, linha, pivo, novo_z):
+    """Fator de Cholesky e z com uma feature a mais (última linha)."""
+    k = len(z)
+    ampliado = np.zeros((k + 1, k + 1))
+    ampliado[:k, :k] = fator
+    ampliado[k, :k] = linha
+    ampliado[k, k] = pivo
+    return ampliado, np.append(z, novo_z)
+
+
+def busca_forward(gram, correlacao, soma_quadrados, max_features=None):
+    """
+    Seleção forward: a cada passo entra a feature que mais reduz o RSS.
+
+    Returns:
+        tuple: (caminho, avaliados); caminho[k] = (índices, rss) do passo com k features
+    """
+    p = len(correlacao)
+    max_features = p if max_features is None else min(max_features, p)
+    escolhidas = []
+    fator, z = np.zeros((0, 0)), np.zeros(0)
+    rss = soma_quadrados
+    caminho = [((), rss)]
+    avaliados = 0
+
+    disponiveis = np.ones(p, dtype=bool)
+    while len(escolhidas) < max_features:
+        candidatas = np.flatnonzero(disponiveis)
+        linhas, pivos, novos_z, validas = _acrescimos(fator, z, gram, correlacao, escolhidas, candidatas)
+        avaliados += int(validas.sum())
+        if not validas.any():
+            break
+        melhor = int(np.argmax(np.where(validas, novos_z ** 2, -np.inf)))
+        fator, z = _ampliar(fator, z, linhas[:, melhor], pivos[melhor], novos_z[melhor])
+        rss -= novos_z[melhor] ** 2
+        escolhidas.append(int(candidatas[melhor]))
+        disponiveis[candidatas[melhor]] = False
+        caminho.append((tuple(escolhidas), rss))
+    return caminho, avaliados
+
+
+def busca_backward(gram, correlacao, soma_quadrados, max_features=None):
+    """
+    Seleção backward: parte de todas as features linearmente independentes e a cada passo
+    retira a que menos aumenta o RSS, b_j² / (G_SS⁻¹)_jj, atualizando a inversa e os
+    coeficientes em O(p²).
+
+    Returns:
+        tuple: (caminho, avaliados); caminho[k] = (índices, rss) do passo com k features
+            (até max_features)
+    """
+    from scipy.linalg.lapack import dtrtrs
+
+    p = len(correlacao)
+    max_features = p if max_features is None else min(max_features, p)
+
+    # Ponto de partida: features independentes, na ordem original (Cholesky com descarte)
+    escolhidas = []
+    fator, z = np.zeros((0, 0)), np.zeros(0)
+    for j in range(p):
+        linhas, pivos, novos_z, validas = _acrescimos(fator, z, gram, correlacao, escolhidas, np.array([j]))
+        if validas[0]:
+            fator, z = _ampliar(fator, z, linhas[:, 0], pivos[0], novos_z[0])
+            escolhidas.append(j)
+
+    identidade = np.eye(len(escolhidas))
+    fator_inverso = dtrtrs(fator, identidade, lower=1)[0]
+    inversa = fator_inverso.T @ fator_inverso
+    coef = inversa @ correlacao[escolhidas]
+    rss = soma_quadrados - float(z @ z)
+
+    caminho = {len(escolhidas): (tuple(escolhidas), rss)}
+    avaliados = 0
+    while escolhidas:
+        aumento = coef ** 2 / np.diag(inversa)
+        avaliados += len(escolhidas)
+        j = int(np.argmin(aumento))
+        rss += aumento[j]
+        coluna = inversa[:, j] / inversa[j, j]
+        coef = np.delete(coef - coluna * coef[j], j)
+        inversa = np.delete(np.delete(inversa - np.outer(coluna, inversa[j]), j, axis=0), j, axis=1)
+        del escolhidas[j]
+        caminho[len(escolhidas)] = (tuple(escolhidas), rss)
+    return [caminho[k] for k in range(min(max_features, max(caminho)) + 1)], avaliados
+
+
+def _limites_prefixos(gram, correlacao, soma_quadrados, indices):
+    """
+    RSS de cada prefixo de indices (indices[:1], indices[:2], ...) a partir de uma única
+    fatoração de Cholesky. Prefixos singulares (features colineares) ficam com limite zero.
+    """
+    from scipy.linalg.lapack import dpotrf, dtrtrs
+
+    fator, info = dpotrf(gram[indices][:, indices], lower=1, clean=0)
+    validos = len(indices) if info == 0 else info - 1
+    limites = np.zeros(len(indices))
+    if validos:
+        z = dtrtrs(fator[:validos, :validos], correlacao[indices[:validos]], lower=1)[0]
+        limites[:validos] = soma_quadrados - np.cumsum(z ** 2)
+    return limites
+
+
+def busca_exaustiva(gram, correlacao, soma_quadrados, max_features=None, avaliar=None):
+    """
+    Melhor subconjunto (menor RSS) de cada tamanho até max_features, por branch-and-bound
+    sobre a árvore de inclusões: cada nó acrescenta ao subconjunto do pai uma feature
+    posterior na ordem, reaproveitando o fator de Cholesky do pai, e os filhos de um nó são
+    avaliados todos de uma vez.
+
+    Um filho com as features S e ainda podendo acrescentar as de R não gera descendente
+    com RSS abaixo de RSS(S ∪ R); se esse limite não bate o melhor já visto de nenhum
+    tamanho alcançável, o ramo é podado. Os limites de todos os filhos de um nó saem de uma
+    única fatoração, com as features restantes em ordem inversa (como nos leaps and bounds
+    de Furnival e Wilson). Os melhores começam pelo caminho da forward, e a ordem das
+    features (a de entrada na forward) faz os subconjuntos bons aparecerem cedo.
+
+    Com avaliar (um critério crescente no RSS e no tamanho, como criterio_selecao), a busca
+    só precisa achar o subconjunto de menor critério: poda também os ramos cujo limite, já
+    no menor tamanho alcançável, não bate o melhor critério visto. O caminho então traz o
+    ótimo do critério, mas nos demais tamanhos apenas o melhor subconjunto encontrado.
+
+    Args:
+        avaliar (callable, optional): avaliar(rss, tamanho) -> valor do critério
+
+    Returns:
+        tuple: (caminho, avaliados); caminho[k] = (índices, rss) do melhor subconjunto com
+            k features e avaliados é o número de subconjuntos visitados
+    """
+    p = len(correlacao)
+    max_features = p if max_features is None else min(max_features, p)
+    inicial, _ = busca_forward(gram, correlacao, soma_quadrados, max_features)
+    max_features = len(inicial) - 1
+    melhores = list(inicial)
+    melhores_rss = np.array([rss for _, rss in inicial])
+    tamanhos = np.arange(len(melhores_rss))
+
+    vistas = [j for indices, _ in inicial[1:] for j in indices[-1:]]
+    ordem = np.array(vistas + [j for j in range(p) if j not in vistas], dtype=np.intp)
+    avaliados = 0
+
+    def visitar(escolhidas, fator, z, rss, inicio):
+        nonlocal avaliados
+        k = len(escolhidas)
+        restantes = ordem[inicio:]
+        linhas, pivos, novos_z, validas = _acrescimos(fator, z, gram, correlacao, escolhidas, restantes)
+        rss_filhos = rss - novos_z ** 2
+        avaliados += int(validas.sum())
+        if validas.any():
+            i = int(np.argmin(np.where(validas, rss_filhos, np.inf)))
+            if rss_filhos[i] < melhores_rss[k + 1]:
+                melhores_rss[k + 1] = rss_filhos[i]
+                melhores[k + 1] = (tuple(escolhidas) + (int(restantes[i]),), rss_filhos[i])
+        if k + 1 >= max_features or len(restantes) < 2:
+            return
+
+        # Limite do filho i: RSS(S ∪ restantes[i:]), prefixos de S seguido de restantes invertido
+        limites = _limites_prefixos(gram, correlacao, soma_quadrados,
+                                    np.concatenate([np.array(escolhidas, dtype=np.intp), restantes[::-1]]))
+        limites = limites[k:][::-1]
+        if avaliar is not None:
+            melhor_valor = np.min(avaliar(melhores_rss, tamanhos))
+            validas = validas & (avaliar(limites, k + 2) < melhor_valor)
+        for i in np.flatnonzero(validas[:-1]):
+            # O filho i só chega a tamanhos de k + 2 a k + 1 + (features depois dele)
+            alcancaveis = slice(k + 2, min(max_features, k + len(restantes) - i) + 1)
+            if limites[i] >= melhores_rss[alcancaveis].max() * (1 - 1e-9):
+                continue
+            fator_filho, z_filho = _ampliar(fator, z, linhas[:, i], pivos[i], novos_z[i])
+            visitar(escolhidas + [int(restantes[i])], fator_filho, z_filho, rss_filhos[i], inicio + i + 1)
+
+    visitar([], np.zeros((0, 0)), np.zeros(0), soma_quadrados, 0)
+    return melhores, avaliados
+
+
+def criterio_selecao(rss, n, graus_liberdade, criterio=None):
+    """
+    AIC, BIC ou GCV de um ajuste de mínimos quadrados, como em metricas_analiticas.
+
+    Args:
+        rss (float | np.ndarray): Soma dos quadrados dos resíduos
+        n (int): Número de observações
+        graus_liberdade (float | np.ndarray): Parâmetros do ajuste (interceptos + features)
+        criterio (str, optional): 'aic', 'bic' ou 'gcv' (padrão: CRITERIO_SELECAO_FEATURES)
+
+    Returns:
+        float | np.ndarray: Valor do critério (menor é melhor)
+    """
+    criterio = criterio or CRITERIO_SELECAO_FEATURES
+    if criterio not in CRITERIOS_SELECAO:
+        raise ValueError(f"critério não suportado: {criterio} (use {', '.join(CRITERIOS_SELECAO)})")
+    rss = np.maximum(rss, np.finfo(float).tiny)
+    with np.errstate(divide='ignore'):
+        if criterio == 'gcv':
+            return np.where(graus_liberdade < n, (rss / n) / (1 - graus_liberdade / n) ** 2, np.inf)
+        penalidade = 2 if criterio == 'aic' else np.log(n)
+        return n * np.log(rss / n) + penalidade * (graus_liberdade + 1)
+
+
+_BUSCAS = {'forward': busca_forward, 'backward': busca_backward, 'exaustiva': busca_exaustiva}
+
+
+def selecionar_features(df, metodo='exaustiva', criterio=None, candidatas=None, max_features=MAX_FEATURES_SELECAO):
+    """
+    Escolhe as features do modelo de faturamento entre as candidatas, usando só o período de
+    treino de treinar_modelo (os primeiros 80% dos meses) para não olhar o teste.
+
+    Args:
+        df (pd.DataFrame): DataFrame com dados históricos de uma empresa
+        metodo (str): 'forward', 'backward' ou 'exaustiva' (branch-and-bound)
+        criterio (str, optional): 'aic', 'bic' ou 'gcv' (padrão: CRITERIO_SELECAO_FEATURES)
+        candidatas (list, optional): Subconjunto das candidatas de preparar_candidatos
+            (padrão: todas)
+        max_features (int, optional): Maior subconjunto avaliado; None e valores maiores
+            ficam limitados a (n_treino - interceptos) / OBSERVACOES_POR_FEATURE_SELECAO
+
+    Returns:
+        dict: 'features' (a escolha, pronta para treinar_modelo(df, features=...)), 'rss',
+            'valor_criterio', 'caminho' (DataFrame com o melhor subconjunto de cada tamanho)
+            e 'subconjuntos_avaliados'
+    """
+    if metodo not in _BUSCAS:
+        raise ValueError(f"método não suportado: {metodo} (use {', '.join(METODOS_SELECAO)})")
+    df_modelo, todas = preparar_candidatos(df)
+    candidatas = todas if candidatas is None else list(candidatas)
+
+    # Mesmo corte de treinar_modelo (train_test_split com test_size=0.2, sem embaralhar)
+    n_treino = len(df_modelo) - int(np.ceil(0.2 * len(df_modelo)))
+    treino = df_modelo.iloc[:n_treino]
+    gram, correlacao, soma_quadrados, num_meses = sistema_normal(
+        treino[candidatas].to_numpy(), treino['Faturamento'].to_numpy(), treino['Mes'].to_numpy()
+    )
+
+    # Longe da saturação: uma feature a cada OBSERVACOES_POR_FEATURE_SELECAO observações
+    # que sobram depois dos interceptos por mês
+    limite = (n_treino - num_meses) // OBSERVACOES_POR_FEATURE_SELECAO
+    max_features = limite if max_features is None else min(max_features, limite)
+
+    def avaliar(rss, tamanho):
+        return criterio_selecao(rss, n_treino, num_meses + tamanho, criterio)
+
+    if metodo == 'exaustiva':
+        caminho, avaliados = busca_exaustiva(gram, correlacao, soma_quadrados, max(max_features, 0), avaliar)
+    else:
+        caminho, avaliados = _BUSCAS[metodo](gram, correlacao, soma_quadrados, max(max_features, 0))
+
+    tamanhos = np.arange(len(caminho))
+    rss = np.array([valor for _, valor in caminho])
+    valores = avaliar(rss, tamanhos)
+    escolhido = int(np.argmin(valores))
+
+    tabela = pd.DataFrame({
+        'Num_Features': tamanhos,
+        'Features': [[candidatas[j] for j in indices] for indices, _ in caminho],
+        'RSS': rss,
+        'Criterio': valores
+    })
+    return {
+        'features': tabela['Features'].iloc[escolhido],
+        'rss': float(rss[escolhido]),
+        'valor_criterio': float(valores[escolhido]),
+        'caminho': tabela,
+        'subconjuntos_avaliados': avaliados
+    }
+
+
+def selecionar_features_frota(df_frota, metodo='exaustiva', criterio=None, candidatas=None,
+                              max_features=MAX_FEATURES_SELECAO):
+    """
+    selecionar_features para cada empresa de gerar_dados_frota.
+
+    Returns:
+        dict: {empresa: resultado de selecionar_features}
+    """
+    return {
+        empresa: selecionar_features(df_empresa, metodo, criterio, candidatas, max_features)
+        for empresa, df_empresa in df_frota.groupby('Empresa', sort=False)
+    }
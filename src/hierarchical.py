@@ -0,0 +1,258 @@
+"""
+Modelo hierárquico da frota: coeficientes globais com intercepto e inclinações por empresa
+parcialmente agrupados (modelo linear misto).
+
+    faturamento = intercepto_mes + x · (beta + b_empresa) + c_empresa + erro
+
+Os interceptos por mês (sazonalidade) e beta são comuns a todas as empresas; (c, b) de
+cada empresa são efeitos aleatórios com média zero e variâncias estimadas. Uma empresa
+com poucos meses fica perto do modelo global, e uma com histórico longo se aproxima do
+próprio ajuste.
+
+As equações do modelo misto (Henderson) têm a parte das empresas bloco-diagonal: um bloco
+q x q por empresa (q = 1 + inclinações). Cada iteração elimina os blocos por complemento
+de Schur com resoluções em lote, sem montar a matriz (linhas x empresas), e as somas por
+empresa são calculadas uma única vez. As variâncias saem do algoritmo EM.
+"""
+import numpy as np
+import pandas as pd
+from instrumentation import instrumentar
+from model import preparar_features, ModeloInterceptoMensal
+from config import FEATURES_INCLINACAO_ALEATORIA, MAX_ITER_HIERARQUICO, TOLERANCIA_HIERARQUICO
+
+__all__ = [
+    'ModeloHierarquico',
+    'treinar_modelo_hierarquico'
+]
+
+# Piso das variâncias dos efeitos aleatórios (escala padronizada): variância zero tornaria
+# a penalidade infinita; com o piso o efeito fica apenas praticamente nulo
+VARIANCIA_MINIMA = 1e-10
+
+
+def _empilhar_por_empresa(codigos, num_empresas, *colunas):
+    """
+    Empilha as linhas de cada empresa em arrays (empresas, n_max, ...) completados com zeros;
+    linhas zeradas não alteram as somas de produtos por empresa.
+    """
+    ordem = np.argsort(codigos, kind='stable')
+    tamanhos = np.bincount(codigos, minlength=num_empresas)
+    inicios = np.cumsum(tamanhos) - tamanhos
+    empresa = codigos[ordem]
+    posicao = np.arange(len(codigos)) - inicios[empresa]
+    pilhas = []
+    for coluna in colunas:
+        pilha = np.zeros((num_empresas, tamanhos.max()) + coluna.shape[1:], dtype=coluna.dtype)
+        pilha[empresa, posicao] = coluna[ordem]
+        pilhas.append(pilha)
+    return pilhas
+
+
+class ModeloHierarquico:
+    """
+    Regressão com interceptos por mês e coeficientes globais, mais intercepto e inclinações
+    aleatórias por empresa (agrupamento parcial).
+
+    Args:
+        inclinacoes (list, optional): Features com inclinação por empresa
+            (padrão: FEATURES_INCLINACAO_ALEATORIA presentes em X)
+        max_iter (int): Máximo de iterações do EM
+        tol (float): Variação das variâncias (escala padronizada) que encerra o EM
+
+    Atributos após fit:
+        coef_ (np.ndarray): Coeficientes globais das features
+        interceptos_mes_ (np.ndarray): Interceptos por mês do modelo global
+        efeitos_ (pd.DataFrame): Intercepto e inclinações de cada empresa (desvios do global)
+        variancias_ (dict): Variância residual e de cada efeito aleatório, na escala original
+            (as usadas na solução final)
+        n_iter_ (int): Iterações do EM
+    """
+
+    def __init__(self, inclinacoes=None, max_iter=MAX_ITER_HIERARQUICO, tol=TOLERANCIA_HIERARQUICO):
+        self.inclinacoes = inclinacoes
+        self.max_iter = max_iter
+        self.tol = tol
+
+    def fit(self, X, y, meses, empresas):
+        """
+        Args:
+            X (pd.DataFrame): Features (sem colunas de mês)
+            y (array-like): Alvo
+            meses (array-like): Mês (1 a 12) de cada linha
+            empresas (array-like): Empresa de cada linha
+        """
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        inclinacoes = self.inclinacoes
+        if inclinacoes is None:
+            inclinacoes = [nome for nome in FEATURES_INCLINACAO_ALEATORIA if nome in X.columns]
+        indices_inclinacao = [list(X.columns).index(nome) for nome in inclinacoes]
+
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        grupo = np.asarray(meses, dtype=np.intp) - 1
+        codigos, nomes = pd.factorize(np.asarray(empresas))
+        num_empresas, (n, p) = len(nomes), X.shape
+
+        # Escala padronizada: variâncias comparáveis entre features e EM bem condicionado
+        self._media_X, self._escala_X = X.mean(axis=0), X.std(axis=0)
+        self._escala_X[self._escala_X == 0] = 1
+        self._media_y, self._escala_y = y.mean(), y.std() or 1.0
+        X_padronizado = (X - self._media_X) / self._escala_X
+        y_padronizado = (y - self._media_y) / self._escala_y
+
+        # Efeitos fixos: um intercepto por mês presente e as features; aleatórios: 1 e as inclinações
+        presentes = np.bincount(grupo, minlength=12) > 0
+        fixos = np.hstack([(grupo[:, None] == np.flatnonzero(presentes)).astype(np.float64), X_padronizado])
+        aleatorios = np.hstack([np.ones((n, 1)), X_padronizado[:, indices_inclinacao]])
+        q = aleatorios.shape[1]
+
+        # Somas por empresa, constantes ao longo do EM
+        Z, F, Y = _empilhar_por_empresa(codigos, num_empresas, aleatorios, fixos, y_padronizado)
+        Zt = Z.transpose(0, 2, 1)
+        ZtZ, ZtF, Zty = Zt @ Z, Zt @ F, np.einsum('enq,en->eq', Z, Y)
+        FtF, Fty = fixos.T @ fixos, fixos.T @ y_padronizado
+
+        variancia_residual = 0.5
+        variancias = np.full(q, 0.1)
+        for iteracao in range(1, self.max_iter + 1):
+            # Blocos das empresas: A = ZᵀZ + σ² D⁻¹, eliminados por complemento de Schur
+            A_inversa = np.linalg.inv(ZtZ + variancia_residual * np.eye(q) / variancias)
+            A_inversa_ZtF = A_inversa @ ZtF
+            A_inversa_Zty = np.einsum('eqr,er->eq', A_inversa, Zty)
+            schur = FtF - np.einsum('eqf,eqg->fg', ZtF, A_inversa_ZtF)
+            beta = np.linalg.solve(schur, Fty - np.einsum('eqf,eq->f', ZtF, A_inversa_Zty))
+            efeitos = A_inversa_Zty - A_inversa_ZtF @ beta
+
+            # EM: esperança dos efeitos² e dos resíduos² dados os dados e as variâncias atuais
+            residuos = y_padronizado - fixos @ beta - np.einsum('nq,nq->n', aleatorios, efeitos[codigos])
+            traco = np.einsum('eqr,erq->', A_inversa, ZtZ)
+            nova_residual = (residuos @ residuos + variancia_residual * traco) / n
+            novas = np.maximum(
+                np.mean(efeitos ** 2 + variancia_residual * np.diagonal(A_inversa, axis1=1, axis2=2), axis=0),
+                VARIANCIA_MINIMA
+            )
+            # Variação absoluta na escala padronizada (variância total 1): variâncias que tendem
+            # a zero convergem devagar no EM, mas deixam de mudar as previsões
+            variacao = max(abs(nova_residual - variancia_residual), np.max(np.abs(novas - variancias)))
+            if variacao < self.tol:
+                break
+            variancia_residual, variancias = nova_residual, novas
+
+        self.n_iter_ = iteracao
+        self.inclinacoes_ = list(inclinacoes)
+        self.empresas_ = pd.Index(nomes, name='Empresa')
+
+        # Volta à escala original: coeficientes globais e desvios por empresa
+        escala_coef = self._escala_y / self._escala_X
+        self.coef_ = beta[-p:] * escala_coef
+        interceptos_mes = np.zeros(12)
+        interceptos_mes[presentes] = self._media_y + self._escala_y * beta[:-p]
+        interceptos_mes[~presentes] = interceptos_mes[int(np.argmax(presentes))]
+        self.interceptos_mes_ = interceptos_mes - self.coef_ @ self._media_X
+        self._mes_referencia = int(np.argmax(presentes))
+        self.intercept_ = float(self.interceptos_mes_[self._mes_referencia])
+
+        desvio_coef = np.zeros((num_empresas, p))
+        desvio_coef[:, indices_inclinacao] = efeitos[:, 1:] * escala_coef[indices_inclinacao]
+        self._coef_empresas = self.coef_ + desvio_coef
+        self._interceptos_empresas = (self.interceptos_mes_ + (self._escala_y * efeitos[:, :1])
+                                      - (desvio_coef @ self._media_X)[:, None])
+        self.efeitos_ = pd.DataFrame(
+            np.column_stack([self._escala_y * efeitos[:, 0], desvio_coef[:, indices_inclinacao]]),
+            index=pd.Index(nomes, name='Empresa'), columns=['Intercepto'] + self.inclinacoes_
+        )
+        self.variancias_ = {
+            'residual': variancia_residual * self._escala_y ** 2,
+            'Intercepto': variancias[0] * self._escala_y ** 2,
+            **{nome: variancias[1 + k] * escala_coef[j] ** 2 for k, (nome, j) in enumerate(zip(inclinacoes, indices_inclinacao))}
+        }
+        return self
+
+    def modelo_empresa(self, empresa):
+        """
+        Modelo de uma empresa no formato de ModeloInterceptoMensal, pronto para
+        compilar_modelo e fazer_previsao. Empresas fora do ajuste recebem o modelo global.
+        """
+        modelo = ModeloInterceptoMensal(dtype='float64')
+        modelo.feature_names_in_ = self.feature_names_in_
+        modelo.n_features_in_ = len(self.feature_names_in_)
+        posicao = self.empresas_.get_indexer([empresa])[0]
+        if posicao < 0:
+            modelo.coef_ = self.coef_.copy()
+            modelo.interceptos_mes_ = self.interceptos_mes_.copy()
+        else:
+            modelo.coef_ = self._coef_empresas[posicao]
+            modelo.interceptos_mes_ = self._interceptos_empresas[posicao]
+        modelo.intercept_ = float(modelo.interceptos_mes_[self._mes_referencia])
+        return modelo
+
+    def predict(self, X, meses=None, empresas=None):
+        """
+        Args:
+            X (pd.DataFrame): Features; pode trazer as colunas 'Mes' e 'Empresa'
+            meses (array-like, optional): Mês de cada linha (padrão: coluna 'Mes')
+            empresas (array-like, optional): Empresa de cada linha (padrão: coluna 'Empresa');
+                empresas fora do ajuste usam o modelo global
+
+        Returns:
+            np.ndarray: Valores previstos
+        """
+        meses = X['Mes'] if meses is None else meses
+        empresas = X['Empresa'] if empresas is None else empresas
+        grupo = np.asarray(meses, dtype=np.intp) - 1
+        X = np.asarray(X[list(self.feature_names_in_)], dtype=np.float64)
+
+        posicao = self.empresas_.get_indexer(np.asarray(empresas))
+        conhecidas = posicao >= 0
+        previsto = X @ self.coef_ + self.interceptos_mes_[grupo]
+        linhas = posicao[conhecidas]
+        previsto[conhecidas] = (np.einsum('np,np->n', X[conhecidas], self._coef_empresas[linhas])
+                                + self._interceptos_empresas[linhas, grupo[conhecidas]])
+        return previsto
+
+
+@instrumentar
+def treinar_modelo_hierarquico(df_frota, inclinacoes=None):
+    """
+    Treina o modelo hierárquico sobre a frota, com a mesma divisão treino/teste de
+    treinar_modelo dentro de cada empresa (os últimos 20% dos meses de cada uma no teste).
+
+    Args:
+        df_frota (pd.DataFrame): Históricos com a coluna 'Empresa'; as empresas podem ter
+            números de meses diferentes
+        inclinacoes (list, optional): Features com inclinação por empresa
+            (padrão: FEATURES_INCLINACAO_ALEATORIA)
+
+    Returns:
+        tuple: (modelo, feature_names, metricas); metricas é um DataFrame com uma linha por
+            empresa ('r2', 'mae', 'rmse', 'mape' no teste e 'meses_treino')
+    """
+    df_modelo, feature_names = preparar_features(df_frota)
+    por_empresa = df_modelo.groupby('Empresa', sort=False)
+    tamanho = por_empresa['Empresa'].transform('size').to_numpy()
+    treino = por_empresa.cumcount().to_numpy() < tamanho - np.ceil(0.2 * tamanho)
+
+    df_treino = df_modelo[treino]
+    modelo = ModeloHierarquico(inclinacoes).fit(
+        df_treino[feature_names], df_treino['Faturamento'], df_treino['Mes'], df_treino['Empresa']
+    )
+
+    df_teste = df_modelo[~treino]
+    y = df_teste['Faturamento'].to_numpy()
+    erro = y - modelo.predict(df_teste)
+    tabela = pd.DataFrame({
+        'Empresa': df_teste['Empresa'].to_numpy(),
+        'y': y, 'y2': y ** 2, 'erro2': erro ** 2, 'erro_abs': np.abs(erro), 'erro_pct': np.abs(erro / y)
+    }).groupby('Empresa', sort=False)
+    soma, contagem = tabela.sum(), tabela.size()
+    sst = soma['y2'] - soma['y'] ** 2 / contagem
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(sst > 0, 1 - soma['erro2'] / sst, np.nan)
+    metricas = pd.DataFrame({
+        'r2': r2,
+        'mae': soma['erro_abs'] / contagem,
+        'rmse': np.sqrt(soma['erro2'] / contagem),
+        'mape': soma['erro_pct'] / contagem * 100,
+    }, index=soma.index)
+    metricas['meses_treino'] = df_treino.groupby('Empresa', sort=False).size()
+    return modelo, feature_names, metricas
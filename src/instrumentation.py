@@ -0,0 +1,220 @@
+"""
+Instrumentação leve: spans de tempo por etapa, agregados em contagem e percentis.
+
+Desligada por padrão. Ligue com a variável de ambiente INSTRUMENTACAO=1, com
+ativar_instrumentacao() ou, nos apps, abrindo a URL com ?perf=1 (que também
+exibe o painel de desempenho na barra lateral). Desligada, cada span custa uma
+checagem de flag.
+"""
+import functools
+import json
+import platform
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from config import INSTRUMENTACAO_ATIVA
+
+# Durações recentes mantidas por etapa para os percentis
+AMOSTRAS_POR_ETAPA = 5000
+
+_estado = {'ativa': INSTRUMENTACAO_ATIVA}
+_etapas = {}
+_trava = threading.Lock()
+
+
+class _Etapa:
+    __slots__ = ('contagem', 'total', 'duracoes')
+
+    def __init__(self):
+        self.contagem = 0
+        self.total = 0.0
+        self.duracoes = deque(maxlen=AMOSTRAS_POR_ETAPA)
+
+
+def ativar_instrumentacao(ativa=True):
+    _estado['ativa'] = ativa
+
+
+def instrumentacao_ativa():
+    return _estado['ativa']
+
+
+def registrar(nome, segundos):
+    """Acumula uma duração na etapa informada."""
+    with _trava:
+        etapa = _etapas.get(nome)
+        if etapa is None:
+            etapa = _etapas[nome] = _Etapa()
+        etapa.contagem += 1
+        etapa.total += segundos
+        etapa.duracoes.append(segundos)
+
+
+class _Span:
+    __slots__ = ('nome', 'inicio')
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.nome, time.perf_counter() - self.inicio)
+        return False
+
+
+class _SpanNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+def medir(nome):
+    """
+    Context manager que mede o bloco como a etapa `nome`.
+
+    Exemplo:
+        with medir('app.carregar_dados'):
+            dados = carregar_dados()
+    """
+    return _Span(nome) if _estado['ativa'] else _SPAN_NULO
+
+
+def instrumentar(funcao=None, nome=None):
+    """
+    Decorador que mede cada chamada da função. O nome padrão da etapa é
+    'modulo.funcao'. Aceita @instrumentar e @instrumentar(nome='...').
+    """
+    def decorar(f):
+        etapa = nome or f'{f.__module__}.{f.__name__}'
+
+        @functools.wraps(f)
+        def envolvida(*args, **kwargs):
+            if not _estado['ativa']:
+                return f(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                registrar(etapa, time.perf_counter() - inicio)
+
+        return envolvida
+
+    return decorar(funcao) if funcao is not None else decorar
+
+
+def iniciar_medicao():
+    """Marca o início de uma etapa que não cabe em um bloco with (None se desligada)."""
+    return time.perf_counter() if _estado['ativa'] else None
+
+
+def finalizar_medicao(nome, inicio):
+    if inicio is not None:
+        registrar(nome, time.perf_counter() - inicio)
+
+
+def limpar_metricas():
+    with _trava:
+        _etapas.clear()
+
+
+def resumo_metricas():
+    """
+    Returns:
+        dict: {etapa: {'contagem', 'total_s', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}}
+    """
+    with _trava:
+        copias = {nome: (e.contagem, e.total, np.asarray(e.duracoes)) for nome, e in _etapas.items()}
+
+    resumo = {}
+    for nome, (contagem, total, duracoes) in sorted(copias.items()):
+        p50, p95, p99 = np.percentile(duracoes, [50, 95, 99]) * 1000
+        resumo[nome] = {
+            'contagem': contagem,
+            'total_s': total,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(duracoes.max() * 1000)
+        }
+    return resumo
+
+
+def exportar_prometheus(prefixo='analise_preditiva'):
+    """Métricas no formato texto do Prometheus (summary por etapa, em segundos)."""
+    metrica = f'{prefixo}_etapa_segundos'
+    linhas = [
+        f'# HELP {metrica} Duração das etapas instrumentadas.',
+        f'# TYPE {metrica} summary'
+    ]
+    for nome, m in resumo_metricas().items():
+        rotulo = nome.replace('\\', '\\\\').replace('"', '\\"')
+        for quantil, chave in (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms')):
+            linhas.append(f'{metrica}{{etapa="{rotulo}",quantile="{quantil}"}} {m[chave] / 1000:.9g}')
+        linhas.append(f'{metrica}_sum{{etapa="{rotulo}"}} {m["total_s"]:.9g}')
+        linhas.append(f'{metrica}_count{{etapa="{rotulo}"}} {m["contagem"]}')
+    return '\n'.join(linhas) + '\n'
+
+
+def exportar_json(caminho=None, extras=None):
+    """
+    Dump JSON das métricas, com horário e máquina. Grava em `caminho` se informado.
+
+    Returns:
+        str: Documento JSON
+    """
+    documento = {
+        'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'maquina': {'python': platform.python_version(), 'plataforma': platform.platform()},
+        'etapas': resumo_metricas()
+    }
+    if extras:
+        documento.update(extras)
+    texto = json.dumps(documento, indent=2, ensure_ascii=False)
+    if caminho is not None:
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto)
+    return texto
+
+
+def exibir_painel_desempenho(extras=None):
+    """
+    Painel de desempenho para os apps Streamlit: tabela por etapa e downloads
+    em JSON e Prometheus. `extras` são dicionários de métricas adicionais por título.
+    """
+    import pandas as pd
+    import streamlit as st
+
+    with st.expander("⏱️ Desempenho", expanded=False):
+        resumo = resumo_metricas()
+        if resumo:
+            tabela = pd.DataFrame.from_dict(resumo, orient='index')
+            st.dataframe(tabela.round(3), use_container_width=True)
+        else:
+            st.caption("Nenhuma etapa medida ainda.")
+
+        for titulo, metricas in (extras or {}).items():
+            st.markdown(f"**{titulo}**")
+            st.json(metricas, expanded=False)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", exportar_json(extras=extras), file_name='metricas_desempenho.json',
+                               mime='application/json', use_container_width=True)
+        with col2:
+            st.download_button("Prometheus", exportar_prometheus(), file_name='metricas_desempenho.prom',
+                               mime='text/plain', use_container_width=True)
+        if st.button("Limpar métricas", use_container_width=True):
+            limpar_metricas()
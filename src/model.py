@@ -1,29 +1,37 @@
 """
 Módulo para treinamento e gestão do modelo de Machine Learning.
 """
+import itertools
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
+from instrumentation import instrumentar
+from utils import resolver_dtype
+from regularization import grade_alphas, caminho_ridge, caminho_elasticnet, divisoes_temporais, NUM_ALPHAS_PADRAO
+from config import (
+    PENALIDADE_MODELO, PENALIDADES_MODELO, L1_RATIO_ELASTICNET, DIVISOES_CV_TEMPORAL, MESES_MINIMOS_TREINO_CV,
+    FEATURES_MODELO, VARIAVEIS_INTERACAO
+)
 
 
-def treinar_modelo(df):
+def preparar_features(df):
     """
-    Prepara os dados e treina o modelo de regressão linear múltipla para previsão de faturamento.
-    Inclui engenharia de features para maximizar R².
+    Aplica a engenharia de features usada pelo modelo sobre o histórico.
     
     Args:
-        df (pd.DataFrame): DataFrame com dados históricos
+        df (pd.DataFrame): DataFrame com dados históricos; com a coluna 'Empresa'
+            (gerar_dados_frota), defasagens e tendência são calculadas dentro de cada empresa
     
     Returns:
-        tuple: (modelo, feature_names, metricas, X_train, X_test, y_train, y_test)
+        tuple: (df_modelo, feature_names) com defasagens, interações e tendência. O mês fica
+            na coluna 'Mes' e entra no modelo como intercepto por mês (ModeloInterceptoMensal)
     """
     
     # Criar variável de faturamento do mês anterior
     df_modelo = df.copy()
-    df_modelo['Faturamento_Mes_Ant'] = df_modelo['Faturamento'].shift(1)
-    df_modelo['Sinistralidade_Mes_Ant'] = df_modelo['Sinistralidade_Realizada'].shift(1)
+    por_empresa = df_modelo.groupby('Empresa', sort=False) if 'Empresa' in df_modelo else None
+    anterior = df_modelo if por_empresa is None else por_empresa
+    df_modelo['Faturamento_Mes_Ant'] = anterior['Faturamento'].shift(1)
+    df_modelo['Sinistralidade_Mes_Ant'] = anterior['Sinistralidade_Realizada'].shift(1)
     
     # Remover primeira linha (sem mês anterior)
     df_modelo = df_modelo.dropna()
@@ -34,7 +42,10 @@ def treinar_modelo(df):
     df_modelo['Volume_x_Ticket'] = df_modelo['Qtd_Atendimentos'] * df_modelo['Ticket_Medio']
     
     # Tendência temporal simples
-    df_modelo['Tendencia'] = np.arange(len(df_modelo))
+    if por_empresa is None:
+        df_modelo['Tendencia'] = np.arange(len(df_modelo))
+    else:
+        df_modelo['Tendencia'] = df_modelo.groupby('Empresa', sort=False).cumcount()
     
     # Selecionar features principais
     features_base = [
@@ -49,21 +60,315 @@ def treinar_modelo(df):
     
     all_features = features_base + features_engenheiradas
     
-    # Criar variáveis dummy para os meses (sazonalidade adicional)
-    df_modelo_dummies = pd.get_dummies(df_modelo, columns=['Mes'], prefix='Mes', drop_first=True)
-    mes_features = [col for col in df_modelo_dummies.columns if col.startswith('Mes_')]
-    all_features.extend(mes_features)
+    return df_modelo, all_features
+
+
+def preparar_candidatos(df):
+    """
+    Conjunto de candidatas da seleção de features (feature_selection): as features de
+    preparar_features (defasagens, Volume_x_Ticket e tendência), FEATURES_MODELO e as
+    interações 'A_x_B' entre pares de VARIAVEIS_INTERACAO, que montar_vetor_entrada
+    também sabe calcular a partir dos inputs.
+    
+    Args:
+        df (pd.DataFrame): DataFrame com dados históricos
+    
+    Returns:
+        tuple: (df_modelo, candidatas)
+    """
+    df_modelo, all_features = preparar_features(df)
+    candidatas = list(dict.fromkeys(all_features + FEATURES_MODELO))
+    
+    interacoes = {}
+    for a, b in itertools.combinations(VARIAVEIS_INTERACAO, 2):
+        # Qtd_Atendimentos x Ticket_Medio já é Volume_x_Ticket
+        if {a, b} == {'Qtd_Atendimentos', 'Ticket_Medio'}:
+            continue
+        interacoes[f'{a}_x_{b}'] = df_modelo[a] * df_modelo[b]
+    df_modelo = pd.concat([df_modelo, pd.DataFrame(interacoes, index=df_modelo.index)], axis=1)
+    
+    return df_modelo, candidatas + list(interacoes)
+
+
+def _fatores_interacao(feature_names):
+    """Interações 'A_x_B' de preparar_candidatos presentes em feature_names: {nome: (A, B)}."""
+    fatores = {}
+    for nome in feature_names:
+        partes = nome.split('_x_')
+        if len(partes) == 2 and all(parte in VARIAVEIS_INTERACAO for parte in partes):
+            fatores[nome] = tuple(partes)
+    return fatores
+
+
+def _indices_meses(meses):
+    """Posições na tabela de interceptos (mês - 1); ValueError se algum mês não for inteiro de 1 a 12."""
+    valores = np.asarray(meses)
+    if valores.dtype.kind not in 'iu':
+        # Converter direto para inteiro truncaria 2.7 em 2; só valores inteiros passam
+        try:
+            reais = valores.astype(np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f"mes_prev deve ser um inteiro entre 1 e 12; recebido {np.ravel(valores).tolist()[0]!r}") from None
+        invalidos = ~np.isfinite(reais) | (reais < 1) | (reais > 12) | (reais != np.round(reais))
+    else:
+        invalidos = (valores < 1) | (valores > 12)
+    if np.any(invalidos):
+        primeiro = np.ravel(valores)[np.ravel(invalidos)].tolist()[0]
+        raise ValueError(f"mes_prev deve ser um inteiro entre 1 e 12; recebido {primeiro!r}")
+    return valores.astype(np.intp) - 1
+
+
+def _medias_por_mes(X, y, grupo):
+    """Médias por mês (12 posições) de X e y e a máscara dos meses presentes."""
+    # Um bincount por coluna; bincount acumula em float64
+    contagem = np.bincount(grupo, minlength=12)
+    presentes = contagem > 0
+    divisor = np.where(presentes, contagem, 1)
+    media_y = (np.bincount(grupo, weights=y, minlength=12) / divisor).astype(X.dtype)
+    media_X = (np.column_stack([
+        np.bincount(grupo, weights=X[:, j], minlength=12) for j in range(X.shape[1])
+    ]) / divisor[:, None]).astype(X.dtype)
+    return media_X, media_y, presentes
+
+
+def _tabela_interceptos(media_X, media_y, presentes, coef):
+    """
+    Interceptos por mês para um vetor de coeficientes (12,) ou um caminho (n_alphas, 12).
+    Meses ausentes no treino ficam com o do mês de referência (o primeiro presente),
+    como aconteceria com uma dummy sempre zero.
+    """
+    interceptos = media_y - coef @ media_X.T
+    referencia = int(np.argmax(presentes))
+    return np.where(presentes, interceptos, interceptos[..., referencia:referencia + 1])
+
+
+class ModeloInterceptoMensal:
+    """
+    Regressão linear com um intercepto por mês do ano (sazonalidade categórica).
+    
+    Equivale a LinearRegression sobre as features mais 11 dummies de mês (drop_first),
+    com as mesmas previsões, mas sem alargar a matriz: os coeficientes são estimados
+    sobre os dados centrados dentro de cada mês e os interceptos ficam em uma tabela
+    de 12 posições, consultada na previsão.
+    
+    Args:
+        dtype (str, optional): Precisão do ajuste e da previsão, 'float32' ou 'float64'
+            (padrão: DTYPE_CALCULO)
+    
+    Atributos após fit:
+        coef_ (np.ndarray): Coeficientes das features
+        intercept_ (float): Intercepto do mês de referência (o primeiro mês do treino)
+        interceptos_mes_ (np.ndarray): Intercepto de cada mês, posição mes - 1
+        feature_names_in_ (np.ndarray): Nomes das features, quando X é um DataFrame
+    """
+
+    def __init__(self, dtype=None):
+        self.dtype = dtype
+
+    def fit(self, X, y, meses):
+        """
+        Args:
+            X (pd.DataFrame | np.ndarray): Features (sem colunas de mês)
+            y (array-like): Alvo
+            meses (array-like): Mês (1 a 12) de cada linha
+        """
+        X, y, grupo = self._preparar(X, y, meses)
+        media_X, media_y, presentes = _medias_por_mes(X, y, grupo)
+        
+        # Coeficientes sobre os dados centrados no próprio mês (Frisch-Waugh-Lovell)
+        self.coef_ = np.linalg.lstsq(X - media_X[grupo], y - media_y[grupo], rcond=None)[0]
+        self._definir_interceptos(_tabela_interceptos(media_X, media_y, presentes, self.coef_), presentes)
+        return self
+
+    def _preparar(self, X, y, meses):
+        """Converte as entradas do fit para arrays na precisão do modelo."""
+        if isinstance(X, pd.DataFrame):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        dtype = resolver_dtype(self.dtype)
+        X = np.asarray(X, dtype=dtype)
+        self.n_features_in_ = X.shape[1]
+        return X, np.asarray(y, dtype=dtype), np.asarray(meses, dtype=np.intp) - 1
+
+    def _definir_interceptos(self, interceptos_mes, presentes):
+        self.interceptos_mes_ = interceptos_mes
+        self.intercept_ = float(interceptos_mes[int(np.argmax(presentes))])
+
+    def predict(self, X, meses=None):
+        """
+        Args:
+            X (pd.DataFrame | np.ndarray): Features; um DataFrame pode trazer a coluna 'Mes'
+            meses (array-like, optional): Mês de cada linha (padrão: coluna 'Mes' de X)
+        
+        Returns:
+            np.ndarray: Valores previstos
+        """
+        if isinstance(X, pd.DataFrame):
+            if meses is None:
+                meses = X['Mes']
+            if hasattr(self, 'feature_names_in_'):
+                X = X[list(self.feature_names_in_)]
+        if meses is None:
+            raise ValueError("informe os meses (argumento meses ou coluna 'Mes')")
+        X = np.asarray(X, dtype=self.coef_.dtype)
+        return X @ self.coef_ + self.interceptos_mes_[_indices_meses(meses)]
+
+
+class ModeloRegularizado(ModeloInterceptoMensal):
+    """
+    ModeloInterceptoMensal com penalidade Ridge, Lasso ou ElasticNet nos coeficientes das
+    features; os interceptos por mês não são penalizados.
+    
+    Features e alvo são centrados no mês e padronizados antes da penalidade, de modo que
+    alpha não depende da unidade do faturamento; os coeficientes voltam à escala original.
+    O caminho inteiro de alphas sai de uma única SVD (Ridge) ou da descida por coordenadas
+    com partida a quente (Lasso/ElasticNet), e o alpha é o de menor erro quadrático médio
+    na validação cruzada temporal. Com o mesmo formato de ModeloInterceptoMensal, entra
+    direto em compilar_modelo e fazer_previsao.
+    
+    Args:
+        penalidade (str): 'ridge', 'lasso' ou 'elasticnet'
+        alpha (float, optional): Alpha fixo; se omitido, escolhido por validação cruzada
+        l1_ratio (float): Mistura L1/L2 do ElasticNet (a Ridge usa 0 e o Lasso 1)
+        num_alphas (int): Tamanho da grade de alphas
+        num_divisoes (int): Divisões da validação cruzada temporal
+        dtype (str, optional): Precisão do ajuste e da previsão (padrão: DTYPE_CALCULO)
+    
+    Atributos após fit, além dos de ModeloInterceptoMensal:
+        alpha_ (float): Alpha do modelo final (na escala padronizada)
+        alphas_ (np.ndarray): Grade de alphas, em ordem decrescente
+        caminho_coef_ (np.ndarray): Coeficientes (escala original) para cada alpha da grade
+        erro_cv_ (np.ndarray | None): MSE médio da validação cruzada por alpha (None com alpha fixo)
+    """
+
+    def __init__(self, penalidade='ridge', alpha=None, l1_ratio=L1_RATIO_ELASTICNET, num_alphas=NUM_ALPHAS_PADRAO,
+                 num_divisoes=DIVISOES_CV_TEMPORAL, dtype=None):
+        if penalidade not in ('ridge', 'lasso', 'elasticnet'):
+            raise ValueError(f"penalidade deve ser 'ridge', 'lasso' ou 'elasticnet', não '{penalidade}'")
+        super().__init__(dtype=dtype)
+        self.penalidade = penalidade
+        self.alpha = alpha
+        self.l1_ratio = {'ridge': 0.0, 'lasso': 1.0}.get(penalidade, l1_ratio)
+        self.num_alphas = num_alphas
+        self.num_divisoes = num_divisoes
+
+    def fit(self, X, y, meses):
+        """
+        Args:
+            X (pd.DataFrame | np.ndarray): Features (sem colunas de mês), em ordem temporal
+            y (array-like): Alvo
+            meses (array-like): Mês (1 a 12) de cada linha
+        """
+        X, y, grupo = self._preparar(X, y, meses)
+        
+        if self.alpha is None:
+            X_padronizado, y_centrado, *_ = self._centrar_padronizar(X, y, grupo)
+            alphas = grade_alphas(X_padronizado, y_centrado, self.l1_ratio, self.num_alphas)
+            
+            # Validação cruzada temporal: o caminho inteiro é ajustado uma vez por divisão
+            divisoes = divisoes_temporais(len(y), self.num_divisoes, min(MESES_MINIMOS_TREINO_CV, len(y) // 2))
+            erro = np.zeros(len(alphas))
+            for fim_treino, fim_validacao in divisoes:
+                coefs, interceptos = self._caminho(X[:fim_treino], y[:fim_treino], grupo[:fim_treino], alphas)
+                validacao = slice(fim_treino, fim_validacao)
+                previsto = X[validacao] @ coefs.T + interceptos[:, grupo[validacao]].T
+                erro += np.mean((y[validacao, None] - previsto) ** 2, axis=0)
+            self.erro_cv_ = erro / len(divisoes)
+            escolhido = int(np.argmin(self.erro_cv_))
+        else:
+            alphas = np.array([self.alpha], dtype=X.dtype)
+            self.erro_cv_ = None
+            escolhido = 0
+        
+        coefs, interceptos = self._caminho(X, y, grupo, alphas)
+        self.alphas_ = alphas
+        self.alpha_ = float(alphas[escolhido])
+        self.caminho_coef_ = coefs
+        self.coef_ = coefs[escolhido]
+        self._definir_interceptos(interceptos[escolhido], np.bincount(grupo, minlength=12) > 0)
+        return self
+
+    @staticmethod
+    def _centrar_padronizar(X, y, grupo):
+        media_X, media_y, presentes = _medias_por_mes(X, y, grupo)
+        X_centrado = X - media_X[grupo]
+        y_centrado = y - media_y[grupo]
+        escala = X_centrado.std(axis=0)
+        escala[escala == 0] = 1
+        escala_y = y_centrado.std() or 1.0
+        return X_centrado / escala, y_centrado / escala_y, escala / escala_y, media_X, media_y, presentes
+
+    def _caminho(self, X, y, grupo, alphas):
+        """Coeficientes (n_alphas, n_features) e interceptos (n_alphas, 12) ao longo da grade."""
+        X_padronizado, y_centrado, escala, media_X, media_y, presentes = self._centrar_padronizar(X, y, grupo)
+        if self.l1_ratio == 0:
+            coefs = caminho_ridge(X_padronizado, y_centrado, alphas)
+        else:
+            coefs = caminho_elasticnet(X_padronizado, y_centrado, alphas, self.l1_ratio)
+        coefs = coefs / escala
+        return coefs, _tabela_interceptos(media_X, media_y, presentes, coefs)
+
+
+def criar_modelo(penalidade=None, dtype=None):
+    """
+    Instancia o modelo de faturamento para a penalidade escolhida.
+    
+    Args:
+        penalidade (str, optional): 'ols', 'ridge', 'lasso' ou 'elasticnet' (padrão: PENALIDADE_MODELO)
+        dtype (str, optional): Precisão do ajuste (padrão: DTYPE_CALCULO)
+    
+    Returns:
+        ModeloInterceptoMensal | ModeloRegularizado: Modelo ainda não ajustado
+    """
+    penalidade = penalidade or PENALIDADE_MODELO
+    if penalidade not in PENALIDADES_MODELO:
+        raise ValueError(f"penalidade não suportada: {penalidade} (use {', '.join(PENALIDADES_MODELO)})")
+    if penalidade == 'ols':
+        return ModeloInterceptoMensal(dtype=dtype)
+    return ModeloRegularizado(penalidade, dtype=dtype)
+
+
+@instrumentar
+def treinar_modelo(df, dtype=None, penalidade=None, features=None):
+    """
+    Prepara os dados e treina o modelo de regressão linear múltipla para previsão de faturamento.
+    Inclui engenharia de features para maximizar R².
     
-    # Separar features e target
-    X = df_modelo_dummies[all_features]
-    y = df_modelo_dummies['Faturamento']
+    Args:
+        df (pd.DataFrame): DataFrame com dados históricos
+        dtype (str, optional): Precisão do ajuste, 'float32' ou 'float64' (padrão: DTYPE_CALCULO)
+        penalidade (str, optional): 'ols', 'ridge', 'lasso' ou 'elasticnet' (padrão: PENALIDADE_MODELO);
+            nas penalizadas o alpha é escolhido por validação cruzada temporal no treino
+        features (list, optional): Subconjunto das candidatas de preparar_candidatos, por
+            exemplo o escolhido por feature_selection.selecionar_features (padrão: as
+            features de preparar_features)
+    
+    Returns:
+        tuple: (modelo, feature_names, metricas, X_train, X_test, y_train, y_test);
+            X_train e X_test trazem as features e a coluna 'Mes'
+    """
+    # sklearn só é necessário no treino; quem apenas pontua não paga a importação
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
+    
+    if features is None:
+        df_modelo, all_features = preparar_features(df)
+    else:
+        df_modelo, candidatas = preparar_candidatos(df)
+        desconhecidas = [nome for nome in features if nome not in candidatas]
+        if desconhecidas:
+            raise ValueError(f"features fora das candidatas: {', '.join(desconhecidas)}")
+        all_features = list(features)
+    
+    # Separar features e target (o mês segue junto, como índice da tabela de interceptos)
+    X = df_modelo[all_features + ['Mes']]
+    y = df_modelo['Faturamento']
     
     # Dividir em treino e teste (80% treino, 20% teste)
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, shuffle=False)
     
-    # Treinar modelo
-    modelo = LinearRegression(fit_intercept=True, copy_X=True)
-    modelo.fit(X_train, y_train)
+    # Treinar modelo (intercepto por mês no lugar das dummies)
+    modelo = criar_modelo(penalidade, dtype)
+    modelo.fit(X_train[all_features], y_train, X_train['Mes'])
     
     # Calcular métricas no conjunto de teste
     y_pred_test = modelo.predict(X_test)
@@ -85,53 +390,456 @@ def treinar_modelo(df):
         'rmse': rmse,
         'mape': mape
     }
+    if hasattr(modelo, 'alpha_'):
+        metricas['alpha'] = modelo.alpha_
+    
+    # Leave-one-out, GCV e AIC/BIC do próprio ajuste, sem reajustar
+    metricas.update(avaliar_ajuste(modelo, X_train[all_features], y_train, X_train['Mes']))
     
     return modelo, all_features, metricas, X_train, X_test, y_train, y_test
 
 
-def fazer_previsao(modelo, feature_names, inputs):
+def _alavancagem_dentro_mes(X_centrado, penalidade_l2=0.0):
     """
-    Realiza previsão de faturamento com base nos inputs fornecidos.
-    Inclui cálculo de features engenheiradas.
+    Diagonal e traço da matriz hat da parte dentro do mês, X (XᵀX + λI)⁻¹ Xᵀ, a partir de
+    uma SVD. Aceita pilhas (..., n, p) de várias empresas.
+    """
+    if X_centrado.shape[-1] == 0:
+        return np.zeros(X_centrado.shape[:-1], dtype=X_centrado.dtype), np.zeros(X_centrado.shape[:-2])
+    U, s, _ = np.linalg.svd(X_centrado, full_matrices=False)
+    if penalidade_l2 > 0:
+        fator = s ** 2 / (s ** 2 + penalidade_l2)
+    else:
+        # Mesmo corte de posto do lstsq: direções com valor singular desprezível não contam
+        corte = s[..., :1] * max(X_centrado.shape[-2:]) * np.finfo(X_centrado.dtype).eps
+        fator = (s > corte).astype(X_centrado.dtype)
+    return np.einsum('...ik,...k->...i', U ** 2, fator), fator.sum(axis=-1)
+
+
+def metricas_analiticas(y, residuos, alavancagem, graus_liberdade):
+    """
+    Métricas de generalização de um único ajuste linear, sem reajustes: resíduos
+    leave-one-out e_i / (1 - h_i) (PRESS), validação cruzada generalizada (GCV) e AIC/BIC
+    gaussianos com os graus de liberdade efetivos (traço da matriz hat).
+    Vetorizada: arrays (..., n) avaliam várias empresas de uma vez.
+    
+    Linhas com alavancagem 1 (mês com uma única observação no treino, cujo intercepto
+    existe só por causa dela) não têm resíduo leave-one-out e ficam fora do PRESS; em
+    históricos curtos, sem nenhuma linha válida, as métricas LOO são NaN.
+    
+    Args:
+        y (np.ndarray): Alvo do ajuste (..., n)
+        residuos (np.ndarray): y - previsto no próprio ajuste (..., n)
+        alavancagem (np.ndarray): Diagonal da matriz hat (..., n)
+        graus_liberdade (float | np.ndarray): Traço da matriz hat
+    
+    Returns:
+        dict: 'press', 'rmse_loo', 'mae_loo', 'r2_loo', 'gcv', 'aic', 'bic', 'graus_liberdade'
+    """
+    n = residuos.shape[-1]
+    validos = 1 - alavancagem > 1e-8
+    loo = np.where(validos, residuos / np.where(validos, 1 - alavancagem, 1), 0)
+    num_validos = validos.sum(axis=-1)
+    
+    press = np.sum(loo ** 2, axis=-1)
+    rss = np.sum(residuos ** 2, axis=-1)
+    tss = np.sum((y - y.mean(axis=-1, keepdims=True)) ** 2, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gcv = (rss / n) / (1 - graus_liberdade / n) ** 2
+        log_verossimilhanca = n * np.log(rss / n)
+        mse_loo = np.where(num_validos > 0, press / num_validos, np.nan)[()]
+        mae_loo = np.where(num_validos > 0, np.sum(np.abs(loo), axis=-1) / num_validos, np.nan)[()]
+        r2_loo = 1 - mse_loo / (tss / n)
+    return {
+        'press': press,
+        'rmse_loo': np.sqrt(mse_loo),
+        'mae_loo': mae_loo,
+        'r2_loo': r2_loo,
+        'gcv': gcv,
+        'aic': log_verossimilhanca + 2 * (graus_liberdade + 1),
+        'bic': log_verossimilhanca + np.log(n) * (graus_liberdade + 1),
+        'graus_liberdade': graus_liberdade
+    }
+
+
+def avaliar_ajuste(modelo, X, y, meses=None):
+    """
+    Métricas analíticas (metricas_analiticas) de um modelo sobre os dados do próprio ajuste.
+    A alavancagem soma 1/n_mes (intercepto do mês) à da parte dentro do mês: mínimos
+    quadrados, Ridge (com a contração de cada direção) ou, no Lasso e ElasticNet, a
+    aproximação usual restrita às features ativas.
+    
+    Args:
+        modelo (ModeloInterceptoMensal | ModeloRegularizado): Modelo ajustado sobre X, y
+        X (pd.DataFrame | np.ndarray): Features do ajuste; um DataFrame pode trazer 'Mes'
+        y (array-like): Alvo do ajuste
+        meses (array-like, optional): Mês de cada linha (padrão: coluna 'Mes' de X)
+    
+    Returns:
+        dict: Métricas como float
+    """
+    if isinstance(X, pd.DataFrame):
+        if meses is None:
+            meses = X['Mes']
+        if hasattr(modelo, 'feature_names_in_'):
+            X = X[list(modelo.feature_names_in_)]
+    dtype = modelo.coef_.dtype
+    X = np.asarray(X, dtype=dtype)
+    y = np.asarray(y, dtype=dtype)
+    grupo = np.asarray(meses, dtype=np.intp) - 1
+    residuos = y - modelo.predict(X, grupo + 1)
+    
+    if isinstance(modelo, ModeloRegularizado):
+        X_padronizado, *_ = modelo._centrar_padronizar(X, y, grupo)
+        X_centrado = X_padronizado[:, modelo.coef_ != 0]
+        penalidade_l2 = len(y) * modelo.alpha_ * (1 - modelo.l1_ratio)
+    else:
+        media_X, _, _ = _medias_por_mes(X, y, grupo)
+        X_centrado = X - media_X[grupo]
+        penalidade_l2 = 0.0
+    alavancagem, traco = _alavancagem_dentro_mes(X_centrado, penalidade_l2)
+    
+    contagem = np.bincount(grupo, minlength=12)
+    alavancagem = alavancagem + 1 / contagem[grupo]
+    graus_liberdade = np.count_nonzero(contagem) + traco
+    return {nome: float(valor) for nome, valor in
+            metricas_analiticas(y, residuos, alavancagem, graus_liberdade).items()}
+
+
+def _ajustar_lote(X, y, grupo):
+    """
+    ModeloInterceptoMensal (mínimos quadrados) de várias empresas de uma vez.
+    
+    Args:
+        X (np.ndarray): (empresas, n, p); y e grupo (mês - 1): (empresas, n)
+    
+    Returns:
+        tuple: (coef (empresas, p), interceptos (empresas, 12), presentes (empresas, 12),
+            métricas analíticas com arrays por empresa)
+    """
+    num_empresas, n, p = X.shape
+    um_hot = (grupo[..., None] == np.arange(12)).astype(X.dtype)
+    contagem = um_hot.sum(axis=1)
+    presentes = contagem > 0
+    divisor = np.where(presentes, contagem, 1)
+    media_X = np.einsum('enm,enp->emp', um_hot, X) / divisor[..., None]
+    media_y = np.einsum('enm,en->em', um_hot, y) / divisor
+    X_centrado = X - np.einsum('enm,emp->enp', um_hot, media_X)
+    y_centrado = y - np.einsum('enm,em->en', um_hot, media_y)
+    
+    # Mínimos quadrados de todas as empresas por uma SVD em lote (mesmo corte de posto do lstsq)
+    U, s, Vt = np.linalg.svd(X_centrado, full_matrices=False)
+    mantidos = s > s[:, :1] * max(n, p) * np.finfo(X.dtype).eps
+    inverso = np.where(mantidos, 1 / np.where(mantidos, s, 1), 0)
+    coef = np.einsum('ekp,ek->ep', Vt, inverso * np.einsum('enk,en->ek', U, y_centrado))
+    
+    interceptos = media_y - np.einsum('ep,emp->em', coef, media_X)
+    referencia = interceptos[np.arange(num_empresas), np.argmax(presentes, axis=1)]
+    interceptos = np.where(presentes, interceptos, referencia[:, None])
+    
+    residuos = y - (np.einsum('enp,ep->en', X, coef) + np.take_along_axis(interceptos, grupo, axis=1))
+    alavancagem = (np.einsum('enk,ek->en', U ** 2, mantidos.astype(X.dtype))
+                   + 1 / np.take_along_axis(contagem, grupo, axis=1))
+    graus_liberdade = presentes.sum(axis=1) + mantidos.sum(axis=1)
+    return coef, interceptos, presentes, metricas_analiticas(y, residuos, alavancagem, graus_liberdade)
+
+
+@instrumentar
+def treinar_frota(df_frota, dtype=None):
+    """
+    Treina o modelo de faturamento (ModeloInterceptoMensal) de cada empresa da frota em lote:
+    empresas com o mesmo número de meses são empilhadas e ajustadas por uma única SVD em
+    lote, que também dá as métricas analíticas (leave-one-out, GCV, AIC/BIC) de todas.
+    Mesma divisão treino/teste e mesmas métricas de treinar_modelo, empresa a empresa.
+    
+    Args:
+        df_frota (pd.DataFrame): Históricos com a coluna 'Empresa' (gerar_dados_frota)
+        dtype (str, optional): Precisão do ajuste (padrão: DTYPE_CALCULO)
+    
+    Returns:
+        tuple: (modelos, feature_names, metricas); modelos é um dict empresa -> modelo e
+            metricas um DataFrame com uma linha por empresa
+    """
+    dtype = resolver_dtype(dtype)
+    df_modelo, feature_names = preparar_features(df_frota)
+    
+    # Linhas de cada empresa contíguas e na ordem original, para fatiar os lotes por índice
+    codigos, nomes = pd.factorize(df_modelo['Empresa'])
+    ordem = np.argsort(codigos, kind='stable')
+    X_frota = df_modelo[feature_names].to_numpy(dtype=dtype)[ordem]
+    y_frota = df_modelo['Faturamento'].to_numpy(dtype=dtype)[ordem]
+    grupo_frota = df_modelo['Mes'].to_numpy(dtype=np.intp)[ordem] - 1
+    tamanhos = np.bincount(codigos)
+    inicios = np.cumsum(tamanhos) - tamanhos
+    
+    modelos = {}
+    tabelas = []
+    for n in np.unique(tamanhos):
+        selecionadas = np.flatnonzero(tamanhos == n)
+        empresas = list(nomes[selecionadas])
+        linhas = inicios[selecionadas, None] + np.arange(n)
+        X, y, grupo = X_frota[linhas], y_frota[linhas], grupo_frota[linhas]
+        
+        # Mesma divisão de train_test_split(test_size=0.2, shuffle=False)
+        n_treino = n - int(np.ceil(0.2 * n))
+        coef, interceptos, presentes, analiticas = _ajustar_lote(
+            X[:, :n_treino], y[:, :n_treino], grupo[:, :n_treino]
+        )
+        previsto = np.einsum('enp,ep->en', X, coef) + np.take_along_axis(interceptos, grupo, axis=1)
+        erro = y - previsto
+        
+        teste, treino = slice(n_treino, None), slice(None, n_treino)
+        y_teste = y[:, teste]
+        sst_teste = np.sum((y_teste - y_teste.mean(axis=1, keepdims=True)) ** 2, axis=1)
+        sst_treino = np.sum((y[:, treino] - y[:, treino].mean(axis=1, keepdims=True)) ** 2, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r2 = np.where(sst_teste > 0, 1 - np.sum(erro[:, teste] ** 2, axis=1) / sst_teste, 0.0)
+        tabela = pd.DataFrame({
+            'r2': r2,
+            'r2_train': 1 - np.sum(erro[:, treino] ** 2, axis=1) / sst_treino,
+            'mae': np.mean(np.abs(erro[:, teste]), axis=1),
+            'rmse': np.sqrt(np.mean(erro[:, teste] ** 2, axis=1)),
+            'mape': np.mean(np.abs(erro[:, teste] / y_teste), axis=1) * 100,
+            **analiticas
+        }, index=pd.Index(empresas, name='Empresa'))
+        tabelas.append(tabela)
+        
+        for i, empresa in enumerate(empresas):
+            modelo = ModeloInterceptoMensal(dtype=dtype)
+            modelo.feature_names_in_ = np.asarray(feature_names, dtype=object)
+            modelo.n_features_in_ = len(feature_names)
+            modelo.coef_ = coef[i]
+            modelo._definir_interceptos(interceptos[i], presentes[i])
+            modelos[empresa] = modelo
+    
+    modelos = {empresa: modelos[empresa] for empresa in nomes}
+    metricas = pd.concat(tabelas).loc[list(nomes)]
+    return modelos, feature_names, metricas
+
+
+def montar_vetor_entrada(feature_names, inputs, dtype=None):
+    """
+    Monta o vetor de features de um cenário, incluindo as features engenheiradas.
     
     Args:
-        modelo: Modelo treinado
         feature_names (list): Lista de nomes das features
         inputs (dict): Dicionário com valores das features
+        dtype (str | np.dtype, optional): Precisão do vetor (padrão: DTYPE_CALCULO)
     
     Returns:
-        float: Valor previsto de faturamento
+        np.ndarray: Vetor na ordem de feature_names
     """
     
     # Preparar o input para o modelo com todas as features em zero
-    X_pred = pd.DataFrame(0.0, index=[0], columns=feature_names)
+    indice = {nome: i for i, nome in enumerate(feature_names)}
+    x = np.zeros(len(feature_names), dtype=resolver_dtype(dtype))
     
     # Preencher as variáveis diretas
     for key, value in inputs.items():
-        if key in X_pred.columns:
-            X_pred[key] = value
+        if key in indice:
+            x[indice[key]] = value
     
     # ==== CALCULAR FEATURES ENGENHEIRADAS ====
     
     # 1. Interação Volume x Ticket
-    if 'Volume_x_Ticket' in X_pred.columns:
-        X_pred['Volume_x_Ticket'] = inputs.get('Qtd_Atendimentos', 0) * inputs.get('Ticket_Medio', 0)
+    if 'Volume_x_Ticket' in indice:
+        x[indice['Volume_x_Ticket']] = inputs.get('Qtd_Atendimentos', 0) * inputs.get('Ticket_Medio', 0)
+    
+    # 2. Interações 'A_x_B' das candidatas da seleção de features
+    for nome, (a, b) in _fatores_interacao(feature_names).items():
+        x[indice[nome]] = inputs.get(a, 0) * inputs.get(b, 0)
+    
+    # 3. Tendência temporal (usar valor médio)
+    if 'Tendencia' in indice:
+        x[indice['Tendencia']] = 24
     
-    # 2. Tendência temporal (usar valor médio)
-    if 'Tendencia' in X_pred.columns:
-        X_pred['Tendencia'] = 24
+    # O mês (mes_prev) não entra no vetor: seleciona o intercepto na tabela do modelo
     
-    # Preencher a variável Dummy do Mês (sazonalidade categórica)
-    mes_prev = inputs.get('mes_prev', 1)
-    if mes_prev > 1:
-        coluna_mes_dummy = f'Mes_{mes_prev}'
-        if coluna_mes_dummy in X_pred.columns:
-            X_pred[coluna_mes_dummy] = 1
+    return x
+
+
+def montar_matriz_entrada(feature_names, cenarios, dtype=None):
+    """
+    Versão vetorizada de montar_vetor_entrada para vários cenários de uma vez.
+    
+    Args:
+        feature_names (list): Lista de nomes das features
+        cenarios (pd.DataFrame): Um cenário por linha, com as mesmas chaves dos inputs
+        dtype (str | np.dtype, optional): Precisão da matriz (padrão: DTYPE_CALCULO)
+    
+    Returns:
+        np.ndarray: Matriz (n_cenarios, n_features) na ordem de feature_names
+    """
+    
+    dtype = resolver_dtype(dtype)
+    indice = {nome: i for i, nome in enumerate(feature_names)}
+    X = np.zeros((len(cenarios), len(feature_names)), dtype=dtype)
+    
+    # Preencher as variáveis diretas
+    for nome in cenarios.columns:
+        if nome in indice:
+            X[:, indice[nome]] = cenarios[nome].to_numpy(dtype=dtype)
+    
+    # Features engenheiradas, com as mesmas regras de montar_vetor_entrada
+    if 'Volume_x_Ticket' in indice:
+        qtd = cenarios['Qtd_Atendimentos'].to_numpy(dtype=dtype) if 'Qtd_Atendimentos' in cenarios else 0
+        ticket = cenarios['Ticket_Medio'].to_numpy(dtype=dtype) if 'Ticket_Medio' in cenarios else 0
+        X[:, indice['Volume_x_Ticket']] = qtd * ticket
+    
+    for nome, (a, b) in _fatores_interacao(feature_names).items():
+        fator_a = cenarios[a].to_numpy(dtype=dtype) if a in cenarios else 0
+        fator_b = cenarios[b].to_numpy(dtype=dtype) if b in cenarios else 0
+        X[:, indice[nome]] = fator_a * fator_b
+    
+    if 'Tendencia' in indice:
+        X[:, indice['Tendencia']] = 24
+    
+    return X
+
+
+def fazer_previsao(modelo, feature_names, inputs):
+    """
+    Realiza previsão de faturamento com base nos inputs fornecidos.
+    Inclui cálculo de features engenheiradas.
+    
+    Args:
+        modelo: Modelo treinado
+        feature_names (list): Lista de nomes das features
+        inputs (dict): Dicionário com valores das features
+    
+    Returns:
+        float: Valor previsto de faturamento
+    """
+    
+    modelo_compilado = modelo if isinstance(modelo, dict) else compilar_modelo(modelo, feature_names)
     
     # Realizar Previsão
-    predicao = modelo.predict(X_pred)[0]
+    predicao = prever_compilado(modelo_compilado, inputs)
     
     # Garantir que a previsão seja razoável
     predicao = np.clip(predicao, 100000, 2000000)
     
     return predicao
+
+
+def compilar_modelo(modelo, feature_names, dtype=None):
+    """
+    Extrai coeficientes e a tabela de interceptos por mês para pontuação só com NumPy,
+    sem o custo de montar DataFrame e passar pelo modelo a cada chamada.
+    Modelos antigos, treinados com dummies Mes_*, têm as dummies dobradas na tabela.
+    A precisão do modelo compilado define a de todas as previsões feitas com ele.
+    
+    Args:
+        modelo: Modelo linear treinado (ModeloInterceptoMensal ou LinearRegression)
+        feature_names (list): Lista de nomes das features
+        dtype (str, optional): 'float32' ou 'float64' (padrão: DTYPE_CALCULO)
+    
+    Returns:
+        dict: {'coef', 'intercepto', 'interceptos_mes', 'feature_names'}
+    """
+    coef = np.asarray(modelo.coef_, dtype=np.float64)
+    intercepto = float(modelo.intercept_)
+    interceptos_mes = getattr(modelo, 'interceptos_mes_', None)
+    
+    if interceptos_mes is None:
+        interceptos_mes = np.full(12, intercepto)
+        manter = []
+        for j, nome in enumerate(feature_names):
+            if nome.startswith('Mes_'):
+                interceptos_mes[int(nome[4:]) - 1] += coef[j]
+            else:
+                manter.append(j)
+        coef = coef[manter]
+        feature_names = [feature_names[j] for j in manter]
+    
+    dtype = resolver_dtype(dtype)
+    return {
+        'coef': coef.astype(dtype),
+        'intercepto': intercepto,
+        'interceptos_mes': np.asarray(interceptos_mes, dtype=dtype),
+        'feature_names': list(feature_names)
+    }
+
+
+def preparar_entrada_compilada(modelo_compilado, inputs):
+    """
+    Valida um cenário e o converte no que o modelo compilado pontua.
+    
+    Args:
+        modelo_compilado (dict): Saída de compilar_modelo
+        inputs (dict): Dicionário com valores das features
+    
+    Returns:
+        tuple: (vetor de features, posição do mês na tabela de interceptos)
+    
+    Raises:
+        TypeError, ValueError: Cenário que não é dict, valor não numérico ou mês que não é inteiro de 1 a 12
+    """
+    if not isinstance(inputs, dict):
+        raise TypeError(f"cenário deve ser um dict; recebido {type(inputs).__name__}")
+    x = montar_vetor_entrada(modelo_compilado['feature_names'], inputs, modelo_compilado['coef'].dtype)
+    return x, int(_indices_meses(inputs.get('mes_prev', 1)))
+
+
+def prever_preparados(modelo_compilado, preparados):
+    """
+    Previsões brutas (sem limites) de cenários já passados por preparar_entrada_compilada,
+    em um único produto matricial.
+    
+    Returns:
+        np.ndarray: Valores previstos, na ordem de preparados
+    """
+    X = np.vstack([x for x, _ in preparados])
+    meses = np.fromiter((mes for _, mes in preparados), dtype=np.intp, count=len(preparados))
+    return X @ modelo_compilado['coef'] + modelo_compilado['interceptos_mes'][meses]
+
+
+def prever_compilado(modelo_compilado, inputs):
+    """
+    Previsão bruta (sem limites) usando o modelo compilado.
+    
+    Args:
+        modelo_compilado (dict): Saída de compilar_modelo
+        inputs (dict): Dicionário com valores das features
+    
+    Returns:
+        float: Valor previsto
+    """
+    x, mes = preparar_entrada_compilada(modelo_compilado, inputs)
+    return float(x @ modelo_compilado['coef'] + modelo_compilado['interceptos_mes'][mes])
+
+
+def prever_compilado_lote(modelo_compilado, lista_inputs):
+    """
+    Previsões brutas (sem limites) para uma lista de cenários em um único produto matricial.
+    
+    Args:
+        modelo_compilado (dict): Saída de compilar_modelo
+        lista_inputs (list): Dicionários com valores das features
+    
+    Returns:
+        np.ndarray: Valores previstos, na ordem de lista_inputs
+    """
+    return prever_preparados(modelo_compilado,
+                             [preparar_entrada_compilada(modelo_compilado, inputs) for inputs in lista_inputs])
+
+
+def fazer_previsao_lote(modelo, feature_names, cenarios):
+    """
+    Previsão de faturamento para vários cenários, com os mesmos limites de fazer_previsao.
+    
+    Args:
+        modelo: Modelo treinado ou compilado (compilar_modelo)
+        feature_names (list): Lista de nomes das features
+        cenarios (pd.DataFrame): Um cenário por linha
+    
+    Returns:
+        np.ndarray: Valores previstos de faturamento, na precisão do modelo compilado
+    """
+    modelo_compilado = modelo if isinstance(modelo, dict) else compilar_modelo(modelo, feature_names)
+    X = montar_matriz_entrada(modelo_compilado['feature_names'], cenarios, modelo_compilado['coef'].dtype)
+    meses = cenarios['mes_prev'].to_numpy() if 'mes_prev' in cenarios else np.ones(len(cenarios), dtype=np.intp)
+    
+    predicoes = X @ modelo_compilado['coef'] + modelo_compilado['interceptos_mes'][_indices_meses(meses)]
+    
+    return np.clip(predicoes, 100000, 2000000)
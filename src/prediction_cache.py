@@ -0,0 +1,168 @@
+"""
+Cache LRU/TTL de previsões do simulador.
+
+As entradas são quantizadas no passo dos controles do app, de modo que cenários
+equivalentes caem na mesma entrada, e a previsão é calculada sobre o cenário
+quantizado (o resultado não depende de qual cenário do passo chegou primeiro).
+Cada entrada carrega a versão do modelo: ao trocar o modelo o cache é esvaziado.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import CACHE_PREVISOES_MAX_ITENS, CACHE_PREVISOES_TTL_SEGUNDOS, PASSOS_ENTRADAS_SIMULADOR
+from model import fazer_previsao
+from statistical_analysis import calcular_previsao_com_intervalo
+
+
+def versao_modelo(modelo):
+    """
+    Impressão digital dos parâmetros do modelo (treinado ou compilado).
+
+    Returns:
+        str: Hash curto de coeficientes, interceptos e nomes das features
+    """
+    if isinstance(modelo, dict):
+        coef, interceptos, nomes = modelo['coef'], modelo['interceptos_mes'], modelo['feature_names']
+    else:
+        coef, nomes = modelo.coef_, getattr(modelo, 'feature_names_in_', ())
+        interceptos = getattr(modelo, 'interceptos_mes_', modelo.intercept_)
+    resumo = hashlib.blake2b(digest_size=8)
+    resumo.update(np.ascontiguousarray(coef, dtype=np.float64).tobytes())
+    resumo.update(np.ascontiguousarray(interceptos, dtype=np.float64).tobytes())
+    resumo.update('|'.join(map(str, nomes)).encode('utf-8'))
+    return resumo.hexdigest()
+
+
+def quantizar_entradas(inputs, passos=None):
+    """
+    Arredonda cada entrada para o múltiplo mais próximo do seu passo.
+    Entradas inteiras continuam inteiras; entradas sem passo ficam como estão.
+    """
+    passos = PASSOS_ENTRADAS_SIMULADOR if passos is None else passos
+    quantizado = {}
+    for chave, valor in inputs.items():
+        passo = passos.get(chave)
+        if passo is None:
+            quantizado[chave] = valor
+        elif isinstance(valor, (int, np.integer)) and float(passo).is_integer():
+            quantizado[chave] = int(round(valor / passo) * passo)
+        else:
+            quantizado[chave] = round(round(float(valor) / passo) * passo, 10)
+    return quantizado
+
+
+class CachePrevisoes:
+    """
+    Cache LRU com expiração por tempo, seguro para as threads das sessões do Streamlit.
+
+    Args:
+        max_itens (int): Capacidade; a entrada menos usada recentemente sai primeiro
+        ttl_segundos (float): Validade de cada entrada
+        passos (dict, optional): Passo de quantização por entrada
+    """
+
+    def __init__(self, max_itens=CACHE_PREVISOES_MAX_ITENS, ttl_segundos=CACHE_PREVISOES_TTL_SEGUNDOS, passos=None):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self.passos = PASSOS_ENTRADAS_SIMULADOR if passos is None else passos
+        self._itens = OrderedDict()
+        self._versao = None
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.invalidacoes = 0
+
+    def invalidar(self):
+        with self._trava:
+            self._itens.clear()
+            self.invalidacoes += 1
+
+    def obter_ou_calcular(self, modelo, nome, inputs, calcular, extra=()):
+        """
+        Devolve a previsão em cache ou calcula calcular(inputs_quantizados) e guarda.
+
+        Args:
+            modelo: Modelo treinado ou compilado (define a versão)
+            nome (str): Identifica a função cacheada
+            inputs (dict): Cenário
+            calcular (callable): Recebe o cenário quantizado
+            extra (tuple): Demais argumentos que alteram o resultado
+        """
+        versao = versao_modelo(modelo)
+        quantizado = quantizar_entradas(inputs, self.passos)
+        chave = (nome, tuple(sorted(quantizado.items())), extra)
+        agora = time.monotonic()
+
+        with self._trava:
+            if versao != self._versao:
+                if self._versao is not None:
+                    self.invalidacoes += 1
+                self._itens.clear()
+                self._versao = versao
+            item = self._itens.get(chave)
+            if item is not None:
+                valor, expira_em = item
+                if expira_em > agora:
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return valor
+                del self._itens[chave]
+                self.expirados += 1
+            self.falhas += 1
+
+        valor = calcular(quantizado)
+
+        with self._trava:
+            if versao == self._versao:
+                self._itens[chave] = (valor, agora + self.ttl_segundos)
+                self._itens.move_to_end(chave)
+                while len(self._itens) > self.max_itens:
+                    self._itens.popitem(last=False)
+        return valor
+
+    def metricas(self):
+        total = self.acertos + self.falhas
+        return {
+            'itens': len(self._itens),
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / total if total else 0.0,
+            'expirados': self.expirados,
+            'invalidacoes': self.invalidacoes
+        }
+
+
+# Cache compartilhado pelo processo (todas as sessões do app)
+cache_previsoes = CachePrevisoes()
+
+
+def fazer_previsao_cache(modelo, feature_names, inputs, cache=None):
+    """fazer_previsao com cache; mesmos argumentos e retorno."""
+    cache = cache_previsoes if cache is None else cache
+    return cache.obter_ou_calcular(
+        modelo, 'fazer_previsao', inputs,
+        lambda quantizado: fazer_previsao(modelo, feature_names, quantizado),
+        extra=(tuple(feature_names),)
+    )
+
+
+def calcular_previsao_com_intervalo_cache(modelo, features, inputs, df_historico=None, erro_padrao=None, cache=None):
+    """
+    calcular_previsao_com_intervalo com cache. Sem erro_padrao o resultado depende do
+    histórico, que não entra na chave; nesse caso a previsão é calculada sem cache.
+    """
+    if erro_padrao is None:
+        return calcular_previsao_com_intervalo(modelo, features, inputs, df_historico=df_historico)
+    cache = cache_previsoes if cache is None else cache
+    return dict(cache.obter_ou_calcular(
+        modelo, 'calcular_previsao_com_intervalo', inputs,
+        lambda quantizado: calcular_previsao_com_intervalo(
+            modelo, features, quantizado, df_historico=df_historico, erro_padrao=erro_padrao
+        ),
+        extra=(tuple(features), erro_padrao)
+    ))
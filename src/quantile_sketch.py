@@ -0,0 +1,318 @@
+"""
+Esboço de quantis mesclável (KLL), para distribuições grandes demais para a memória.
+
+O esboço guarda uma pilha de compactadores: os itens do nível h valem 2^h observações
+cada. Quando um nível passa da sua capacidade, ele é ordenado e metade dos itens (os de
+posição par ou ímpar, sorteada) sobe para o nível seguinte com o dobro do peso. As
+capacidades decaem geometricamente (fator 2/3) dos níveis altos para os baixos, de modo
+que a memória fica em torno de 3k itens, qualquer que seja o número de observações.
+
+Cada compactação no nível h desloca o posto estimado de qualquer valor em no máximo 2^h,
+com sinal aleatório e média zero. O esboço soma os pesos (limite determinístico) e os
+quadrados dos pesos (limite de Hoeffding) das compactações feitas, inclusive nas mesclas,
+e erro_rank devolve o erro de posto garantido. Enquanto nenhuma compactação acontece o
+esboço é exato e os quantis coincidem com np.percentile.
+
+Esboços com o mesmo k se mesclam em qualquer ordem (por bloco, por empresa, por mês), e
+o resultado tem a mesma garantia de um esboço construído sobre todos os dados de uma vez.
+Junto com os itens, o esboço acumula os momentos das observações (MomentosFluxo), de modo
+que média e desvio padrão são exatos mesmo depois das compactações.
+"""
+import numpy as np
+import pandas as pd
+from streaming_moments import CAMPOS_MOMENTOS, MomentosFluxo
+from config import K_ESBOCO_QUANTIS
+
+__all__ = [
+    'FATOR_CAPACIDADE',
+    'EsbocoQuantis',
+    'mesclar_esbocos',
+    'esboco_em_blocos',
+    'esbocos_por_grupo'
+]
+
+# Razão entre as capacidades de níveis vizinhos (a do nível mais alto é k)
+FATOR_CAPACIDADE = 2 / 3
+
+
+class EsbocoQuantis:
+    """
+    Esboço KLL dos quantis de uma variável.
+
+    Args:
+        k (int): Capacidade do nível mais alto; o erro de posto cai com 1/k e a memória
+            cresce com 3k
+        semente (int | np.random.Generator, optional): Semente dos sorteios das compactações
+
+    Attributes:
+        n (int): Observações incorporadas (NaN são ignorados)
+        minimo (float): Menor observação (exato)
+        maximo (float): Maior observação (exato)
+        momentos (MomentosFluxo): Momentos exatos das observações
+    """
+
+    def __init__(self, k=K_ESBOCO_QUANTIS, semente=None):
+        if k < 8:
+            raise ValueError(f"k deve ser ao menos 8; recebido {k}")
+        self.k = int(k)
+        self.n = 0
+        self.minimo = np.nan
+        self.maximo = np.nan
+        self.momentos = MomentosFluxo()
+        self._niveis = [np.empty(0)]
+        self._soma_pesos = 0.0
+        self._soma_quadrados_pesos = 0.0
+        self._rng = np.random.default_rng(semente)
+        self._ordenados = None
+
+    def _capacidade(self, nivel):
+        """Capacidade do nível, dado o número atual de níveis."""
+        return max(2, int(np.ceil(self.k * FATOR_CAPACIDADE ** (len(self._niveis) - 1 - nivel))))
+
+    def _comprimir(self):
+        """Compacta os níveis acima da capacidade até que todos caibam."""
+        compactou = True
+        while compactou:
+            compactou = False
+            for nivel in range(len(self._niveis)):
+                itens = self._niveis[nivel]
+                if len(itens) <= self._capacidade(nivel):
+                    continue
+                if nivel + 1 == len(self._niveis):
+                    self._niveis.append(np.empty(0))
+                itens = np.sort(itens)
+                pares = len(itens) - len(itens) % 2
+                deslocamento = int(self._rng.integers(2))
+                self._niveis[nivel] = itens[pares:]
+                self._niveis[nivel + 1] = np.concatenate([self._niveis[nivel + 1], itens[deslocamento:pares:2]])
+                peso = 2.0 ** nivel
+                self._soma_pesos += peso
+                self._soma_quadrados_pesos += peso * peso
+                compactou = True
+        self._ordenados = None
+
+    def adicionar(self, valores):
+        """
+        Incorpora um bloco de observações (NaN são ignorados).
+
+        Returns:
+            EsbocoQuantis: O próprio esboço
+        """
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return self
+        self.n += len(valores)
+        self.minimo = np.fmin(self.minimo, valores.min())
+        self.maximo = np.fmax(self.maximo, valores.max())
+        self.momentos.adicionar(valores)
+        self._niveis[0] = np.concatenate([self._niveis[0], valores])
+        self._comprimir()
+        return self
+
+    def mesclar(self, outro):
+        """
+        Incorpora outro esboço com o mesmo k (o outro não é alterado).
+
+        Returns:
+            EsbocoQuantis: O próprio esboço
+        """
+        if outro.k != self.k:
+            raise ValueError(f"Só é possível mesclar esboços com o mesmo k ({self.k} e {outro.k})")
+        if not outro.n:
+            return self
+        self.n += outro.n
+        self.minimo = np.fmin(self.minimo, outro.minimo)
+        self.maximo = np.fmax(self.maximo, outro.maximo)
+        self.momentos.mesclar(outro.momentos)
+        self._niveis.extend(np.empty(0) for _ in range(len(outro._niveis) - len(self._niveis)))
+        for nivel, itens in enumerate(outro._niveis):
+            self._niveis[nivel] = np.concatenate([self._niveis[nivel], itens])
+        self._soma_pesos += outro._soma_pesos
+        self._soma_quadrados_pesos += outro._soma_quadrados_pesos
+        self._comprimir()
+        return self
+
+    @property
+    def exato(self):
+        """True enquanto nenhuma compactação aconteceu (o esboço guarda todas as observações)."""
+        return self._soma_pesos == 0
+
+    @property
+    def num_itens(self):
+        """Itens guardados (a memória do esboço)."""
+        return sum(len(itens) for itens in self._niveis)
+
+    def valores(self):
+        """Observações guardadas, em ordem crescente; só disponível enquanto o esboço é exato."""
+        if not self.exato:
+            raise ValueError("O esboço já foi compactado e não guarda mais todas as observações")
+        return self._itens_ordenados()[0]
+
+    def _itens_ordenados(self):
+        """Itens de todos os níveis em ordem crescente e o peso acumulado até cada um."""
+        if self._ordenados is None:
+            itens = np.concatenate(self._niveis)
+            pesos = np.concatenate([np.full(len(nivel), 2.0 ** h) for h, nivel in enumerate(self._niveis)])
+            ordem = np.argsort(itens, kind='stable')
+            self._ordenados = itens[ordem], np.cumsum(pesos[ordem])
+        return self._ordenados
+
+    def erro_rank(self, confianca=0.99):
+        """
+        Erro máximo de posto normalizado (em fração de n) dos quantis e de cdf.
+
+        É o menor entre o limite determinístico (soma dos pesos das compactações) e o de
+        Hoeffding para a confiança dada, válido para cada consulta isoladamente.
+        """
+        if not self.n:
+            return np.nan
+        hoeffding = np.sqrt(2 * self._soma_quadrados_pesos * np.log(2 / (1 - confianca)))
+        return min(self._soma_pesos, hoeffding) / self.n
+
+    def quantis(self, q):
+        """
+        Quantis aproximados (exatos, com a interpolação de np.percentile, se exato).
+
+        Args:
+            q (float | array-like): Probabilidades em [0, 1]
+
+        Returns:
+            float | np.ndarray: O valor guardado cujo posto estimado alcança q·n
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if not self.n:
+            return np.full(q.shape, np.nan)[()]
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("As probabilidades devem estar em [0, 1]")
+        itens, acumulado = self._itens_ordenados()
+        if self.exato:
+            return np.percentile(itens, q * 100)
+        posicoes = np.minimum(np.searchsorted(acumulado, q * self.n, side='left'), len(itens) - 1)
+        return np.where(q <= 0, self.minimo, np.where(q >= 1, self.maximo, itens[posicoes]))[()]
+
+    def quantil(self, q):
+        """Quantil aproximado de uma probabilidade (ver quantis)."""
+        return float(self.quantis(q))
+
+    def cdf(self, x, estrito=False):
+        """
+        Fração estimada das observações <= x (< x com estrito=True).
+
+        Returns:
+            float | np.ndarray: Frações em [0, 1], com erro de até erro_rank()
+        """
+        if not self.n:
+            return np.full(np.shape(x), np.nan)[()]
+        itens, acumulado = self._itens_ordenados()
+        posicoes = np.searchsorted(itens, x, side='left' if estrito else 'right')
+        return (np.where(posicoes > 0, acumulado[np.maximum(posicoes - 1, 0)], 0.0) / self.n)[()]
+
+    def resumo(self):
+        """
+        Quartis, limites de outliers (1,5 IQR) e a fração de observações fora deles.
+
+        Returns:
+            dict: q1, mediana, q3, iqr, limite_inferior, limite_superior, cerca_inferior e
+                cerca_superior (observações mais extremas dentro dos limites, os bigodes do
+                boxplot), minimo, maximo, num_outliers, pct_outliers e erro_rank
+        """
+        q1, mediana, q3 = self.quantis([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        limite_inferior, limite_superior = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        itens = self._itens_ordenados()[0]
+        dentro = itens[(itens >= limite_inferior) & (itens <= limite_superior)]
+        fracao_fora = self.cdf(limite_inferior, estrito=True) + 1 - self.cdf(limite_superior)
+        num_outliers = int(round(fracao_fora * self.n))
+        return {
+            'q1': q1,
+            'mediana': mediana,
+            'q3': q3,
+            'iqr': iqr,
+            'limite_inferior': limite_inferior,
+            'limite_superior': limite_superior,
+            'cerca_inferior': dentro.min() if len(dentro) else mediana,
+            'cerca_superior': dentro.max() if len(dentro) else mediana,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'num_outliers': num_outliers,
+            'pct_outliers': num_outliers / self.n * 100,
+            'erro_rank': self.erro_rank()
+        }
+
+    def media_desvio(self):
+        """Média e desvio padrão populacional exatos, dos momentos acumulados."""
+        return float(self.momentos.media), float(self.momentos.desvio_padrao())
+
+    def salvar(self, caminho):
+        """Grava o esboço em um .npz compactado (sem pickle)."""
+        escalares = [self.k, self.n, self.minimo, self.maximo, self._soma_pesos, self._soma_quadrados_pesos]
+        np.savez_compressed(caminho, itens=np.concatenate(self._niveis),
+                            tamanhos=np.array([len(itens) for itens in self._niveis]),
+                            escalares=np.asarray(escalares, dtype=np.float64),
+                            **{f'momentos_{campo}': valor for campo, valor in self.momentos.estado().items()})
+
+    @classmethod
+    def carregar(cls, caminho, semente=None):
+        """Reconstrói um esboço gravado por salvar (os sorteios seguintes usam semente)."""
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            k, n, minimo, maximo, soma_pesos, soma_quadrados = arquivo['escalares'].tolist()
+            esboco = cls(int(k), semente)
+            esboco.n, esboco.minimo, esboco.maximo = int(n), minimo, maximo
+            esboco._soma_pesos, esboco._soma_quadrados_pesos = soma_pesos, soma_quadrados
+            esboco._niveis = np.split(arquivo['itens'], np.cumsum(arquivo['tamanhos'])[:-1])
+            esboco.momentos = MomentosFluxo.de_estado({campo: arquivo[f'momentos_{campo}'] for campo in CAMPOS_MOMENTOS})
+        return esboco
+
+
+def mesclar_esbocos(esbocos, k=None, semente=None):
+    """
+    Mescla vários esboços em um novo (os de entrada não são alterados).
+
+    Args:
+        esbocos (iterable): EsbocoQuantis com o mesmo k (ou dict/Series de esboços)
+        k (int, optional): k do resultado (padrão: o do primeiro esboço ou K_ESBOCO_QUANTIS)
+        semente (int, optional): Semente das compactações da mescla
+    """
+    esbocos = list(esbocos.values() if isinstance(esbocos, dict) else esbocos)
+    k = k or (esbocos[0].k if esbocos else K_ESBOCO_QUANTIS)
+    resultado = EsbocoQuantis(k, semente)
+    for esboco in esbocos:
+        resultado.mesclar(esboco)
+    return resultado
+
+
+def esboco_em_blocos(blocos, coluna=None, k=K_ESBOCO_QUANTIS, semente=None):
+    """
+    Constrói o esboço de um fluxo de blocos, com memória limitada ao maior bloco.
+
+    Args:
+        blocos (iterable): Arrays ou DataFrames (por exemplo pd.read_csv(..., chunksize=...))
+        coluna (str, optional): Coluna lida de cada DataFrame
+        k (int): Capacidade do esboço
+        semente (int, optional): Semente das compactações
+
+    Returns:
+        EsbocoQuantis
+    """
+    esboco = EsbocoQuantis(k, semente)
+    for bloco in blocos:
+        esboco.adicionar(bloco[coluna] if coluna is not None else bloco)
+    return esboco
+
+
+def esbocos_por_grupo(df, coluna, grupo='Empresa', k=K_ESBOCO_QUANTIS, semente=None):
+    """
+    Um esboço por grupo (por exemplo, por empresa da frota), para mesclar em qualquer recorte.
+
+    Returns:
+        pd.Series: EsbocoQuantis por grupo, na ordem de primeira aparição
+    """
+    codigos, grupos = pd.factorize(df[grupo])
+    ordem = np.argsort(codigos, kind='stable')
+    valores = df[coluna].to_numpy(dtype=np.float64)[ordem]
+    limites = np.searchsorted(codigos[ordem], np.arange(len(grupos) + 1))
+    sementes = np.random.SeedSequence(semente).spawn(len(grupos))
+    esbocos = [EsbocoQuantis(k, np.random.default_rng(s)).adicionar(valores[inicio:fim])
+               for s, inicio, fim in zip(sementes, limites[:-1], limites[1:])]
+    return pd.Series(esbocos, index=pd.Index(grupos, name=grupo), name=coluna, dtype=object)
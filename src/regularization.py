@@ -0,0 +1,156 @@
+"""
+Caminhos de regularização (Ridge, Lasso e ElasticNet) e validação cruzada temporal.
+
+Todas as funções trabalham sobre features e alvo já centrados e padronizados (os alphas
+ficam na mesma escala qualquer que seja a unidade do faturamento) e usam a
+parametrização do ElasticNet:
+
+    (1 / 2n) * ||y - X b||² + alpha * (l1_ratio * ||b||₁ + (1 - l1_ratio) / 2 * ||b||²)
+
+Com l1_ratio = 0 é a Ridge, resolvida para todos os alphas a partir de uma única SVD;
+com l1_ratio > 0 usa descida por coordenadas partindo da solução do alpha anterior.
+"""
+import numpy as np
+
+__all__ = [
+    'grade_alphas',
+    'caminho_ridge',
+    'caminho_elasticnet',
+    'divisoes_temporais'
+]
+
+# Razão entre o menor e o maior alpha da grade e tamanho padrão da grade. A Ridge, que
+# sai da SVD sem custo extra por alpha, desce até quase mínimos quadrados; no Lasso e no
+# ElasticNet a descida por coordenadas fica lenta perto de alpha zero, e a grade para
+# em 1e-3 (como o eps padrão do scikit-learn)
+RAZAO_ALPHA_MINIMO_RIDGE = 1e-6
+RAZAO_ALPHA_MINIMO = 1e-3
+NUM_ALPHAS_PADRAO = 50
+
+# l1_ratio usado apenas para definir o topo da grade da Ridge (como no glmnet)
+L1_RATIO_MINIMO_GRADE = 1e-3
+
+
+def grade_alphas(X, y, l1_ratio, num_alphas=NUM_ALPHAS_PADRAO, razao_minimo=None):
+    """
+    Grade decrescente de alphas, em escala log, a partir do menor alpha que zera todos
+    os coeficientes do Lasso/ElasticNet.
+
+    Returns:
+        np.ndarray: num_alphas valores, do maior para o menor
+    """
+    if razao_minimo is None:
+        razao_minimo = RAZAO_ALPHA_MINIMO_RIDGE if l1_ratio == 0 else RAZAO_ALPHA_MINIMO
+    n = X.shape[0]
+    alpha_max = np.max(np.abs(X.T @ y)) / (n * max(l1_ratio, L1_RATIO_MINIMO_GRADE))
+    if alpha_max <= 0:
+        alpha_max = 1.0
+    return alpha_max * np.logspace(0, np.log10(razao_minimo), num_alphas)
+
+
+def caminho_ridge(X, y, alphas):
+    """
+    Coeficientes da Ridge para cada alpha a partir de uma única SVD de X:
+    b(alpha) = V diag(s / (s² + n alpha)) Uᵀ y.
+
+    Returns:
+        np.ndarray: (len(alphas), n_features)
+    """
+    n = X.shape[0]
+    U, s, Vt = np.linalg.svd(X, full_matrices=False)
+    Uty = U.T @ y
+    fatores = s / (s ** 2 + n * np.asarray(alphas, dtype=X.dtype)[:, None])
+    return (fatores * Uty) @ Vt
+
+
+def caminho_elasticnet(X, y, alphas, l1_ratio=1.0, tol=1e-7, max_iter=10_000):
+    """
+    Coeficientes do Lasso (l1_ratio = 1) ou ElasticNet para cada alpha, por descida por
+    coordenadas sobre a matriz de Gram, com partida a quente na solução do alpha anterior.
+    Os alphas devem vir em ordem decrescente.
+
+    Quando o suporte (coeficientes não nulos) se repete entre duas varreduras, tenta a
+    solução exata das condições de otimalidade restritas a ele; se os sinais e as
+    condições dos coeficientes nulos se confirmam, encerra o alpha sem esperar a
+    convergência lenta das coordenadas com features correlacionadas.
+
+    Returns:
+        np.ndarray: (len(alphas), n_features)
+    """
+    n, p = X.shape
+    gram = X.T @ X / n
+    correlacao = X.T @ y / n
+    diagonal = np.diag(gram).copy()
+    escala = max(float(np.max(np.abs(correlacao))), np.finfo(X.dtype).tiny)
+
+    coef = np.zeros(p, dtype=X.dtype)
+    gram_coef = np.zeros(p, dtype=X.dtype)  # gram @ coef, atualizado a cada coordenada
+    caminho = np.empty((len(alphas), p), dtype=X.dtype)
+    for k, alpha in enumerate(alphas):
+        limiar = alpha * l1_ratio
+        penalidade_l2 = alpha * (1 - l1_ratio)
+        # Colunas nulas (denominador zero) ficam com coeficiente zero
+        denominador = diagonal + penalidade_l2
+        denominador[denominador == 0] = np.inf
+        suporte = coef != 0
+        for _ in range(max_iter):
+            maior_passo = 0.0
+            for j in range(p):
+                anterior = coef[j]
+                residuo_j = correlacao[j] - gram_coef[j] + diagonal[j] * anterior
+                novo = np.sign(residuo_j) * max(abs(residuo_j) - limiar, 0.0) / denominador[j]
+                if novo != anterior:
+                    gram_coef += gram[:, j] * (novo - anterior)
+                    coef[j] = novo
+                    maior_passo = max(maior_passo, abs(novo - anterior) * diagonal[j])
+            if maior_passo <= tol * escala:
+                break
+
+            novo_suporte = coef != 0
+            if novo_suporte.any() and np.array_equal(novo_suporte, suporte):
+                exato = _solucao_no_suporte(gram, correlacao, novo_suporte, np.sign(coef), limiar, penalidade_l2)
+                if exato is not None:
+                    coef, gram_coef = exato, gram @ exato
+                    break
+            suporte = novo_suporte
+        caminho[k] = coef
+    return caminho
+
+
+def _solucao_no_suporte(gram, correlacao, suporte, sinais, limiar, penalidade_l2):
+    """Solução exata com o suporte e os sinais dados, ou None se violar a otimalidade."""
+    indices = np.flatnonzero(suporte)
+    sistema = gram[np.ix_(indices, indices)] + penalidade_l2 * np.eye(len(indices), dtype=gram.dtype)
+    try:
+        valores = np.linalg.solve(sistema, correlacao[indices] - limiar * sinais[indices])
+    except np.linalg.LinAlgError:
+        return None
+    if np.any(np.sign(valores) != sinais[indices]):
+        return None
+    coef = np.zeros_like(correlacao)
+    coef[indices] = valores
+    folga = np.abs(correlacao - gram @ coef)[~suporte]
+    if np.any(folga > limiar * (1 + 1e-9)):
+        return None
+    return coef
+
+
+def divisoes_temporais(n, num_divisoes=5, minimo_treino=0):
+    """
+    Divisões de validação cruzada para séries temporais (janela de treino crescente):
+    cada validação usa o bloco seguinte ao treino, sem olhar o futuro. As linhas após
+    minimo_treino são repartidas em num_divisoes blocos de validação.
+
+    Returns:
+        list: [(fim_treino, fim_validacao), ...]; treino em [0, fim_treino) e validação
+            em [fim_treino, fim_validacao)
+    """
+    tamanho = min(n // (num_divisoes + 1), (n - minimo_treino) // num_divisoes)
+    if tamanho < 1:
+        raise ValueError(f'{n} linhas não bastam para {num_divisoes} divisões temporais '
+                         f'com treino mínimo de {minimo_treino}')
+    divisoes = []
+    for k in range(num_divisoes):
+        fim_treino = n - (num_divisoes - k) * tamanho
+        divisoes.append((fim_treino, fim_treino + tamanho))
+    return divisoes
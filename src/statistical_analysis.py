@@ -5,8 +5,30 @@ Fornece análises profundas para suporte à decisão comercial
 
 import pandas as pd
 import numpy as np
-from scipy import stats
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
+
+from model import preparar_features, compilar_modelo, prever_compilado
+from instrumentation import instrumentar
+from bootstrap import intervalo_bootstrap
+from quantile_sketch import EsbocoQuantis
+from streaming_moments import MomentosFluxo
+from config import MESES_MINIMOS_PERIODO, JANELA_MAXIMA_RUPTURA
+
+__all__ = [
+    'calcular_correlacoes',
+    'identificar_correlacoes_fortes',
+    'analise_tendencia_temporal',
+    'calcular_intervalo_confianca',
+    'analise_distribuicao',
+    'analise_comparativa_periodos',
+    'teste_welch_divisoes',
+    'analise_pontos_ruptura',
+    'calcular_capacidade_processo',
+    'gerar_insights_comerciais',
+    'calcular_erro_padrao_residual',
+    'calcular_previsao_com_intervalo',
+    'montar_intervalo_previsao'
+]
 
 
 def calcular_correlacoes(df: pd.DataFrame, features: List[str]) -> pd.DataFrame:
@@ -17,10 +39,13 @@ def calcular_correlacoes(df: pd.DataFrame, features: List[str]) -> pd.DataFrame:
     return correlacoes
 
 
+@instrumentar
 def identificar_correlacoes_fortes(df: pd.DataFrame, features: List[str], threshold: float = 0.5) -> List[Dict[str, Any]]:
     """
     Identifica correlações fortes e retorna insights
     """
+    from scipy import stats
+
     correlacoes = df[features].corr()
     insights = []
     
@@ -47,10 +72,13 @@ def identificar_correlacoes_fortes(df: pd.DataFrame, features: List[str], thresh
     return sorted(insights, key=lambda x: abs(x['correlacao']), reverse=True)
 
 
+@instrumentar
 def analise_tendencia_temporal(df: pd.DataFrame, coluna: str) -> Dict[str, Any]:
     """
     Analisa tendência temporal de uma variável usando regressão linear
     """
+    from scipy import stats
+
     x = np.arange(len(df))
     y = df[coluna].values
     
@@ -83,21 +111,94 @@ def analise_tendencia_temporal(df: pd.DataFrame, coluna: str) -> Dict[str, Any]:
     }
 
 
-def calcular_intervalo_confianca(valores: np.ndarray, confianca: float = 0.95) -> Tuple[float, float, float]:
+def _momentos_acumulados(valores) -> Optional[MomentosFluxo]:
+    """Momentos de um MomentosFluxo ou EsbocoQuantis já acumulado (None para arrays)."""
+    if isinstance(valores, EsbocoQuantis):
+        return valores.momentos
+    if isinstance(valores, MomentosFluxo):
+        if valores.forma != ():
+            raise ValueError(f"Esperado um acumulador de uma série; recebido forma {valores.forma}")
+        return valores
+    return None
+
+
+def calcular_intervalo_confianca(valores, confianca: float = 0.95,
+                                 metodo: str = 't') -> Tuple[float, float, float]:
     """
-    Calcula intervalo de confiança para uma série de valores
+    Calcula intervalo de confiança para uma série de valores.
+    metodo='t' usa o intervalo t de Student (supõe normalidade da média); metodo='bootstrap'
+    usa o intervalo percentil de bootstrap.intervalo_bootstrap, sem essa suposição.
+    valores pode ser também um MomentosFluxo ou EsbocoQuantis acumulado em blocos (só com
+    metodo='t', que depende apenas de n, média e desvio).
     """
-    media = np.mean(valores)
-    sem = stats.sem(valores)
-    intervalo = stats.t.interval(confianca, len(valores) - 1, loc=media, scale=sem)
+    momentos = _momentos_acumulados(valores)
+    if metodo == 'bootstrap':
+        if momentos is not None:
+            raise ValueError("metodo='bootstrap' precisa das observações; use metodo='t' com acumuladores")
+        return intervalo_bootstrap(valores, confianca, semente=0)
+    if metodo != 't':
+        raise ValueError(f"metodo deve ser 't' ou 'bootstrap', não '{metodo}'")
+
+    from scipy import stats
+
+    if momentos is not None:
+        media, sem, n = float(momentos.media), float(momentos.erro_padrao()), float(momentos.n)
+    else:
+        media, sem, n = np.mean(valores), stats.sem(valores), len(valores)
+    intervalo = stats.t.interval(confianca, n - 1, loc=media, scale=sem)
     
     return media, intervalo[0], intervalo[1]
 
 
-def analise_distribuicao(valores: np.ndarray) -> Dict[str, Any]:
+def _analise_distribuicao_esboco(esboco: EsbocoQuantis) -> Dict[str, Any]:
+    """
+    analise_distribuicao a partir de um esboço de quantis já compactado: quartis, limites
+    e fração de outliers vêm do esboço, média e desvio dos seus momentos (exatos), e a
+    normalidade do teste de Kolmogorov-Smirnov com a distância descontada do erro de posto.
+    """
+    from scipy import stats
+
+    media, desvio_padrao = esboco.media_desvio()
+    resumo = esboco.resumo()
+    itens, acumulado = esboco._itens_ordenados()
+    normal = stats.norm.cdf(itens, media, desvio_padrao) if desvio_padrao > 0 else (itens >= media).astype(float)
+    distancia = max(np.max(np.abs(acumulado / esboco.n - normal)),
+                    np.max(np.abs(np.concatenate([[0.0], acumulado[:-1]]) / esboco.n - normal)))
+    p_normalidade = stats.kstwobign.sf(max(distancia - resumo['erro_rank'], 0.0) * np.sqrt(esboco.n))
+
+    return {
+        'media': media,
+        'mediana': resumo['mediana'],
+        'desvio_padrao': desvio_padrao,
+        'coeficiente_variacao': (desvio_padrao / media * 100) if media != 0 else 0,
+        'q1': resumo['q1'],
+        'q3': resumo['q3'],
+        'iqr': resumo['iqr'],
+        'minimo': resumo['minimo'],
+        'maximo': resumo['maximo'],
+        'num_outliers': resumo['num_outliers'],
+        'pct_outliers': resumo['pct_outliers'],
+        'normal': p_normalidade > 0.05,
+        'p_normalidade': p_normalidade,
+        'erro_rank': resumo['erro_rank']
+    }
+
+
+@instrumentar
+def analise_distribuicao(valores) -> Dict[str, Any]:
     """
-    Analisa a distribuição estatística dos valores
+    Analisa a distribuição estatística dos valores.
+    Aceita também um EsbocoQuantis (por exemplo, a mescla dos esboços de vários blocos ou
+    empresas): enquanto exato, o resultado é o mesmo do array; depois de compactado, as
+    estatísticas são aproximadas e 'erro_rank' traz o erro de posto garantido dos quartis.
     """
+    if isinstance(valores, EsbocoQuantis):
+        if not valores.exato:
+            return _analise_distribuicao_esboco(valores)
+        valores = valores.valores()
+
+    from scipy import stats
+
     # Estatísticas descritivas
     media = np.mean(valores)
     mediana = np.median(valores)
@@ -134,10 +235,13 @@ def analise_distribuicao(valores: np.ndarray) -> Dict[str, Any]:
     }
 
 
+@instrumentar
 def analise_comparativa_periodos(df: pd.DataFrame, coluna: str, n_meses_recentes: int = 6) -> Dict[str, Any]:
     """
     Compara período recente com período anterior
     """
+    from scipy import stats
+
     total_meses = len(df)
     
     # Dividir em dois períodos
@@ -154,17 +258,7 @@ def analise_comparativa_periodos(df: pd.DataFrame, coluna: str, n_meses_recentes
     # Variação percentual
     variacao_pct = ((media_recente - media_anterior) / media_anterior * 100) if media_anterior != 0 else 0
     
-    # Interpretação
-    if p_value < 0.05:
-        if media_recente > media_anterior:
-            interpretacao = f"aumento significativo de {abs(variacao_pct):.1f}%"
-            status = "melhora" if coluna in ['Faturamento', 'NPS', 'Qtd_Atendimentos'] else "piora"
-        else:
-            interpretacao = f"redução significativa de {abs(variacao_pct):.1f}%"
-            status = "piora" if coluna in ['Faturamento', 'NPS', 'Qtd_Atendimentos'] else "melhora"
-    else:
-        interpretacao = "sem mudança significativa"
-        status = "estável"
+    interpretacao, status = _interpretar_mudanca(coluna, p_value < 0.05, media_anterior, media_recente, variacao_pct)
     
     return {
         'media_anterior': media_anterior,
@@ -178,12 +272,176 @@ def analise_comparativa_periodos(df: pd.DataFrame, coluna: str, n_meses_recentes
     }
 
 
-def calcular_capacidade_processo(valores: np.ndarray, limite_inferior: float, limite_superior: float) -> Dict[str, Any]:
+def _interpretar_mudanca(coluna: str, significante: bool, media_anterior: float, media_posterior: float,
+                         variacao_pct: float) -> Tuple[str, str]:
+    """Texto e status (melhora, piora ou estável) de uma mudança de média entre dois períodos."""
+    if not significante:
+        return "sem mudança significativa", "estável"
+    maior_melhor = coluna in ['Faturamento', 'NPS', 'Qtd_Atendimentos']
+    if media_posterior > media_anterior:
+        return f"aumento significativo de {abs(variacao_pct):.1f}%", "melhora" if maior_melhor else "piora"
+    return f"redução significativa de {abs(variacao_pct):.1f}%", "piora" if maior_melhor else "melhora"
+
+
+def _welch_por_somas(soma, soma_quadrados, inicio, divisao, fim):
     """
-    Calcula índices de capacidade do processo (Cp, Cpk)
+    Teste t de Welch entre valores[inicio:divisao] e valores[divisao:fim] a partir das somas
+    acumuladas de x e x² (com zero na frente). Os índices são arrays de qualquer forma
+    compatível; cada comparação custa O(1).
     """
-    media = np.mean(valores)
-    desvio = np.std(valores, ddof=1)
+    n1, n2 = divisao - inicio, fim - divisao
+    soma1, soma2 = soma[divisao] - soma[inicio], soma[fim] - soma[divisao]
+    media1, media2 = soma1 / n1, soma2 / n2
+    var1 = np.maximum(soma_quadrados[divisao] - soma_quadrados[inicio] - soma1 * media1, 0.0) / (n1 - 1)
+    var2 = np.maximum(soma_quadrados[fim] - soma_quadrados[divisao] - soma2 * media2, 0.0) / (n2 - 1)
+    erro1, erro2 = var1 / n1, var2 / n2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_stat = (media2 - media1) / np.sqrt(erro1 + erro2)
+        graus_liberdade = (erro1 + erro2) ** 2 / (erro1 ** 2 / (n1 - 1) + erro2 ** 2 / (n2 - 1))
+    return media1, media2, t_stat, graus_liberdade
+
+
+def teste_welch_divisoes(valores: np.ndarray, janelas: Optional[List[int]] = None,
+                         min_meses: int = MESES_MINIMOS_PERIODO) -> Dict[str, np.ndarray]:
+    """
+    Teste t de Welch (média posterior - anterior) em todos os pontos de divisão de uma série,
+    em uma única passada vetorizada sobre as somas acumuladas de x e x².
+
+    Sem janelas, compara todo o histórico anterior com todo o posterior a cada divisão.
+    Com janelas, compara os w meses antes com os w meses depois, para cada w.
+
+    Args:
+        valores (np.ndarray): Série temporal
+        janelas (list, optional): Tamanhos de janela; omitido, usa os períodos inteiros
+        min_meses (int): Meses mínimos de cada lado (ao menos 2)
+
+    Returns:
+        dict: 'divisao' (índice do primeiro mês posterior) e, com forma (divisões,) ou
+            (janelas, divisões): 'media_anterior', 'media_posterior', 't_statistic',
+            'graus_liberdade' e 'p_value' bicaudal; combinações fora da série ficam NaN
+    """
+    from scipy import stats
+
+    min_meses = max(int(min_meses), 2)
+    valores = np.asarray(valores, dtype=np.float64)
+    n = len(valores)
+    # Centrar na média antes de acumular reduz o cancelamento em soma(x²) - soma(x)²/n
+    centro = valores.mean() if n else 0.0
+    desvios = valores - centro
+    soma = np.concatenate([[0.0], np.cumsum(desvios)])
+    soma_quadrados = np.concatenate([[0.0], np.cumsum(desvios ** 2)])
+    divisao = np.arange(min_meses, n - min_meses + 1)
+
+    if janelas is None:
+        inicio, fim, validos = np.zeros_like(divisao), np.full_like(divisao, n), np.ones(len(divisao), dtype=bool)
+    else:
+        janelas = np.asarray(janelas, dtype=np.intp)[:, None]
+        if np.any(janelas < min_meses):
+            raise ValueError(f"janelas devem ter ao menos {min_meses} meses")
+        inicio, fim = divisao - janelas, divisao + janelas
+        validos = (inicio >= 0) & (fim <= n)
+        inicio, fim = np.where(validos, inicio, 0), np.where(validos, fim, n)
+        divisao = np.broadcast_to(divisao, validos.shape)
+
+    media1, media2, t_stat, graus_liberdade = _welch_por_somas(soma, soma_quadrados, inicio, divisao, fim)
+    p_value = 2 * stats.t.sf(np.abs(t_stat), graus_liberdade)
+
+    def _validos(vetor):
+        return np.where(validos, vetor, np.nan)
+
+    return {
+        'divisao': np.arange(min_meses, n - min_meses + 1),
+        'media_anterior': _validos(media1 + centro),
+        'media_posterior': _validos(media2 + centro),
+        't_statistic': _validos(t_stat),
+        'graus_liberdade': _validos(graus_liberdade),
+        'p_value': _validos(p_value)
+    }
+
+
+@instrumentar
+def analise_pontos_ruptura(df: pd.DataFrame, coluna: str, janelas: Optional[List[int]] = None,
+                           min_meses: int = MESES_MINIMOS_PERIODO) -> Dict[str, Any]:
+    """
+    Procura o ponto em que a média de uma variável mudou, testando (Welch) todas as divisões
+    do histórico, com os períodos inteiros e com janelas simétricas de cada tamanho.
+
+    O ponto de ruptura é a divisão dos períodos inteiros com o menor p-valor; como ele é o
+    melhor entre muitas divisões, a significância usa o p-valor com correção de Bonferroni.
+
+    Args:
+        df (pd.DataFrame): Histórico em ordem temporal (a coluna 'Data', se houver, rotula as divisões)
+        coluna (str): Variável analisada
+        janelas (list, optional): Tamanhos de janela (padrão: de min_meses até metade da série,
+            limitado a JANELA_MAXIMA_RUPTURA)
+        min_meses (int): Meses mínimos de cada lado
+
+    Returns:
+        dict: 'divisoes' (DataFrame por divisão com médias, t, graus de liberdade e p-valor),
+            't_janelas' e 'p_janelas' (Janela x divisão), o ponto de ruptura ('data_ruptura',
+            médias, variação, t, 'p_value', 'p_value_ajustado') e a interpretação
+    """
+    valores = df[coluna].to_numpy(dtype=np.float64)
+    n = len(valores)
+    rotulos = df['Data'].to_numpy() if 'Data' in df else np.arange(n)
+    if janelas is None:
+        janelas = list(range(min_meses, min(n // 2, JANELA_MAXIMA_RUPTURA) + 1))
+
+    total = teste_welch_divisoes(valores, None, min_meses)
+    por_janela = teste_welch_divisoes(valores, janelas, min_meses)
+    datas = pd.Index(rotulos[total['divisao']], name='Divisao')
+    if len(datas) == 0:
+        raise ValueError(f"{coluna}: são necessários ao menos {2 * min_meses} meses")
+
+    divisoes = pd.DataFrame({
+        'Media_Anterior': total['media_anterior'],
+        'Media_Posterior': total['media_posterior'],
+        't_statistic': total['t_statistic'],
+        'graus_liberdade': total['graus_liberdade'],
+        'p_value': total['p_value']
+    }, index=datas)
+    indice_janelas = pd.Index(janelas, name='Janela')
+    t_janelas = pd.DataFrame(por_janela['t_statistic'], index=indice_janelas, columns=datas)
+    p_janelas = pd.DataFrame(por_janela['p_value'], index=indice_janelas, columns=datas)
+
+    melhor = int(np.nanargmin(np.where(np.isnan(total['p_value']), np.inf, total['p_value'])))
+    media_anterior, media_posterior = total['media_anterior'][melhor], total['media_posterior'][melhor]
+    p_value = total['p_value'][melhor]
+    p_value_ajustado = min(1.0, p_value * len(datas))
+    variacao_pct = ((media_posterior - media_anterior) / media_anterior * 100) if media_anterior != 0 else 0
+    interpretacao, status = _interpretar_mudanca(coluna, p_value_ajustado < 0.05, media_anterior,
+                                                 media_posterior, variacao_pct)
+
+    return {
+        'divisoes': divisoes,
+        't_janelas': t_janelas,
+        'p_janelas': p_janelas,
+        'data_ruptura': datas[melhor],
+        'media_anterior': media_anterior,
+        'media_posterior': media_posterior,
+        'variacao_percentual': variacao_pct,
+        't_statistic': total['t_statistic'][melhor],
+        'p_value': p_value,
+        'p_value_ajustado': p_value_ajustado,
+        'significante': p_value_ajustado < 0.05,
+        'interpretacao': interpretacao,
+        'status': status
+    }
+
+
+@instrumentar
+def calcular_capacidade_processo(valores, limite_inferior: float, limite_superior: float) -> Dict[str, Any]:
+    """
+    Calcula índices de capacidade do processo (Cp, Cpk).
+    valores pode ser também um MomentosFluxo (dentro_limites passa a ser a fração esperada
+    sob normalidade) ou um EsbocoQuantis (dentro_limites pela cdf do esboço).
+    """
+    momentos = _momentos_acumulados(valores)
+    if momentos is not None:
+        media, desvio = float(momentos.media), float(momentos.desvio_padrao(ddof=1))
+    else:
+        media = np.mean(valores)
+        desvio = np.std(valores, ddof=1)
     
     if desvio == 0:
         return {
@@ -221,10 +479,23 @@ def calcular_capacidade_processo(valores: np.ndarray, limite_inferior: float, li
         'cpl': cpl,
         'interpretacao': interpretacao,
         'status': status,
-        'dentro_limites': np.sum((valores >= limite_inferior) & (valores <= limite_superior)) / len(valores) * 100
+        'dentro_limites': _percentual_dentro_limites(valores, media, desvio, limite_inferior, limite_superior)
     }
 
 
+def _percentual_dentro_limites(valores, media: float, desvio: float, limite_inferior: float,
+                               limite_superior: float) -> float:
+    """Percentual das observações entre os limites (estimado para acumuladores)."""
+    if isinstance(valores, EsbocoQuantis):
+        return (valores.cdf(limite_superior) - valores.cdf(limite_inferior, estrito=True)) * 100
+    if isinstance(valores, MomentosFluxo):
+        from scipy import stats
+
+        return (stats.norm.cdf(limite_superior, media, desvio) - stats.norm.cdf(limite_inferior, media, desvio)) * 100
+    return np.sum((valores >= limite_inferior) & (valores <= limite_superior)) / len(valores) * 100
+
+
+@instrumentar
 def gerar_insights_comerciais(df: pd.DataFrame, modelo, features: List[str]) -> List[Dict[str, str]]:
     """
     Gera insights comerciais baseados em análise estatística
@@ -305,25 +576,50 @@ def gerar_insights_comerciais(df: pd.DataFrame, modelo, features: List[str]) ->
     return insights
 
 
-def calcular_previsao_com_intervalo(modelo, features: List[str], inputs: Dict[str, float], 
-                                    df_historico: pd.DataFrame) -> Dict[str, Any]:
+@instrumentar
+def calcular_erro_padrao_residual(modelo, features: List[str], df_historico: pd.DataFrame) -> float:
     """
-    Calcula previsão com intervalo de confiança
+    Calcula o erro padrão residual do modelo sobre o histórico.
+    Aceita o histórico bruto (aplica a engenharia de features) ou já com as features.
     """
-    # Preparar dados de entrada
-    X_pred = pd.DataFrame([inputs])[features]
+    if not set(features).issubset(df_historico.columns):
+        df_historico, _ = preparar_features(df_historico)
     
-    # Previsão pontual
-    previsao = modelo.predict(X_pred)[0]
+    if not isinstance(modelo, dict):
+        modelo = compilar_modelo(modelo, features)
     
-    # Calcular erro padrão residual do modelo
-    X_train = df_historico[features]
+    X_train = df_historico[modelo['feature_names']].to_numpy(dtype=np.float64)
     y_train = df_historico['Sinistralidade_Realizada']
-    y_pred_train = modelo.predict(X_train)
+    meses = df_historico['Mes'].to_numpy(dtype=np.intp)
+    y_pred_train = X_train @ modelo['coef'] + modelo['interceptos_mes'][meses - 1]
     residuos = y_train - y_pred_train
-    erro_padrao = np.std(residuos)
     
-    # Intervalo de confiança (95%)
+    return float(np.std(residuos))
+
+
+def calcular_previsao_com_intervalo(modelo, features: List[str], inputs: Dict[str, float], 
+                                    df_historico: Optional[pd.DataFrame] = None,
+                                    erro_padrao: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Calcula previsão com intervalo de confiança.
+    Aceita o modelo compilado (model.compilar_modelo) e um erro_padrao pré-calculado,
+    o que evita refazer as previsões do histórico a cada chamada.
+    """
+    # Previsão pontual
+    modelo_compilado = modelo if isinstance(modelo, dict) else compilar_modelo(modelo, features)
+    previsao = prever_compilado(modelo_compilado, inputs)
+    
+    # Calcular erro padrão residual do modelo
+    if erro_padrao is None:
+        erro_padrao = calcular_erro_padrao_residual(modelo, features, df_historico)
+    
+    return montar_intervalo_previsao(previsao, erro_padrao)
+
+
+def montar_intervalo_previsao(previsao: float, erro_padrao: float) -> Dict[str, Any]:
+    """
+    Monta o resultado com intervalo de confiança (95%) a partir de uma previsão pontual
+    """
     margem_erro = 1.96 * erro_padrao
     ic_inferior = previsao - margem_erro
     ic_superior = previsao + margem_erro
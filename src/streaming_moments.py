@@ -0,0 +1,217 @@
+"""
+Momentos em fluxo (contagem, média, M2, M3, M4, mínimo e máximo), mescláveis.
+
+Cada bloco de observações é resumido em duas passagens (média e potências dos desvios
+em relação a ela) e incorporado ao acumulado pelas fórmulas de Chan/Pébay, que somam
+momentos centrais de dois conjuntos sem voltar aos dados e sem a perda de precisão de
+somar x² e subtrair n·média². Uma observação por vez é o caso particular do algoritmo
+de Welford, de modo que um fechamento mensal custa O(1) por série.
+
+O estado pode ter qualquer forma (por exemplo, empresas x KPIs): cada posição é uma série
+independente, atualizada de forma vetorizada, e NaN marca posições sem observação no
+bloco. Acumuladores de blocos, processos ou empresas diferentes se mesclam em qualquer
+ordem (mesclar, ou reduzir ao longo de um eixo do estado), e o estado é gravado em .npz.
+"""
+import numpy as np
+
+__all__ = [
+    'CAMPOS_MOMENTOS',
+    'MomentosFluxo',
+    'momentos_em_blocos'
+]
+
+# Vetores do estado, gravados por MomentosFluxo.salvar
+CAMPOS_MOMENTOS = ('n', 'media', 'm2', 'm3', 'm4', 'minimo', 'maximo')
+
+
+def _combinar(a, b):
+    """
+    Fórmulas de Chan/Pébay: momentos centrais da união de dois conjuntos.
+
+    Args:
+        a, b (tuple): (n, media, m2, m3, m4) de cada conjunto, arrays de mesma forma
+
+    Returns:
+        tuple: (n, media, m2, m3, m4) da união (posições com n = 0 ficam zeradas)
+    """
+    na, media_a, m2a, m3a, m4a = a
+    nb, media_b, m2b, m3b, m4b = b
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = np.where(n > 0, media_b - media_a, 0.0)
+        delta_n = np.where(n > 0, delta / n, 0.0)
+    produto = na * nb
+    media = media_a + delta_n * nb
+    m2 = m2a + m2b + delta * delta_n * produto
+    m3 = (m3a + m3b + delta * delta_n ** 2 * produto * (na - nb)
+          + 3 * delta_n * (na * m2b - nb * m2a))
+    m4 = (m4a + m4b + delta * delta_n ** 3 * produto * (na * na - produto + nb * nb)
+          + 6 * delta_n ** 2 * (na * na * m2b + nb * nb * m2a) + 4 * delta_n * (na * m3b - nb * m3a))
+    return n, media, m2, m3, m4
+
+
+class MomentosFluxo:
+    """
+    Acumulador mesclável dos quatro primeiros momentos, mínimo e máximo.
+
+    Args:
+        forma (tuple): Forma do estado; () para uma única série
+
+    Attributes:
+        n (np.ndarray): Observações de cada série
+        media (np.ndarray): Média de cada série
+        m2, m3, m4 (np.ndarray): Somas dos desvios à média elevados a 2, 3 e 4
+        minimo, maximo (np.ndarray): Extremos de cada série (NaN sem observações)
+    """
+
+    def __init__(self, forma=()):
+        forma = (int(forma),) if np.ndim(forma) == 0 and forma != () else tuple(forma)
+        self.n = np.zeros(forma)
+        self.media = np.zeros(forma)
+        self.m2 = np.zeros(forma)
+        self.m3 = np.zeros(forma)
+        self.m4 = np.zeros(forma)
+        self.minimo = np.full(forma, np.nan)
+        self.maximo = np.full(forma, np.nan)
+
+    @property
+    def forma(self):
+        return self.n.shape
+
+    def _incorporar(self, n, media, m2, m3, m4, minimo, maximo):
+        """Mescla momentos já resumidos ao estado."""
+        self.n, self.media, self.m2, self.m3, self.m4 = _combinar(
+            (self.n, self.media, self.m2, self.m3, self.m4), (n, media, m2, m3, m4))
+        self.minimo = np.fmin(self.minimo, minimo)
+        self.maximo = np.fmax(self.maximo, maximo)
+
+    def adicionar(self, valores):
+        """
+        Incorpora um bloco de observações, reduzido ao longo do primeiro eixo.
+
+        Args:
+            valores (array-like): (m, *forma) ou, em um estado de uma série, (m,); NaN
+                são ignorados
+
+        Returns:
+            MomentosFluxo: O próprio acumulador
+        """
+        valores = np.asarray(valores, dtype=np.float64).reshape((-1,) + self.forma)
+        if not len(valores):
+            return self
+        observado = ~np.isnan(valores)
+        n = observado.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(n > 0, np.where(observado, valores, 0.0).sum(axis=0) / n, 0.0)
+        desvios = np.where(observado, valores - media, 0.0)
+        quadrados = desvios * desvios
+        self._incorporar(n, media, quadrados.sum(axis=0), (quadrados * desvios).sum(axis=0),
+                         (quadrados * quadrados).sum(axis=0),
+                         np.fmin.reduce(valores, axis=0), np.fmax.reduce(valores, axis=0))
+        return self
+
+    def atualizar(self, valores):
+        """Incorpora uma observação por série (forma do estado), como no fechamento mensal."""
+        return self.adicionar(np.asarray(valores, dtype=np.float64)[np.newaxis])
+
+    def mesclar(self, outro):
+        """
+        Incorpora outro acumulador de mesma forma (o outro não é alterado).
+
+        Returns:
+            MomentosFluxo: O próprio acumulador
+        """
+        if outro.forma != self.forma:
+            raise ValueError(f"Só é possível mesclar acumuladores de mesma forma ({self.forma} e {outro.forma})")
+        self._incorporar(*(getattr(outro, campo) for campo in CAMPOS_MOMENTOS))
+        return self
+
+    def reduzir(self, eixo=0):
+        """
+        Mescla as séries ao longo de um eixo do estado (por exemplo, empresas -> frota),
+        em árvore: log2 rodadas vetorizadas de mesclas aos pares.
+
+        Returns:
+            MomentosFluxo: Novo acumulador sem o eixo reduzido
+        """
+        campos = [np.moveaxis(getattr(self, campo), eixo, 0) for campo in CAMPOS_MOMENTOS]
+        if not len(campos[0]):
+            return MomentosFluxo(campos[0].shape[1:])
+        while len(campos[0]) > 1:
+            pares = len(campos[0]) // 2 * 2
+            combinados = _combinar(tuple(c[0:pares:2] for c in campos[:5]), tuple(c[1:pares:2] for c in campos[:5]))
+            extremos = (np.fmin(campos[5][0:pares:2], campos[5][1:pares:2]),
+                        np.fmax(campos[6][0:pares:2], campos[6][1:pares:2]))
+            campos = [np.concatenate([novo, c[pares:]]) for novo, c in zip((*combinados, *extremos), campos)]
+        resultado = MomentosFluxo(campos[0].shape[1:])
+        for campo, valor in zip(CAMPOS_MOMENTOS, campos):
+            setattr(resultado, campo, valor[0])
+        return resultado
+
+    def variancia(self, ddof=0):
+        """Variância (ddof=1 para a amostral); NaN com n <= ddof."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > ddof, self.m2 / (self.n - ddof), np.nan)[()]
+
+    def desvio_padrao(self, ddof=0):
+        """Desvio padrão (ddof=1 para o amostral)."""
+        return np.sqrt(self.variancia(ddof))
+
+    def erro_padrao(self):
+        """Erro padrão da média (desvio amostral / raiz de n), como scipy.stats.sem."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.variancia(1) / self.n)[()]
+
+    def assimetria(self):
+        """Assimetria g1 (como scipy.stats.skew com bias=True)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (np.sqrt(self.n) * self.m3 / self.m2 ** 1.5)[()]
+
+    def curtose(self):
+        """Excesso de curtose g2 (como scipy.stats.kurtosis com bias=True)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.n * self.m4 / (self.m2 * self.m2) - 3)[()]
+
+    def estado(self):
+        """Vetores do estado por nome de campo (CAMPOS_MOMENTOS)."""
+        return {campo: getattr(self, campo) for campo in CAMPOS_MOMENTOS}
+
+    @classmethod
+    def de_estado(cls, estado):
+        """Reconstrói um acumulador a partir de estado()."""
+        momentos = cls(np.shape(estado['n']))
+        for campo in CAMPOS_MOMENTOS:
+            setattr(momentos, campo, np.array(estado[campo], dtype=np.float64))
+        return momentos
+
+    def salvar(self, caminho):
+        """Grava o estado em um .npz compactado (sem pickle)."""
+        np.savez_compressed(caminho, **self.estado())
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Reconstrói um acumulador gravado por salvar."""
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            return cls.de_estado({campo: arquivo[campo] for campo in CAMPOS_MOMENTOS})
+
+
+def momentos_em_blocos(blocos, colunas=None):
+    """
+    Acumula os momentos de um fluxo de blocos, com memória limitada ao maior bloco.
+
+    Args:
+        blocos (iterable): Arrays ou DataFrames (por exemplo pd.read_csv(..., chunksize=...))
+        colunas (str | list, optional): Coluna (estado de uma série) ou colunas (uma série
+            por coluna) lidas de cada DataFrame
+
+    Returns:
+        MomentosFluxo
+    """
+    momentos = None
+    for bloco in blocos:
+        valores = np.asarray(bloco[colunas] if colunas is not None else bloco, dtype=np.float64)
+        if momentos is None:
+            momentos = MomentosFluxo(valores.shape[1:])
+        momentos.adicionar(valores)
+    forma = (len(colunas),) if isinstance(colunas, (list, tuple)) else ()
+    return momentos if momentos is not None else MomentosFluxo(forma)
@@ -1,7 +1,118 @@
 """
 Módulo com funções utilitárias e auxiliares.
 """
+import hashlib
+import importlib
+
 import pandas as pd
+import numpy as np
+
+from config import DTYPE_CALCULO, DTYPES_SUPORTADOS
+
+__all__ = [
+    'ModuloSobDemanda',
+    'resolver_dtype',
+    'assinatura_valor',
+    'memo_sessao',
+    'calcular_metricas_derivadas',
+    'calcular_metricas_derivadas_lote',
+    'gerar_recomendacoes',
+    'determinar_status_sinistralidade',
+    'determinar_status_sinistralidade_lote',
+    'preparar_dados_sazonalidade',
+    'calcular_estatisticas_sinistralidade'
+]
+
+
+class ModuloSobDemanda:
+    """
+    Adia a importação de um módulo pesado até o primeiro acesso a um atributo.
+    
+    Exemplo:
+        px = ModuloSobDemanda('plotly.express')  # nada é importado aqui
+        px.line(...)                              # importa plotly.express neste ponto
+    """
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        modulo = self._modulo
+        if modulo is None:
+            modulo = self._modulo = importlib.import_module(self._nome)
+        return getattr(modulo, atributo)
+
+    def __repr__(self):
+        estado = 'carregado' if self._modulo is not None else 'não carregado'
+        return f"<ModuloSobDemanda '{self._nome}' ({estado})>"
+
+
+def resolver_dtype(dtype=None):
+    """
+    Resolve a precisão numérica de cálculo.
+    
+    Args:
+        dtype (str | np.dtype, optional): 'float32' ou 'float64' (padrão: DTYPE_CALCULO)
+    
+    Returns:
+        np.dtype: dtype de ponto flutuante
+    """
+    dtype = np.dtype(DTYPE_CALCULO if dtype is None else dtype)
+    if dtype.name not in DTYPES_SUPORTADOS:
+        raise ValueError(f"dtype não suportado: {dtype.name} (use {' ou '.join(DTYPES_SUPORTADOS)})")
+    return dtype
+
+
+def assinatura_valor(valor):
+    """
+    Identifica o conteúdo de um argumento, para saber se um resultado memorizado ainda vale.
+    
+    DataFrames, Series e arrays entram pelo hash do conteúdo (dados regenerados com os
+    mesmos valores mantêm a assinatura); listas, tuplas e dicts, item a item; valores
+    hasheáveis, por eles mesmos; outros objetos (como modelos de st.cache_resource), pela
+    identidade, que muda quando o objeto é recriado.
+    
+    Returns:
+        Valor hasheável e comparável
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        nomes = tuple(map(str, valor.columns)) if isinstance(valor, pd.DataFrame) else (str(valor.name),)
+        return ('pandas', valor.shape, nomes, int(pd.util.hash_pandas_object(valor).sum()))
+    if isinstance(valor, np.ndarray):
+        conteudo = hashlib.blake2b(np.ascontiguousarray(valor).tobytes(), digest_size=16).hexdigest()
+        return ('numpy', valor.shape, valor.dtype.str, conteudo)
+    if isinstance(valor, (list, tuple)):
+        return (type(valor).__name__, tuple(assinatura_valor(item) for item in valor))
+    if isinstance(valor, dict):
+        return ('dict', tuple((chave, assinatura_valor(item)) for chave, item in valor.items()))
+    try:
+        hash(valor)
+    except TypeError:
+        return ('id', id(valor))
+    return valor
+
+
+def memo_sessao(chave, funcao, *args, **kwargs):
+    """
+    Calcula uma vez por sessão do Streamlit e reaproveita o resultado nos reruns seguintes,
+    enquanto os argumentos forem os mesmos: dados ou modelo novos recalculam e substituem a
+    entrada.
+    
+    Args:
+        chave (str): Nome da entrada no memo da sessão
+        funcao (callable): Função chamada com args e kwargs quando a entrada não vale mais
+    
+    Returns:
+        Resultado de funcao(*args, **kwargs), calculado agora ou nesta sessão
+    """
+    import streamlit as st  # só os apps usam; importar aqui mantém utils leve
+    
+    memo = st.session_state.setdefault('_memo_sessao', {})
+    assinatura = (assinatura_valor(args), assinatura_valor(kwargs))
+    if chave not in memo or memo[chave][0] != assinatura:
+        memo[chave] = (assinatura, funcao(*args, **kwargs))
+    return memo[chave][1]
 
 
 def calcular_metricas_derivadas(predicao, sinistralidade_ant, qtd_atendimentos, ticket_medio):
@@ -26,6 +137,29 @@ def calcular_metricas_derivadas(predicao, sinistralidade_ant, qtd_atendimentos,
     }
 
 
+def calcular_metricas_derivadas_lote(predicao, sinistralidade_ant, qtd_atendimentos, ticket_medio=None):
+    """
+    Versão vetorizada de calcular_metricas_derivadas (arrays ou Series).
+    Mantém float32 quando a previsão vem em float32; senão calcula em float64.
+    
+    Returns:
+        dict: Arrays 'margem_bruta' e 'ticket_real'
+    """
+    predicao = np.asarray(predicao)
+    dtype = predicao.dtype if predicao.dtype == np.float32 else np.float64
+    predicao = predicao.astype(dtype, copy=False)
+    sinistralidade_ant = np.asarray(sinistralidade_ant, dtype=dtype)
+    qtd_atendimentos = np.asarray(qtd_atendimentos, dtype=dtype)
+    
+    margem_bruta = predicao - (predicao * sinistralidade_ant / 100)
+    ticket_real = np.divide(predicao, qtd_atendimentos, out=np.zeros_like(predicao), where=qtd_atendimentos > 0)
+    
+    return {
+        'margem_bruta': margem_bruta,
+        'ticket_real': ticket_real
+    }
+
+
 def gerar_recomendacoes(tempo_atend, taxa_reincidencia, nps, sinistralidade_ant, 
                         sinistralidade_orcada, perc_pecas):
     """
@@ -72,6 +206,22 @@ def determinar_status_sinistralidade(sinistralidade_ant):
         return "🚨 **Crítico** - Sinistralidade elevada, requer ação imediata (> 60%)", "error"
 
 
+def determinar_status_sinistralidade_lote(sinistralidade_ant):
+    """
+    Versão vetorizada de determinar_status_sinistralidade.
+    
+    Returns:
+        tuple: (mensagens, cores) como arrays
+    """
+    sinistralidade_ant = np.asarray(sinistralidade_ant, dtype=np.float64)
+    faixa = np.select([sinistralidade_ant <= 50, sinistralidade_ant <= 60], [0, 1], default=2)
+    
+    # Mesmas mensagens da versão escalar, uma por faixa
+    mensagens, cores = zip(*(determinar_status_sinistralidade(v) for v in (50, 60, 100)))
+    
+    return np.array(mensagens)[faixa], np.array(cores)[faixa]
+
+
 def preparar_dados_sazonalidade(dados):
     """Prepara dados para análise de sazonalidade."""
     dados_sazon = dados.groupby('Mes').agg({
@@ -2,10 +2,49 @@
 Módulo para criação de visualizações e gráficos.
 Focado em UX e Storytelling Visual
 """
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+from instrumentation import instrumentar
+from utils import ModuloSobDemanda
+
+# Plotly é importado no primeiro gráfico criado, não na importação do módulo
+px = ModuloSobDemanda('plotly.express')
+go = ModuloSobDemanda('plotly.graph_objects')
+
+__all__ = [
+    'COLORS',
+    'PLOT_BG',
+    'FONT_FAMILY',
+    'GRID_COLOR',
+    'MAX_PONTOS_SERIE',
+    'LIMIAR_WEBGL',
+    'LIMIAR_TEXTO_HEATMAP',
+    'aplicar_estilo_padrao',
+    'usar_webgl',
+    'classe_scatter',
+    'indices_lttb',
+    'indices_min_max',
+    'reduzir_serie',
+    'criar_grafico_faturamento',
+    'criar_grafico_sinistralidade',
+    'criar_grafico_atendimentos',
+    'criar_grafico_nps',
+    'criar_grafico_ticket_medio',
+    'criar_grafico_sazonalidade',
+    'criar_grafico_comparativo_sinistralidade',
+    'criar_matriz_correlacao',
+    'criar_gauge_sinistralidade',
+    'criar_grafico_coeficientes',
+    'criar_grafico_evolucao_faturamento',
+    'criar_heatmap_correlacao',
+    'criar_boxplot_sinistralidade',
+    'criar_boxplot_faturamento',
+    'criar_grafico_comparativo_periodos',
+    'criar_grafico_kpi_cards',
+    'criar_grafico_importancia_features',
+    'criar_grafico_controle',
+    'criar_grafico_pontos_ruptura'
+]
 
 # Paleta de cores consistente para storytelling
 COLORS = {
@@ -24,6 +63,15 @@ PLOT_BG = 'rgba(0,0,0,0)'
 FONT_FAMILY = 'Arial, sans-serif'
 GRID_COLOR = 'rgba(128,128,128,0.2)'
 
+# Orçamento de pontos por série temporal (aprox. largura útil do gráfico em pixels)
+MAX_PONTOS_SERIE = 1500
+
+# Acima deste número de pontos por traço, linhas e dispersões passam para WebGL
+LIMIAR_WEBGL = 10000
+
+# Acima deste número de variáveis o heatmap de correlação omite o texto por célula
+LIMIAR_TEXTO_HEATMAP = 40
+
 def aplicar_estilo_padrao(fig):
     """Aplica estilo padrão aos gráficos"""
     fig.update_layout(
@@ -37,22 +85,147 @@ def aplicar_estilo_padrao(fig):
     return fig
 
 
-def criar_grafico_faturamento(dados):
+def usar_webgl(n_pontos, renderizacao='auto'):
+    """
+    Decide se o traço deve ser desenhado em WebGL.
+
+    Args:
+        n_pontos (int): Pontos que serão enviados ao navegador
+        renderizacao (str): 'auto' (WebGL acima de LIMIAR_WEBGL), 'svg' ou 'webgl'
+    """
+    if renderizacao == 'auto':
+        return n_pontos > LIMIAR_WEBGL
+    return renderizacao == 'webgl'
+
+
+def classe_scatter(n_pontos, renderizacao='auto'):
+    """Retorna go.Scattergl ou go.Scatter conforme o modo de renderização."""
+    return go.Scattergl if usar_webgl(n_pontos, renderizacao) else go.Scatter
+
+
+def _eixo_numerico(x):
+    """Converte o eixo x (datas ou números) em float64 para cálculos de área."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def indices_lttb(x, y, n_alvo):
+    """
+    Seleciona índices pelo algoritmo Largest-Triangle-Three-Buckets (LTTB).
+    Mantém o primeiro e o último ponto e, em cada balde, o ponto que forma o maior
+    triângulo com o ponto escolhido anterior e a média do balde seguinte,
+    preservando picos e vales visuais.
+    """
+    n = len(y)
+    if n_alvo >= n or n_alvo < 3:
+        return np.arange(n)
+
+    x = _eixo_numerico(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Limites dos baldes internos (primeiro e último ponto ficam fixos)
+    limites = np.linspace(1, n - 1, n_alvo - 1).astype(np.int64)
+    indices = np.empty(n_alvo, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    anterior = 0
+    for b in range(n_alvo - 2):
+        inicio, fim = limites[b], limites[b + 1]
+        prox_inicio = fim
+        prox_fim = limites[b + 2] if b + 2 < len(limites) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[b + 1] = anterior
+
+    return indices
+
+
+def indices_min_max(y, n_alvo):
+    """
+    Seleciona índices preservando o mínimo e o máximo de cada balde.
+    Indicado para barras, onde cada pico/outlier precisa continuar visível.
+    """
+    n = len(y)
+    if n_alvo >= n or n_alvo < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_baldes = (n_alvo - 2) // 2
+    balde = (np.arange(n) * n_baldes) // n
+
+    # Ordena por balde e, dentro dele, por valor: extremos ficam nas bordas
+    ordem = np.lexsort((y, balde))
+    baldes = np.arange(n_baldes)
+    idx_min = ordem[np.searchsorted(balde, baldes, side='left')]
+    idx_max = ordem[np.searchsorted(balde, baldes, side='right') - 1]
+
+    return np.unique(np.concatenate([idx_min, idx_max, [0, n - 1]]))
+
+
+def reduzir_serie(dados, coluna, max_pontos=MAX_PONTOS_SERIE, metodo='lttb', intervalo=None, coluna_x='Data'):
+    """
+    Reduz as linhas de uma série temporal ao orçamento de pontos antes do envio ao navegador.
+
+    Args:
+        dados (pd.DataFrame): Série completa
+        coluna (str): Coluna usada para escolher os pontos preservados
+        max_pontos (int, optional): Orçamento de pontos; None desativa a redução
+        metodo (str): 'lttb' para linhas ou 'min_max' para barras
+        intervalo (tuple, optional): Janela (inicio, fim) do eixo x em zoom. A redução é
+            refeita só dentro da janela, devolvendo resolução maior ao aproximar.
+        coluna_x (str): Coluna do eixo x
+
+    Returns:
+        pd.DataFrame: Linhas selecionadas, na ordem original
+    """
+    if intervalo is not None:
+        inicio, fim = intervalo
+        dados = dados[(dados[coluna_x] >= inicio) & (dados[coluna_x] <= fim)]
+
+    if max_pontos is None or len(dados) <= max_pontos:
+        return dados
+
+    if metodo == 'min_max':
+        indices = indices_min_max(dados[coluna].values, max_pontos)
+    else:
+        indices = indices_lttb(dados[coluna_x].values, dados[coluna].values, max_pontos)
+
+    return dados.iloc[indices]
+
+
+@instrumentar
+def criar_grafico_faturamento(dados, renderizacao='auto'):
     """Cria gráfico de evolução do faturamento."""
     fig = px.line(
         dados, 
         x='Data', 
         y='Faturamento', 
         title='Evolução do Faturamento',
-        labels={'Faturamento': 'Faturamento (R$)', 'Data': 'Período'}
+        labels={'Faturamento': 'Faturamento (R$)', 'Data': 'Período'},
+        render_mode='webgl' if usar_webgl(len(dados), renderizacao) else 'svg'
     )
     fig.update_traces(line_color='#1f77b4', line_width=2)
     return fig
 
 
-def criar_grafico_sinistralidade(dados):
-    """Cria gráfico de sinistralidade com storytelling visual - Realizada, Orçada e Meta."""
+@instrumentar
+def criar_grafico_sinistralidade(dados, renderizacao='auto', rupturas=None):
+    """
+    Cria gráfico de sinistralidade com storytelling visual - Realizada, Orçada e Meta.
+    rupturas (segmentos de changepoint.segmentar_serie) acrescenta o nível de cada regime e
+    marca o início de cada um.
+    """
     fig = go.Figure()
+    Scatter = classe_scatter(len(dados), renderizacao)
     
     # Área de zona segura (abaixo de 50%)
     fig.add_hrect(
@@ -88,7 +261,7 @@ def criar_grafico_sinistralidade(dados):
     )
     
     # Linha de Sinistralidade Orçada (primeira, mais sutil)
-    fig.add_trace(go.Scatter(
+    fig.add_trace(Scatter(
         x=dados['Data'], 
         y=dados['Sinistralidade_Orcada'],
         mode='lines',
@@ -98,7 +271,7 @@ def criar_grafico_sinistralidade(dados):
     ))
     
     # Linha de Sinistralidade Realizada (destaque principal)
-    fig.add_trace(go.Scatter(
+    fig.add_trace(Scatter(
         x=dados['Data'], 
         y=dados['Sinistralidade_Realizada'],
         mode='lines+markers',
@@ -111,6 +284,30 @@ def criar_grafico_sinistralidade(dados):
         customdata=dados['Sinistralidade_Realizada'] - 50
     ))
     
+    # Regimes entre as rupturas detectadas: nível médio de cada um e a data da mudança
+    if rupturas is not None and len(rupturas) > 1:
+        inicios = list(pd.to_datetime(rupturas['Inicio']))
+        fins = inicios[1:] + [pd.to_datetime(dados['Data'].iloc[-1])]
+        x_regimes, y_regimes = [], []
+        for inicio, fim, media in zip(inicios, fins, rupturas['Media']):
+            x_regimes += [inicio, fim, None]
+            y_regimes += [media, media, None]
+        fig.add_trace(Scatter(
+            x=x_regimes,
+            y=y_regimes,
+            mode='lines',
+            name='📐 Nível por Regime',
+            line=dict(color=COLORS['purple'], width=2.5),
+            hovertemplate='<b>Nível do regime</b>: %{y:.1f}%<extra></extra>'
+        ))
+        for inicio, variacao in zip(inicios[1:], rupturas['Variacao_Percentual'].iloc[1:]):
+            fig.add_vline(x=inicio, line_dash='dot', line_color=COLORS['purple'], line_width=2)
+            fig.add_annotation(
+                x=inicio, y=1, yref='paper', yanchor='bottom', showarrow=False,
+                text=f'Ruptura {variacao:+.1f}%', font=dict(size=11, color=COLORS['purple']),
+                bgcolor='rgba(255,255,255,0.8)'
+            )
+    
     # Linha da Meta (50%)
     fig.add_hline(
         y=50, 
@@ -169,6 +366,7 @@ def criar_grafico_sinistralidade(dados):
     return fig
 
 
+@instrumentar
 def criar_grafico_atendimentos(dados):
     """Cria gráfico de volume de atendimentos."""
     fig = px.bar(
@@ -181,9 +379,12 @@ def criar_grafico_atendimentos(dados):
     return fig
 
 
-def criar_grafico_nps(dados):
+@instrumentar
+def criar_grafico_nps(dados, max_pontos=MAX_PONTOS_SERIE, intervalo=None, renderizacao='auto'):
     """Cria gráfico de evolução do NPS com zonas de classificação."""
     fig = go.Figure()
+    dados_plot = reduzir_serie(dados, 'NPS', max_pontos, intervalo=intervalo)
+    Scatter = classe_scatter(len(dados_plot), renderizacao)
     
     # Zonas de classificação NPS
     fig.add_hrect(y0=0, y1=50, fillcolor='rgba(214, 39, 40, 0.1)', layer='below', line_width=0,
@@ -195,17 +396,17 @@ def criar_grafico_nps(dados):
     
     # Linha do NPS com gradiente de cores
     cores_nps = [COLORS['danger'] if v < 50 else COLORS['warning'] if v < 70 else COLORS['success'] 
-                 for v in dados['NPS']]
+                 for v in dados_plot['NPS']]
     
-    fig.add_trace(go.Scatter(
-        x=dados['Data'],
-        y=dados['NPS'],
+    fig.add_trace(Scatter(
+        x=dados_plot['Data'],
+        y=dados_plot['NPS'],
         mode='lines+markers',
         name='😊 NPS',
         line=dict(color=COLORS['purple'], width=3),
         marker=dict(size=8, color=cores_nps, line=dict(width=2, color='white')),
         hovertemplate='<b>NPS</b>: %{y:.0f}<br><i>%{customdata}</i><extra></extra>',
-        customdata=['Crítico' if v < 50 else 'Aperfeiçoar' if v < 70 else 'Excelente' for v in dados['NPS']]
+        customdata=['Crítico' if v < 50 else 'Aperfeiçoar' if v < 70 else 'Excelente' for v in dados_plot['NPS']]
     ))
     
     # Meta
@@ -231,8 +432,8 @@ def criar_grafico_nps(dados):
     )
     
     # Destacar último NPS
-    ultimo_nps = dados['NPS'].iloc[-1]
-    ultima_data = dados['Data'].iloc[-1]
+    ultimo_nps = dados_plot['NPS'].iloc[-1]
+    ultima_data = dados_plot['Data'].iloc[-1]
     cor_ultimo = COLORS['danger'] if ultimo_nps < 50 else COLORS['warning'] if ultimo_nps < 70 else COLORS['success']
     
     fig.add_annotation(
@@ -253,19 +454,22 @@ def criar_grafico_nps(dados):
     return fig
 
 
-def criar_grafico_ticket_medio(dados):
+@instrumentar
+def criar_grafico_ticket_medio(dados, renderizacao='auto'):
     """Cria gráfico de evolução do ticket médio."""
     fig = px.line(
         dados, 
         x='Data', 
         y='Ticket_Medio', 
         title='Evolução do Ticket Médio (R$)',
-        labels={'Ticket_Medio': 'Ticket Médio (R$)', 'Data': 'Período'}
+        labels={'Ticket_Medio': 'Ticket Médio (R$)', 'Data': 'Período'},
+        render_mode='webgl' if usar_webgl(len(dados), renderizacao) else 'svg'
     )
     fig.update_traces(line_color='#2ca02c', line_width=2)
     return fig
 
 
+@instrumentar
 def criar_grafico_sazonalidade(dados_sazon, tipo='faturamento'):
     """Cria gráfico de sazonalidade."""
     if tipo == 'faturamento':
@@ -289,9 +493,11 @@ def criar_grafico_sazonalidade(dados_sazon, tipo='faturamento'):
     return fig
 
 
-def criar_grafico_comparativo_sinistralidade(dados):
+@instrumentar
+def criar_grafico_comparativo_sinistralidade(dados, renderizacao='auto'):
     """Cria gráfico comparativo mensal de sinistralidade."""
     fig = go.Figure()
+    Scatter = classe_scatter(len(dados), renderizacao)
     
     fig.add_trace(go.Bar(
         x=dados['Data'],
@@ -300,7 +506,7 @@ def criar_grafico_comparativo_sinistralidade(dados):
         marker_color='#d62728'
     ))
     
-    fig.add_trace(go.Scatter(
+    fig.add_trace(Scatter(
         x=dados['Data'],
         y=dados['Sinistralidade_Orcada'],
         name='Orçada',
@@ -325,6 +531,7 @@ def criar_grafico_comparativo_sinistralidade(dados):
     return fig
 
 
+@instrumentar
 def criar_matriz_correlacao(dados, variaveis):
     """Cria matriz de correlação."""
     corr_matrix = dados[variaveis].corr()
@@ -339,6 +546,7 @@ def criar_matriz_correlacao(dados, variaveis):
     return fig
 
 
+@instrumentar
 def criar_gauge_sinistralidade(valor):
     """Cria gauge impactante para sinistralidade."""
     
@@ -410,6 +618,7 @@ def criar_gauge_sinistralidade(valor):
     return fig
 
 
+@instrumentar
 def criar_grafico_coeficientes(df_coef):
     """Cria gráfico de barras dos coeficientes do modelo."""
     fig = px.bar(
@@ -425,16 +634,19 @@ def criar_grafico_coeficientes(df_coef):
     return fig
 
 
-def criar_grafico_evolucao_faturamento(dados):
+@instrumentar
+def criar_grafico_evolucao_faturamento(dados, max_pontos=MAX_PONTOS_SERIE, intervalo=None, renderizacao='auto'):
     """Cria gráfico de evolução do faturamento com storytelling visual."""
     fig = go.Figure()
     
-    # Calcular média móvel para tendência
+    # Calcular média móvel para tendência (sobre a série completa, antes da redução)
     dados_plot = dados.copy()
     dados_plot['Media_Movel'] = dados_plot['Faturamento'].rolling(window=6, center=True).mean()
+    dados_plot = reduzir_serie(dados_plot, 'Faturamento', max_pontos, intervalo=intervalo)
+    Scatter = classe_scatter(len(dados_plot), renderizacao)
     
     # Área do faturamento
-    fig.add_trace(go.Scatter(
+    fig.add_trace(Scatter(
         x=dados_plot['Data'],
         y=dados_plot['Faturamento'],
         mode='lines',
@@ -446,7 +658,7 @@ def criar_grafico_evolucao_faturamento(dados):
     ))
     
     # Linha de tendência (média móvel)
-    fig.add_trace(go.Scatter(
+    fig.add_trace(Scatter(
         x=dados_plot['Data'],
         y=dados_plot['Media_Movel'],
         mode='lines',
@@ -477,8 +689,8 @@ def criar_grafico_evolucao_faturamento(dados):
     )
     
     # Destacar último valor
-    ultimo_valor = dados['Faturamento'].iloc[-1]
-    ultima_data = dados['Data'].iloc[-1]
+    ultimo_valor = dados_plot['Faturamento'].iloc[-1]
+    ultima_data = dados_plot['Data'].iloc[-1]
     
     fig.add_annotation(
         x=ultima_data,
@@ -498,32 +710,59 @@ def criar_grafico_evolucao_faturamento(dados):
     return fig
 
 
-def criar_heatmap_correlacao(dados, features):
-    """Cria heatmap de correlação com storytelling visual."""
+def _ordem_agrupamento_correlacao(corr):
+    """Ordena as variáveis por agrupamento hierárquico (distância 1 - |r|)."""
+    from scipy.cluster.hierarchy import linkage, leaves_list
+    from scipy.spatial.distance import squareform
+    
+    distancia = np.nan_to_num(1 - np.abs(corr), nan=1.0)
+    np.fill_diagonal(distancia, 0)
+    ligacoes = linkage(squareform(distancia, checks=False), method='average')
+    return leaves_list(ligacoes)
+
+
+def _texto_correlacoes(corr):
+    """Monta os rótulos das células de forma vetorizada (NaN vira texto vazio)."""
+    abs_corr = np.abs(corr)
+    valores = np.char.mod('%.2f', np.nan_to_num(corr))
+    
+    texto = np.where(
+        abs_corr >= 0.7,
+        np.char.add(np.char.add('<b>', valores), '</b><br>Forte'),
+        np.where(abs_corr >= 0.4, np.char.add(valores, '<br>Moderada'), valores)
+    )
+    return np.where(np.isnan(corr), '', texto).tolist()
+
+
+@instrumentar
+def criar_heatmap_correlacao(dados, features, mostrar_texto='auto', agrupar=False):
+    """
+    Cria heatmap de correlação com storytelling visual.
+    
+    Args:
+        dados (pd.DataFrame): Dados históricos
+        features (list): Variáveis da matriz
+        mostrar_texto (bool | str): Rótulo por célula; 'auto' omite acima de LIMIAR_TEXTO_HEATMAP variáveis
+        agrupar (bool): Reordena as variáveis por agrupamento hierárquico
+    """
     corr_matrix = dados[features].corr()
     
+    if agrupar and len(features) > 2:
+        ordem = _ordem_agrupamento_correlacao(corr_matrix.values)
+        corr_matrix = corr_matrix.iloc[ordem, ordem]
+    
     # Máscar triangular superior para evitar redundância
-    mask = np.triu(np.ones_like(corr_matrix), k=1)
-    corr_masked = corr_matrix.where(~mask.astype(bool))
+    mask = np.triu(np.ones(corr_matrix.shape, dtype=bool), k=1)
+    corr_masked = np.where(mask, np.nan, corr_matrix.values)
+    
+    if mostrar_texto == 'auto':
+        mostrar_texto = len(features) <= LIMIAR_TEXTO_HEATMAP
     
     # Criar texto personalizado com interpretação
-    text_display = []
-    for i in range(len(corr_matrix)):
-        row_text = []
-        for j in range(len(corr_matrix)):
-            val = corr_masked.iloc[i, j]
-            if pd.isna(val):
-                row_text.append('')
-            elif abs(val) >= 0.7:
-                row_text.append(f'<b>{val:.2f}</b><br>Forte')
-            elif abs(val) >= 0.4:
-                row_text.append(f'{val:.2f}<br>Moderada')
-            else:
-                row_text.append(f'{val:.2f}')
-        text_display.append(row_text)
+    text_display = _texto_correlacoes(corr_masked) if mostrar_texto else None
     
     fig = go.Figure(data=go.Heatmap(
-        z=corr_masked.values,
+        z=corr_masked,
         x=[col.replace('_', ' ') for col in corr_matrix.columns],
         y=[col.replace('_', ' ') for col in corr_matrix.columns],
         colorscale=[
@@ -535,7 +774,7 @@ def criar_heatmap_correlacao(dados, features):
         ],
         zmid=0,
         text=text_display,
-        texttemplate='%{text}',
+        texttemplate='%{text}' if mostrar_texto else None,
         textfont={'size': 9},
         colorbar=dict(
             title='Correlação<br>de Pearson',
@@ -561,13 +800,45 @@ def criar_heatmap_correlacao(dados, features):
     return fig
 
 
+def _caixa_distribuicao(dados, coluna, **estilo):
+    """
+    Caixa do boxplot e estatísticas de referência de uma coluna.
+
+    Com um DataFrame, o Plotly calcula a caixa a partir de todos os valores. Com um
+    EsbocoQuantis (a distribuição de um volume que não cabe na memória), a caixa é
+    desenhada com os quartis, bigodes, média e desvio já calculados pelo esboço, sem
+    enviar as observações ao navegador.
+
+    Returns:
+        tuple: (go.Box, dict com media, mediana, q1 e q3)
+    """
+    if isinstance(dados, pd.DataFrame):
+        serie = dados[coluna]
+        caixa = go.Box(y=serie, **estilo)
+        return caixa, {'media': serie.mean(), 'mediana': serie.median(),
+                       'q1': serie.quantile(0.25), 'q3': serie.quantile(0.75)}
+
+    resumo = dados.resumo()
+    media, desvio = dados.media_desvio()
+    caixa = go.Box(
+        x=[estilo['name']], q1=[resumo['q1']], median=[resumo['mediana']], q3=[resumo['q3']],
+        lowerfence=[resumo['cerca_inferior']], upperfence=[resumo['cerca_superior']],
+        mean=[media], sd=[desvio], **estilo
+    )
+    return caixa, {'media': media, 'mediana': resumo['mediana'], 'q1': resumo['q1'], 'q3': resumo['q3']}
+
+
+@instrumentar
 def criar_boxplot_sinistralidade(dados):
-    """Cria boxplot storytelling da distribuição de sinistralidade."""
+    """
+    Cria boxplot storytelling da distribuição de sinistralidade.
+    dados pode ser o histórico ou um EsbocoQuantis de Sinistralidade_Realizada.
+    """
     fig = go.Figure()
     
     # Boxplot principal
-    fig.add_trace(go.Box(
-        y=dados['Sinistralidade_Realizada'],
+    caixa, estatisticas = _caixa_distribuicao(
+        dados, 'Sinistralidade_Realizada',
         name='Sinistralidade',
         marker=dict(
             color=COLORS['danger'],
@@ -580,12 +851,12 @@ def criar_boxplot_sinistralidade(dados):
         hovertemplate='<b>Estatísticas:</b><br>' +
                       'Máximo: %{y:.1f}%<br>' +
                       '<extra></extra>'
-    ))
+    )
+    fig.add_trace(caixa)
     
     # Adicionar zonas de referência
-    media = dados['Sinistralidade_Realizada'].mean()
-    q1 = dados['Sinistralidade_Realizada'].quantile(0.25)
-    q3 = dados['Sinistralidade_Realizada'].quantile(0.75)
+    media = estatisticas['media']
+    q3 = estatisticas['q3']
     
     # Meta
     fig.add_hline(
@@ -632,12 +903,16 @@ def criar_boxplot_sinistralidade(dados):
     return fig
 
 
+@instrumentar
 def criar_boxplot_faturamento(dados):
-    """Cria boxplot storytelling do faturamento."""
+    """
+    Cria boxplot storytelling do faturamento.
+    dados pode ser o histórico ou um EsbocoQuantis de Faturamento.
+    """
     fig = go.Figure()
     
-    fig.add_trace(go.Box(
-        y=dados['Faturamento'],
+    caixa, estatisticas = _caixa_distribuicao(
+        dados, 'Faturamento',
         name='Faturamento',
         marker=dict(
             color=COLORS['primary'],
@@ -647,11 +922,11 @@ def criar_boxplot_faturamento(dados):
         boxmean='sd',
         fillcolor='rgba(31, 119, 180, 0.3)',
         line=dict(color=COLORS['primary'], width=2)
-    ))
+    )
+    fig.add_trace(caixa)
     
-    # Média e mediana
-    media = dados['Faturamento'].mean()
-    mediana = dados['Faturamento'].median()
+    # Média
+    media = estatisticas['media']
     
     fig.add_hline(
         y=media,
@@ -675,19 +950,23 @@ def criar_boxplot_faturamento(dados):
     return fig
 
 
-def criar_grafico_atendimentos(dados):
+@instrumentar
+def criar_grafico_atendimentos(dados, max_pontos=MAX_PONTOS_SERIE, intervalo=None):
     """Cria gráfico storytelling de atendimentos."""
     fig = go.Figure()
     
     # Calcular média
     media = dados['Qtd_Atendimentos'].mean()
     
+    # Barras: redução min-max mantém picos e vales de cada balde
+    dados_plot = reduzir_serie(dados, 'Qtd_Atendimentos', max_pontos, metodo='min_max', intervalo=intervalo)
+    
     # Cores baseadas em acima/abaixo da média
-    cores = [COLORS['success'] if v >= media else COLORS['warning'] for v in dados['Qtd_Atendimentos']]
+    cores = [COLORS['success'] if v >= media else COLORS['warning'] for v in dados_plot['Qtd_Atendimentos']]
     
     fig.add_trace(go.Bar(
-        x=dados['Data'],
-        y=dados['Qtd_Atendimentos'],
+        x=dados_plot['Data'],
+        y=dados_plot['Qtd_Atendimentos'],
         name='Atendimentos',
         marker=dict(
             color=cores,
@@ -696,7 +975,7 @@ def criar_grafico_atendimentos(dados):
         hovertemplate='<b>Atendimentos</b>: %{y:,.0f}<br>' +
                       '<i>%{customdata}</i><extra></extra>',
         customdata=['Acima da média' if v >= media else 'Abaixo da média' 
-                    for v in dados['Qtd_Atendimentos']]
+                    for v in dados_plot['Qtd_Atendimentos']]
     ))
     
     # Linha da média
@@ -724,6 +1003,7 @@ def criar_grafico_atendimentos(dados):
     return fig
 
 
+@instrumentar
 def criar_grafico_comparativo_periodos(dados, metrica, n_meses=6):
     """Cria gráfico comparativo entre períodos recentes e anteriores."""
     total = len(dados)
@@ -791,6 +1071,7 @@ def criar_grafico_comparativo_periodos(dados, metrica, n_meses=6):
     return fig
 
 
+@instrumentar
 def criar_grafico_kpi_cards(dados):
     """Cria visualização de cards KPI com storytelling."""
     ultimo_mes = dados.iloc[-1]
@@ -852,6 +1133,7 @@ def criar_grafico_kpi_cards(dados):
     return fig
 
 
+@instrumentar
 def criar_grafico_importancia_features(modelo, feature_names):
     """Cria gráfico storytelling de importância das features."""
     import pandas as pd
@@ -957,3 +1239,110 @@ def criar_grafico_importancia_features(modelo, feature_names):
     )
     
     return fig
+
+
+@instrumentar
+def criar_grafico_controle(controle, kpi='Sinistralidade_Realizada', renderizacao='auto'):
+    """
+    Carta de controle de um KPI de uma empresa: valores, EWMA com seus limites, média da
+    linha de base e os meses com alarme (Shewhart, EWMA ou CUSUM).
+
+    Args:
+        controle (pd.DataFrame): Resultado de monitorar_frota para uma empresa
+        kpi (str): KPI a desenhar
+        renderizacao (str): 'auto', 'webgl' ou 'svg'
+    """
+    serie = controle.xs(kpi, level='KPI').droplevel('Empresa')
+    datas = serie.index
+    Scatter = classe_scatter(len(serie), renderizacao)
+    fig = go.Figure()
+
+    fig.add_trace(Scatter(
+        x=datas, y=serie['Valor'], mode='lines+markers', name='Valor mensal',
+        line=dict(color=COLORS['secondary'], width=1.5), marker=dict(size=4),
+        hovertemplate='<b>Valor</b>: %{y:.2f}<extra></extra>'
+    ))
+    fig.add_trace(Scatter(
+        x=datas, y=serie['EWMA'], mode='lines', name='EWMA',
+        line=dict(color=COLORS['primary'], width=3),
+        hovertemplate='<b>EWMA</b>: %{y:.2f}<extra></extra>'
+    ))
+    for coluna, nome in (('LSC_EWMA', 'Limite superior'), ('LIC_EWMA', 'Limite inferior')):
+        fig.add_trace(Scatter(
+            x=datas, y=serie[coluna], mode='lines', name=nome, showlegend=coluna == 'LSC_EWMA',
+            legendgroup='limites', line=dict(color=COLORS['danger'], width=1.5, dash='dash'),
+            hovertemplate=f'<b>{nome}</b>: %{{y:.2f}}<extra></extra>'
+        ))
+
+    media_base = serie['Media_Base'].dropna()
+    if len(media_base):
+        fig.add_hline(y=media_base.iloc[0], line_dash='dot', line_color=COLORS['meta'],
+                      annotation_text='Média da linha de base', annotation_position='top left')
+    if serie['Em_Base'].any():
+        fig.add_vrect(x0=datas[serie['Em_Base'].to_numpy()][0], x1=datas[serie['Em_Base'].to_numpy()][-1],
+                      fillcolor=COLORS['secondary'], opacity=0.08, layer='below', line_width=0,
+                      annotation_text='Linha de base', annotation_position='top left')
+
+    alarmes = serie[serie['Alarme']]
+    if len(alarmes):
+        tipos = alarmes[['Alarme_Shewhart', 'Alarme_EWMA', 'Alarme_CUSUM']].to_numpy()
+        rotulos = [', '.join(nome for nome, ativo in zip(('Shewhart', 'EWMA', 'CUSUM'), linha) if ativo)
+                   for linha in tipos]
+        fig.add_trace(Scatter(
+            x=alarmes.index, y=alarmes['Valor'], mode='markers', name='Alarme',
+            marker=dict(symbol='x', size=11, color=COLORS['danger']), customdata=rotulos,
+            hovertemplate='<b>Alarme</b>: %{customdata}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title=f'Carta de Controle - {kpi.replace("_", " ")}',
+        xaxis_title='Período',
+        yaxis_title=kpi.replace('_', ' '),
+        hovermode='x unified',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        height=420
+    )
+    return aplicar_estilo_padrao(fig)
+
+
+@instrumentar
+def criar_grafico_pontos_ruptura(analise, coluna):
+    """
+    Mapa do teste de Welch em todas as divisões e janelas (saída de analise_pontos_ruptura):
+    cor = estatística t (média depois - antes), com o ponto de ruptura destacado.
+    """
+    t_janelas, p_janelas = analise['t_janelas'], analise['p_janelas']
+    limite = np.nanmax(np.abs(t_janelas.to_numpy()), initial=1.0)
+
+    fig = go.Figure(go.Heatmap(
+        z=t_janelas.to_numpy(),
+        x=t_janelas.columns,
+        y=t_janelas.index,
+        customdata=p_janelas.to_numpy(),
+        colorscale='RdBu_r',
+        zmin=-limite,
+        zmax=limite,
+        colorbar=dict(title='t'),
+        hovertemplate='<b>Divisão</b>: %{x}<br><b>Janela</b>: %{y} meses<br>'
+                      't = %{z:.2f} | p = %{customdata:.4f}<extra></extra>'
+    ))
+
+    cor = COLORS['danger'] if analise['significante'] else COLORS['secondary']
+    fig.add_vline(x=analise['data_ruptura'], line_dash='dash', line_color=cor, line_width=2)
+    fig.add_annotation(
+        x=analise['data_ruptura'], y=1.02, yref='paper', showarrow=False,
+        text=f"Ruptura: {analise['variacao_percentual']:+.1f}% (p ajustado = {analise['p_value_ajustado']:.3g})",
+        bgcolor='rgba(255,255,255,0.9)', bordercolor=cor, borderwidth=2, font=dict(color=cor)
+    )
+
+    fig.update_layout(
+        title={
+            'text': f'🔎 Onde a Média Mudou: {coluna.replace("_", " ")}',
+            'x': 0.5,
+            'xanchor': 'center'
+        },
+        xaxis_title='Primeiro mês do período posterior',
+        yaxis_title='Janela (meses de cada lado)',
+        height=420
+    )
+    return aplicar_estilo_padrao(fig)
@@ -0,0 +1,10 @@
+"""
+Configuração comum dos testes: src e a raiz do projeto no caminho de importação,
+como fazem os scripts da raiz.
+"""
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / 'src'))
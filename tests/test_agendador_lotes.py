@@ -0,0 +1,55 @@
+"""Agendador de micro-lotes: uma requisição inválida não derruba as demais do lote."""
+import asyncio
+
+import pytest
+
+from batch_scheduler import AgendadorLotes
+from data_generator import gerar_dados_assistencia
+from model import treinar_modelo, compilar_modelo, preparar_entrada_compilada, prever_preparados, prever_compilado
+from config import NUM_MESES_HISTORICO, FEATURES_MODELO
+
+
+def _rodar(agendador, itens):
+    async def _submeter_todos():
+        agendador.iniciar()
+        try:
+            return await asyncio.gather(*(agendador.submeter(item) for item in itens), return_exceptions=True)
+        finally:
+            await agendador.parar()
+    return asyncio.run(_submeter_todos())
+
+
+def test_item_que_falha_no_lote_isolado():
+    """Se a função do lote falha, cada item é repontuado e só o problemático recebe a exceção."""
+    def dobrar(lote):
+        return [2 / item for item in lote]
+
+    resultados = _rodar(AgendadorLotes(dobrar, janela_ms=50, tamanho_maximo_lote=8), [1, 2, 0, 4])
+
+    assert resultados[0] == 2 and resultados[1] == 1 and resultados[3] == 0.5
+    assert isinstance(resultados[2], ZeroDivisionError)
+
+
+def test_cenarios_invalidos_rejeitados_antes_do_lote():
+    historico = gerar_dados_assistencia(NUM_MESES_HISTORICO)
+    modelo, features, *_ = treinar_modelo(historico)
+    modelo_compilado = compilar_modelo(modelo, features)
+    ultimo = historico.iloc[-1]
+    cenario = {f: float(ultimo[f]) for f in FEATURES_MODELO if f != 'Faturamento_Mes_Ant'}
+    cenario['Faturamento_Mes_Ant'] = float(ultimo['Faturamento'])
+    lotes = []
+
+    def pontuar(lote):
+        lotes.append(len(lote))
+        return prever_preparados(modelo_compilado, lote)
+
+    agendador = AgendadorLotes(pontuar, janela_ms=50, tamanho_maximo_lote=8,
+                               preparar=lambda inputs: preparar_entrada_compilada(modelo_compilado, inputs))
+    itens = [cenario, {**cenario, 'mes_prev': 13}, {**cenario, 'NPS': 'alto'}, [1, 2], {**cenario, 'mes_prev': 6}]
+    resultados = _rodar(agendador, itens)
+
+    assert resultados[0] == pytest.approx(prever_compilado(modelo_compilado, cenario))
+    assert resultados[4] == pytest.approx(prever_compilado(modelo_compilado, itens[4]))
+    assert isinstance(resultados[1], ValueError) and isinstance(resultados[2], ValueError)
+    assert isinstance(resultados[3], TypeError)
+    assert lotes == [2]
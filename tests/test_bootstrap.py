@@ -0,0 +1,46 @@
+"""Bootstrap vetorizado: reamostras em lote iguais ao laço por reamostra."""
+import numpy as np
+
+from data_generator import gerar_dados_assistencia, gerar_dados_frota
+from model import treinar_modelo, ModeloInterceptoMensal
+from bootstrap import bootstrap_kpis, bootstrap_coeficientes, bootstrap_frota, indices_reamostragem
+from config import NUM_MESES_HISTORICO, KPIS_BOOTSTRAP
+
+NUM_REAMOSTRAS = 200
+
+
+def test_coeficientes_iguais_reajuste_por_reamostra(tolerancia=1e-8):
+    """Coeficientes reajustados com ModeloInterceptoMensal sobre ajustado + resíduos reamostrados."""
+    modelo, features, _, X_train, _, y_train, _ = treinar_modelo(gerar_dados_assistencia(NUM_MESES_HISTORICO),
+                                                                 penalidade='ols')
+    X = X_train[features].to_numpy()
+    y = y_train.to_numpy()
+    mes = X_train['Mes'].to_numpy()
+    ajustado = modelo.predict(X, mes)
+    graus_liberdade = len(np.unique(mes)) + len(features)
+    residuos = (y - ajustado) * np.sqrt(len(y) / (len(y) - graus_liberdade))
+
+    coefs = bootstrap_coeficientes(X, y, mes, NUM_REAMOSTRAS, tamanho_bloco=3, semente=7)
+    for linha, indices in enumerate(indices_reamostragem(len(y), NUM_REAMOSTRAS, 3, semente=7)):
+        esperado = ModeloInterceptoMensal().fit(X, ajustado + residuos[indices], mes).coef_
+        assert np.max(np.abs(coefs[linha] - esperado) / np.maximum(np.abs(esperado), 1e-12)) <= tolerancia
+
+
+def test_kpis_iguais_reamostras_explicitas(tolerancia=1e-8):
+    """Intervalos de média e mediana dos KPIs com os mesmos índices de reamostragem."""
+    dados = gerar_dados_assistencia(NUM_MESES_HISTORICO)
+    valores = dados[KPIS_BOOTSTRAP].to_numpy()
+    tabela = bootstrap_kpis(dados[KPIS_BOOTSTRAP], num_reamostras=NUM_REAMOSTRAS, tamanho_bloco=4, semente=3)
+    amostras = valores[indices_reamostragem(len(valores), NUM_REAMOSTRAS, 4, semente=3)]
+    for estatistica, distribuicao in (('media', amostras.mean(axis=1)), ('q50', np.median(amostras, axis=1))):
+        esperado = np.quantile(distribuicao, [0.025, 0.975], axis=0)
+        obtido = tabela.xs(estatistica, level='Estatistica').loc[KPIS_BOOTSTRAP, ['Inferior', 'Superior']].to_numpy().T
+        assert np.max(np.abs(obtido - esperado) / np.abs(esperado)) <= tolerancia
+
+
+def test_frota_independe_do_numero_de_processos():
+    frota = gerar_dados_frota(NUM_MESES_HISTORICO, 4)
+    sequencial = bootstrap_frota(frota, num_reamostras=NUM_REAMOSTRAS, processos=1)
+    paralelo = bootstrap_frota(frota, num_reamostras=NUM_REAMOSTRAS, processos=2)
+    for chave in sequencial:
+        assert sequencial[chave].equals(paralelo[chave]), chave
@@ -0,0 +1,97 @@
+"""Cartas de controle: atualização vetorizada igual às fórmulas de livro, estado persistente."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generator import gerar_dados_frota
+from control_charts import MonitorControle, monitorar_frota
+from config import NUM_MESES_HISTORICO
+
+
+def _cartas_referencia(valores, monitor):
+    """Cartas de uma série, observação a observação, pelas fórmulas de livro (NaN = sem observação)."""
+    m, lam = monitor.meses_base, monitor.lambda_ewma
+    observados = valores[~np.isnan(valores)]
+    base = observados[:m]
+    media = base.mean()
+    desvio = np.abs(np.diff(base)).mean() / 1.128
+    ewma, cusum_pos, cusum_neg, linhas = media, 0.0, 0.0, []
+    for t, x in enumerate(observados[m:], start=1):
+        z = (x - media) / desvio
+        ewma = lam * x + (1 - lam) * ewma
+        largura = monitor.largura_ewma * desvio * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * t)))
+        cusum_pos = max(0.0, cusum_pos + z - monitor.folga_cusum)
+        cusum_neg = max(0.0, cusum_neg - z - monitor.folga_cusum)
+        alarme_cusum = max(cusum_pos, cusum_neg) > monitor.limite_cusum
+        linhas.append([z, ewma, media - largura, media + largura, cusum_pos, cusum_neg,
+                       abs(z) > monitor.limite_shewhart, abs(ewma - media) > largura, alarme_cusum])
+        if alarme_cusum:
+            cusum_pos = cusum_neg = 0.0
+    return np.array(linhas, dtype=float)
+
+
+@pytest.fixture(scope='module')
+def frota():
+    """Empresas que entram em meses diferentes e meses sem NPS."""
+    frota = gerar_dados_frota(NUM_MESES_HISTORICO, 8)
+    posicao = frota.groupby('Empresa').cumcount().to_numpy()
+    atrasadas = frota['Empresa'].isin(frota['Empresa'].unique()[::3]).to_numpy()
+    frota = frota[~(atrasadas & (posicao < 10))].reset_index(drop=True)
+    frota.loc[frota.index[::17], 'NPS'] = np.nan
+    return frota
+
+
+# O faturamento cresce e dispara alarmes, o que exercita o reinício do CUSUM
+KPIS = ['Sinistralidade_Realizada', 'NPS', 'Faturamento']
+
+
+def test_cartas_iguais_formulas_de_livro(frota, tolerancia=1e-10):
+    resultado, monitor = monitorar_frota(frota, KPIS)
+    colunas = ['Z', 'EWMA', 'LIC_EWMA', 'LSC_EWMA', 'CUSUM_Pos', 'CUSUM_Neg',
+               'Alarme_Shewhart', 'Alarme_EWMA', 'Alarme_CUSUM']
+    for (empresa, kpi), serie in resultado.groupby(level=['Empresa', 'KPI']):
+        obtido = serie.loc[~serie['Em_Base'] & serie['Valor'].notna(), colunas].to_numpy(dtype=float)
+        esperado = _cartas_referencia(serie['Valor'].to_numpy(), monitor)
+        assert obtido.shape == esperado.shape, f'{empresa}/{kpi}'
+        assert np.max(np.abs(obtido - esperado) / np.maximum(np.abs(esperado), 1.0), initial=0.0) <= tolerancia
+
+
+def test_gravar_e_recarregar_no_meio_do_historico(frota, tmp_path):
+    resultado, monitor = monitorar_frota(frota, KPIS)
+    datas = np.sort(frota['Data'].unique())
+    metade = frota['Data'] < datas[len(datas) // 2]
+    _, parcial = monitorar_frota(frota[metade], monitor.kpis)
+    parcial.salvar(tmp_path / 'estado.npz')
+    retomado, _ = monitorar_frota(frota[~metade], monitor=MonitorControle.carregar(tmp_path / 'estado.npz'))
+
+    assert retomado.equals(resultado.loc[retomado.index])
+
+
+def test_repetir_fechamento_nao_altera_estado(tmp_path):
+    """Rodar o mesmo fechamento duas vezes (monitorar_kpis.py) deixa o estado gravado igual."""
+    from monitorar_kpis import main
+
+    caminho = tmp_path / 'estado.npz'
+    main([str(caminho), '--empresas', '5'])
+    with np.load(caminho) as arquivo:
+        primeiro = {campo: arquivo[campo] for campo in arquivo.files}
+    main([str(caminho), '--empresas', '5'])
+    with np.load(caminho) as arquivo:
+        segundo = {campo: arquivo[campo] for campo in arquivo.files}
+
+    assert primeiro['contagem'].max() == NUM_MESES_HISTORICO
+    assert primeiro.keys() == segundo.keys()
+    for campo in primeiro:
+        np.testing.assert_array_equal(segundo[campo], primeiro[campo], err_msg=campo)
+
+
+def test_mes_ja_incorporado(frota):
+    """monitorar_frota ignora meses já vistos de cada empresa; atualizar os rejeita."""
+    _, monitor = monitorar_frota(frota, KPIS)
+    datas = np.sort(frota['Data'].unique())
+    novo_mes = frota[frota['Data'] == datas[-1]].assign(Data=datas[-1] + np.timedelta64(31, 'D'))
+    resultado, _ = monitorar_frota(pd.concat([frota[frota['Data'] == datas[-1]], novo_mes]), monitor=monitor)
+
+    assert resultado.index.get_level_values('Data').unique().tolist() == [pd.Timestamp(novo_mes['Data'].iloc[0])]
+    with pytest.raises(ValueError, match='já foi incorporado'):
+        monitor.atualizar(novo_mes['Empresa'], novo_mes, novo_mes['Data'].iloc[0])
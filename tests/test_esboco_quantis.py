@@ -0,0 +1,63 @@
+"""Esboço de quantis: exato sem compactar, erro de posto garantido em blocos e mesclas."""
+import numpy as np
+import pytest
+
+import statistical_analysis as sa
+from data_generator import gerar_dados_assistencia
+from quantile_sketch import EsbocoQuantis, esboco_em_blocos, mesclar_esbocos
+from config import NUM_MESES_HISTORICO
+
+PROBABILIDADES = np.linspace(0, 1, 101)
+INTERIOR = PROBABILIDADES[1:-1]
+
+
+def test_exato_sem_compactar():
+    """Igual a np.percentile e a analise_distribuicao do array enquanto não compacta."""
+    dados = gerar_dados_assistencia(NUM_MESES_HISTORICO)['Sinistralidade_Realizada'].to_numpy()
+    esboco = EsbocoQuantis().adicionar(dados)
+    assert esboco.exato
+    np.testing.assert_allclose(esboco.quantis(PROBABILIDADES), np.percentile(dados, PROBABILIDADES * 100))
+    referencia, obtido = sa.analise_distribuicao(dados), sa.analise_distribuicao(esboco)
+    for chave in referencia:
+        assert obtido[chave] == pytest.approx(referencia[chave]), chave
+
+
+@pytest.fixture(scope='module')
+def valores():
+    return np.random.default_rng(3).lognormal(0, 1, 1_000_000)
+
+
+@pytest.fixture(scope='module')
+def esbocos(valores, num_blocos=20):
+    blocos = np.array_split(valores, num_blocos)
+    parciais = [EsbocoQuantis(semente=i).adicionar(bloco) for i, bloco in enumerate(blocos)]
+    return {
+        'inteiro': EsbocoQuantis(semente=0).adicionar(valores),
+        'blocos': esboco_em_blocos(blocos, semente=0),
+        'mescla': mesclar_esbocos(parciais, semente=0),
+        'mescla_invertida': mesclar_esbocos(parciais[::-1], semente=1),
+        'mescla_arvore': mesclar_esbocos([mesclar_esbocos(parciais[i::2], semente=i) for i in (0, 1)], semente=2),
+    }
+
+
+@pytest.mark.parametrize('nome', ['inteiro', 'blocos', 'mescla', 'mescla_invertida', 'mescla_arvore'])
+def test_erro_de_posto_dentro_do_garantido(valores, esbocos, nome):
+    esboco = esbocos[nome]
+    ordenados = np.sort(valores)
+    postos = np.searchsorted(ordenados, esboco.quantis(INTERIOR), side='right') / len(valores)
+    pontos = np.quantile(valores, INTERIOR)
+    cdf_real = np.searchsorted(ordenados, pontos, side='right') / len(valores)
+
+    assert np.max(np.abs(postos - INTERIOR)) <= esboco.erro_rank()
+    assert np.max(np.abs(esboco.cdf(pontos) - cdf_real)) <= esboco.erro_rank()
+    assert esboco.n == len(valores)
+    assert esboco.minimo == valores.min() and esboco.maximo == valores.max()
+    assert esboco.num_itens <= 3 * esboco.k
+
+
+def test_salvar_e_carregar(esbocos, tmp_path):
+    original = esbocos['mescla']
+    original.salvar(tmp_path / 'esboco.npz')
+    carregado = EsbocoQuantis.carregar(tmp_path / 'esboco.npz')
+    np.testing.assert_array_equal(carregado.quantis(INTERIOR), original.quantis(INTERIOR))
+    assert carregado.erro_rank() == original.erro_rank()
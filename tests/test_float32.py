@@ -0,0 +1,28 @@
+"""Política de precisão: previsões em float32 dentro da tolerância das de float64."""
+import numpy as np
+import pytest
+
+from data_generator import gerar_dados_assistencia
+from model import treinar_modelo, preparar_features, compilar_modelo, fazer_previsao_lote
+from config import TOLERANCIA_RELATIVA_FLOAT32
+
+
+@pytest.mark.parametrize('meses', [48, 1000])
+def test_previsoes_float32(meses, tolerancia=TOLERANCIA_RELATIVA_FLOAT32):
+    """
+    Tanto pontuando com o modelo de float64 compilado em float32 quanto no fluxo todo em
+    float32 (dados gerados, treino e pontuação).
+    """
+    historico = gerar_dados_assistencia(meses, dtype='float64')
+    modelo, features, *_ = treinar_modelo(historico, dtype='float64')
+    cenarios, _ = preparar_features(historico)
+    cenarios = cenarios.rename(columns={'Mes': 'mes_prev'})
+    referencia = fazer_previsao_lote(compilar_modelo(modelo, features, dtype='float64'), features, cenarios)
+
+    pontuacao = fazer_previsao_lote(compilar_modelo(modelo, features, dtype='float32'), features, cenarios)
+    modelo_32, _, *_ = treinar_modelo(gerar_dados_assistencia(meses, dtype='float32'), dtype='float32')
+    fluxo = fazer_previsao_lote(compilar_modelo(modelo_32, features, dtype='float32'), features, cenarios)
+
+    for previsao in (pontuacao, fluxo):
+        assert previsao.dtype == np.float32
+        assert np.max(np.abs(previsao.astype(np.float64) - referencia) / referencia) <= tolerancia
@@ -0,0 +1,23 @@
+"""
+Orçamento de importação a frio (ORCAMENTOS_IMPORTACAO em benchmark.py): cada alvo é
+importado em um interpretador novo, deve caber no limite e não pode carregar os pacotes
+proibidos (plotly, scipy, sklearn e streamlit são importados sob demanda).
+
+Em máquinas mais lentas, ORCAMENTO_IMPORTACAO_FATOR multiplica os limites.
+"""
+import os
+
+import pytest
+
+from benchmark import ORCAMENTOS_IMPORTACAO, medir_importacao
+
+FATOR = float(os.environ.get('ORCAMENTO_IMPORTACAO_FATOR', '1.0'))
+
+
+@pytest.mark.parametrize('alvo', list(ORCAMENTOS_IMPORTACAO))
+def test_orcamento_importacao(alvo):
+    modulos, limite_ms, proibidos = ORCAMENTOS_IMPORTACAO[alvo]
+    medida = medir_importacao(modulos, proibidos)
+
+    assert not medida['proibidos_carregados'], f"{alvo} carregou {', '.join(medida['proibidos_carregados'])}"
+    assert medida['ms'] <= limite_ms * FATOR, f"{alvo}: {medida['ms']:.0f} ms (limite {limite_ms * FATOR:.0f} ms)"
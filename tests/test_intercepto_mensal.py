@@ -0,0 +1,57 @@
+"""ModeloInterceptoMensal: intercepto por mês equivalente às dummies de mês."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generator import gerar_dados_assistencia
+from model import (
+    preparar_features, treinar_modelo, compilar_modelo, prever_compilado, prever_compilado_lote,
+    fazer_previsao_lote, ModeloInterceptoMensal
+)
+from config import NUM_MESES_HISTORICO, FEATURES_MODELO
+
+
+@pytest.mark.parametrize('meses', [48, 1000])
+def test_intercepto_mensal_igual_dummies(meses, tolerancia=1e-9):
+    """Deve prever o mesmo que a regressão com 11 dummies de mês (drop_first) por mínimos quadrados."""
+    df, features = preparar_features(gerar_dados_assistencia(meses))
+    y = df['Faturamento'].to_numpy(dtype=np.float64)
+    dummies = pd.get_dummies(df['Mes'], prefix='Mes', drop_first=True).to_numpy(dtype=np.float64)
+    X = df[features].to_numpy(dtype=np.float64)
+    desenho = np.column_stack([X, dummies, np.ones(len(df))])
+    referencia = desenho @ np.linalg.lstsq(desenho, y, rcond=None)[0]
+
+    modelo = ModeloInterceptoMensal().fit(X, y, df['Mes'])
+    desvio = np.max(np.abs(modelo.predict(X, df['Mes']) - referencia) / np.abs(referencia))
+
+    assert desvio <= tolerancia
+
+
+@pytest.fixture(scope='module')
+def compilado():
+    historico = gerar_dados_assistencia(NUM_MESES_HISTORICO)
+    modelo, features, *_ = treinar_modelo(historico)
+    ultimo = historico.iloc[-1]
+    cenario = {f: float(ultimo[f]) for f in FEATURES_MODELO if f != 'Faturamento_Mes_Ant'}
+    cenario['Faturamento_Mes_Ant'] = float(ultimo['Faturamento'])
+    return compilar_modelo(modelo, features), cenario
+
+
+@pytest.mark.parametrize('mes', [0, 13, -1, 2.7, 'abc', None])
+def test_mes_fora_do_intervalo_rejeitado(compilado, mes):
+    """Mês fora de 1 a 12 ou não inteiro é ValueError, não IndexError nem o intercepto de outro mês."""
+    modelo_compilado, cenario = compilado
+    invalido = {**cenario, 'mes_prev': mes}
+    with pytest.raises(ValueError, match='mes_prev'):
+        prever_compilado(modelo_compilado, invalido)
+    with pytest.raises(ValueError, match='mes_prev'):
+        prever_compilado_lote(modelo_compilado, [{**cenario, 'mes_prev': 12}, invalido])
+    with pytest.raises(ValueError, match='mes_prev'):
+        fazer_previsao_lote(modelo_compilado, None, pd.DataFrame([invalido]))
+
+
+def test_meses_validos_aceitos(compilado):
+    modelo_compilado, cenario = compilado
+    cenarios = [{**cenario, 'mes_prev': mes} for mes in range(1, 13)]
+    esperado = [prever_compilado(modelo_compilado, c) for c in cenarios]
+    np.testing.assert_allclose(prever_compilado_lote(modelo_compilado, cenarios), esperado)
@@ -0,0 +1,38 @@
+"""avaliar_ajuste: PRESS e erro leave-one-out pela alavancagem, sem reajustar."""
+import warnings
+
+import numpy as np
+import pytest
+
+from data_generator import gerar_dados_assistencia
+from model import treinar_modelo, avaliar_ajuste, ModeloInterceptoMensal
+
+
+@pytest.mark.parametrize('meses', [48, 120])
+def test_loo_analitico_igual_reajuste(meses, tolerancia=1e-8):
+    """PRESS e MAE leave-one-out devem coincidir com reajustar o modelo sem cada linha do treino."""
+    modelo, features, _, X_train, _, y_train, _ = treinar_modelo(gerar_dados_assistencia(meses), penalidade='ols')
+    analitico = avaliar_ajuste(modelo, X_train[features], y_train, X_train['Mes'])
+
+    X = X_train[features].to_numpy()
+    y = y_train.to_numpy()
+    mes = X_train['Mes'].to_numpy()
+    contagem = np.bincount(mes, minlength=13)
+    residuos = []
+    for i in np.flatnonzero(contagem[mes] > 1):  # linhas sozinhas no mês não têm leave-one-out
+        fora = np.arange(len(y)) != i
+        reajuste = ModeloInterceptoMensal().fit(X[fora], y[fora], mes[fora])
+        residuos.append(y[i] - reajuste.predict(X[i:i + 1], mes[i:i + 1])[0])
+    residuos = np.asarray(residuos)
+
+    assert analitico['press'] == pytest.approx(np.sum(residuos ** 2), rel=tolerancia)
+    assert analitico['mae_loo'] == pytest.approx(np.mean(np.abs(residuos)), rel=tolerancia)
+
+
+def test_historico_curto_sem_loo():
+    """Com poucos meses nenhuma linha tem leave-one-out: métricas LOO em NaN, sem avisos do numpy."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        metricas = treinar_modelo(gerar_dados_assistencia(14))[2]
+    assert metricas['press'] == 0
+    assert np.isnan(metricas['rmse_loo']) and np.isnan(metricas['mae_loo']) and np.isnan(metricas['r2_loo'])
@@ -0,0 +1,61 @@
+"""Modelo hierárquico: eliminação em blocos igual à solução densa do modelo misto."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generator import gerar_dados_frota
+from model import preparar_features, fazer_previsao
+from hierarchical import treinar_modelo_hierarquico
+from config import NUM_MESES_HISTORICO
+
+
+@pytest.fixture(scope='module')
+def ajuste():
+    """Frota com históricos de tamanhos diferentes (metade das empresas só com 10 meses)."""
+    frota = gerar_dados_frota(NUM_MESES_HISTORICO, 6)
+    posicao = frota.groupby('Empresa').cumcount()
+    pequenas = frota['Empresa'].isin(frota['Empresa'].unique()[::2])
+    frota = frota[~(pequenas & (posicao < NUM_MESES_HISTORICO - 10))].reset_index(drop=True)
+    modelo, features, _ = treinar_modelo_hierarquico(frota)
+
+    df_modelo, _ = preparar_features(frota)
+    por_empresa = df_modelo.groupby('Empresa', sort=False)
+    tamanho = por_empresa['Empresa'].transform('size').to_numpy()
+    treino = df_modelo[por_empresa.cumcount().to_numpy() < tamanho - np.ceil(0.2 * tamanho)]
+    return modelo, features, treino
+
+
+def test_blocos_igual_sistema_denso(ajuste, tolerancia=1e-8):
+    """As equações do modelo misto resolvidas densas, com as variâncias estimadas, dão as mesmas previsões."""
+    modelo, features, treino = ajuste
+    # Sistema denso: interceptos por mês, features e, por empresa, 1 e as inclinações centradas
+    X = treino[features].to_numpy()
+    meses = np.unique(treino['Mes'])
+    inclinacoes = X[:, [features.index(nome) for nome in modelo.inclinacoes_]]
+    aleatorios = np.hstack([np.ones((len(X), 1)), inclinacoes - inclinacoes.mean(axis=0)])
+    codigos = modelo.empresas_.get_indexer(treino['Empresa'])
+    q = aleatorios.shape[1]
+    por_bloco = np.zeros((len(X), len(modelo.empresas_) * q))
+    por_bloco[np.arange(len(X))[:, None], codigos[:, None] * q + np.arange(q)] = aleatorios
+    W = np.hstack([(treino['Mes'].to_numpy()[:, None] == meses).astype(float), X, por_bloco])
+    variancias = np.array([modelo.variancias_[nome] for nome in ['Intercepto'] + modelo.inclinacoes_])
+    penalidade = np.concatenate([np.zeros(len(meses) + X.shape[1]),
+                                 np.tile(modelo.variancias_['residual'] / variancias, len(modelo.empresas_))])
+    y = treino['Faturamento'].to_numpy()
+    theta = np.linalg.solve(W.T @ W + np.diag(penalidade), W.T @ y)
+
+    assert np.max(np.abs(W @ theta - modelo.predict(treino)) / np.abs(y)) <= tolerancia
+
+
+def test_modelo_empresa_igual_previsao_hierarquica(ajuste, tolerancia=1e-8):
+    """O modelo de cada empresa deve prever por fazer_previsao o mesmo que o modelo hierárquico."""
+    modelo, features, treino = ajuste
+    empresa = modelo.empresas_[0]
+    ultimo = treino[treino['Empresa'] == empresa].iloc[-1]
+    inputs = {nome: float(ultimo[nome]) for nome in features if nome not in ('Volume_x_Ticket', 'Tendencia')}
+    inputs['mes_prev'] = int(ultimo['Mes'])
+    linha = pd.DataFrame([{**inputs, 'Volume_x_Ticket': inputs['Qtd_Atendimentos'] * inputs['Ticket_Medio'],
+                           'Tendencia': 24, 'Mes': inputs['mes_prev'], 'Empresa': empresa}])
+    esperado = modelo.predict(linha)[0]
+
+    assert fazer_previsao(modelo.modelo_empresa(empresa), features, inputs) == pytest.approx(esperado, rel=tolerancia)
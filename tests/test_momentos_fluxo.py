@@ -0,0 +1,103 @@
+"""Momentos em fluxo: iguais a numpy/scipy em blocos, em processos e por Welford."""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import statistical_analysis as sa
+from data_generator import gerar_dados_assistencia
+from quantile_sketch import EsbocoQuantis
+from streaming_moments import MomentosFluxo, momentos_em_blocos
+from config import NUM_MESES_HISTORICO
+
+TOLERANCIA = 1e-9
+NUM_BLOCOS = 13
+
+
+def _momentos_bloco(bloco):
+    """Momentos de um bloco, calculados em um processo de trabalho."""
+    return MomentosFluxo(bloco.shape[1:]).adicionar(bloco)
+
+
+def _referencia(x):
+    from scipy import stats
+
+    colunas = [c[~np.isnan(c)] for c in np.atleast_2d(x.T)]
+    return np.array([[len(c), c.mean(), c.var(ddof=1), stats.skew(c), stats.kurtosis(c), c.min(), c.max()]
+                     for c in colunas])
+
+
+def _obtido(m):
+    return np.column_stack([m.n, m.media, m.variancia(1), m.assimetria(), m.curtose(), m.minimo, m.maximo])
+
+
+def _desvio_relativo(obtido, esperado):
+    return np.max(np.abs(np.subtract(obtido, esperado)) / np.maximum(np.abs(esperado), 1.0))
+
+
+@pytest.fixture(scope='module')
+def valores():
+    rng = np.random.default_rng(11)
+    valores = rng.lognormal(3, 0.5, (200_000, 3))
+    valores[rng.random(valores.shape) < 0.01] = np.nan
+    return valores
+
+
+@pytest.fixture(scope='module')
+def paralelo(valores):
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parciais = list(pool.map(_momentos_bloco, np.array_split(valores, NUM_BLOCOS)))
+    momentos = MomentosFluxo(3)
+    for parcial in parciais:
+        momentos.mesclar(parcial)
+    return momentos
+
+
+def test_inteiro_blocos_e_paralelo(valores, paralelo):
+    esperado = _referencia(valores)
+    assert _desvio_relativo(_obtido(MomentosFluxo(3).adicionar(valores)), esperado) <= TOLERANCIA
+    assert _desvio_relativo(_obtido(momentos_em_blocos(np.array_split(valores, NUM_BLOCOS))), esperado) <= TOLERANCIA
+    assert _desvio_relativo(_obtido(paralelo), esperado) <= TOLERANCIA
+
+
+def test_welford(valores):
+    welford = MomentosFluxo(3)
+    for linha in valores[:2_000]:
+        welford.atualizar(linha)
+    assert _desvio_relativo(_obtido(welford), _referencia(valores[:2_000])) <= TOLERANCIA
+
+
+def test_reduzir_em_arvore(valores):
+    reduzido = MomentosFluxo(3).adicionar(valores).reduzir()
+    assert _desvio_relativo(_obtido(reduzido), _referencia(valores.reshape(-1, 1))) <= TOLERANCIA
+
+
+def test_salvar_e_carregar(valores, paralelo, tmp_path):
+    paralelo.salvar(tmp_path / 'momentos.npz')
+    carregado = MomentosFluxo.carregar(tmp_path / 'momentos.npz')
+    assert _desvio_relativo(_obtido(carregado), _referencia(valores)) <= TOLERANCIA
+
+
+def test_media_grande_sem_perda_de_precisao():
+    """Com média 1e9 e variância 1, somas de potências perderiam todos os dígitos."""
+    deslocados = 1e9 + np.random.default_rng(11).normal(0, 1, 1_000_000)
+    variancia = momentos_em_blocos(np.array_split(deslocados, NUM_BLOCOS)).variancia(1)
+    assert variancia == pytest.approx(deslocados.var(ddof=1), rel=1e-6)
+
+
+def test_analises_com_acumuladores():
+    """Intervalo de confiança e capacidade do processo iguais aos do array."""
+    dados = gerar_dados_assistencia(NUM_MESES_HISTORICO)['Sinistralidade_Realizada'].to_numpy()
+    momentos = MomentosFluxo().adicionar(dados)
+    esboco = EsbocoQuantis().adicionar(dados)
+    intervalo = sa.calcular_intervalo_confianca(dados)
+    capacidade = sa.calcular_capacidade_processo(dados, 40, 60)
+    capacidade_esboco = sa.calcular_capacidade_processo(esboco, 40, 60)
+    capacidade_momentos = sa.calcular_capacidade_processo(momentos, 40, 60)
+
+    assert sa.calcular_intervalo_confianca(momentos) == pytest.approx(intervalo, rel=TOLERANCIA)
+    assert sa.calcular_intervalo_confianca(esboco) == pytest.approx(intervalo, rel=TOLERANCIA)
+    for chave in ('cp', 'cpk', 'dentro_limites'):
+        assert capacidade_esboco[chave] == pytest.approx(capacidade[chave], rel=TOLERANCIA), chave
+    for chave in ('cp', 'cpk'):
+        assert capacidade_momentos[chave] == pytest.approx(capacidade[chave], rel=TOLERANCIA), chave
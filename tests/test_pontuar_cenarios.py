@@ -0,0 +1,40 @@
+"""Pontuação em lote: Parquet com pyarrow e mensagem clara sem ele."""
+import sys
+
+import pandas as pd
+import pytest
+
+import pontuar_cenarios as pc
+
+
+@pytest.fixture
+def sem_pyarrow(monkeypatch):
+    """Simula um ambiente sem pyarrow (None em sys.modules faz o import falhar)."""
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    monkeypatch.setitem(sys.modules, 'pyarrow.parquet', None)
+
+
+def test_parquet_ida_e_volta(tmp_path):
+    pytest.importorskip('pyarrow')
+    blocos = [pd.DataFrame({'a': range(i, i + 3), 'b': [0.5] * 3}) for i in (0, 3)]
+    escritor = pc._EscritorSaida(tmp_path / 'saida.parquet')
+    for bloco in blocos:
+        escritor.gravar(bloco)
+    escritor.fechar()
+
+    lido = pd.concat(pc.ler_blocos(tmp_path / 'saida.parquet', 4), ignore_index=True)
+    pd.testing.assert_frame_equal(lido, pd.concat(blocos, ignore_index=True))
+
+
+def test_parquet_sem_pyarrow_pede_instalacao(tmp_path, sem_pyarrow):
+    with pytest.raises(ImportError, match='pip install pyarrow'):
+        next(pc.ler_blocos(tmp_path / 'cenarios.parquet', 10))
+    with pytest.raises(ImportError, match='pip install pyarrow'):
+        pc._EscritorSaida(tmp_path / 'saida.parquet').gravar(pd.DataFrame({'a': [1]}))
+
+
+def test_cli_sem_pyarrow_falha_antes_de_treinar(tmp_path, sem_pyarrow, capsys):
+    with pytest.raises(SystemExit) as saida:
+        pc.main([str(tmp_path / 'cenarios.csv'), str(tmp_path / 'previsoes.parquet')])
+    assert saida.value.code == 2
+    assert 'pip install pyarrow' in capsys.readouterr().err
@@ -0,0 +1,34 @@
+"""ModeloRegularizado: Ridge, Lasso e ElasticNet conferidos com o scikit-learn."""
+import numpy as np
+import pytest
+
+from data_generator import gerar_dados_assistencia
+from model import preparar_features, ModeloRegularizado
+from config import NUM_MESES_HISTORICO
+
+
+@pytest.mark.parametrize('penalidade, l1_ratio', [('ridge', 0.0), ('lasso', 1.0), ('elasticnet', 0.5)])
+@pytest.mark.parametrize('alpha', [1e-3, 1e-2, 1e-1, 1.0])
+def test_coeficientes_iguais_sklearn(penalidade, l1_ratio, alpha, tolerancia=1e-6):
+    """
+    Para alpha fixo, os coeficientes devem coincidir com os do scikit-learn ajustado sobre
+    os mesmos dados centrados no mês (pandas) e padronizados.
+    """
+    from sklearn.linear_model import ElasticNet, Ridge
+
+    df, features = preparar_features(gerar_dados_assistencia(NUM_MESES_HISTORICO))
+    X = df[features] - df.groupby('Mes')[features].transform('mean')
+    y = df['Faturamento'] - df.groupby('Mes')['Faturamento'].transform('mean')
+    escala_X = X.std(ddof=0).to_numpy()
+    escala_y = y.std(ddof=0)
+
+    modelo = ModeloRegularizado(penalidade, alpha=alpha, l1_ratio=l1_ratio)
+    modelo.fit(df[features], df['Faturamento'], df['Mes'])
+    if penalidade == 'ridge':
+        referencia = Ridge(alpha=len(df) * alpha, fit_intercept=False)
+    else:
+        referencia = ElasticNet(alpha=alpha, l1_ratio=l1_ratio, fit_intercept=False, tol=1e-12, max_iter=1_000_000)
+    esperado = referencia.fit(X.to_numpy() / escala_X, y.to_numpy() / escala_y).coef_
+    obtido = modelo.coef_ * escala_X / escala_y
+
+    assert np.max(np.abs(obtido - esperado)) / max(np.max(np.abs(esperado)), 1e-12) <= tolerancia
@@ -0,0 +1,93 @@
+"""Detecção de rupturas: PELT, programação dinâmica em lote e frota conferidos por força bruta."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import changepoint as cp
+from data_generator import gerar_dados_frota
+from config import NUM_MESES_HISTORICO
+
+MIN_TAMANHO = 4
+PENALIDADE = 6.0
+
+
+def _particao_otima_referencia(valores, modelo, min_tamanho, penalidade):
+    """Partição ótima por força bruta: todos os inícios possíveis a cada mês, resíduos por polyfit."""
+    x = valores / np.sqrt(cp.variancia_ruido(valores))
+    n, grau = len(x), cp.MODELOS_SEGMENTO[modelo] - 1
+    custo = np.full(n + 1, np.inf)
+    custo[0] = -penalidade
+    caminho = {0: []}
+    for fim in range(min_tamanho, n + 1):
+        for inicio in [0] + list(range(min_tamanho, fim - min_tamanho + 1)):
+            if not np.isfinite(custo[inicio]):
+                continue
+            t, trecho = np.arange(inicio, fim), x[inicio:fim]
+            residuo = trecho - np.polyval(np.polyfit(t, trecho, grau), t)
+            total = custo[inicio] + residuo @ residuo + penalidade
+            if total < custo[fim] - 1e-9:
+                custo[fim], caminho[fim] = total, caminho[inicio] + [inicio]
+    return caminho[n][1:]
+
+
+@pytest.fixture(scope='module')
+def series(num_series=12, meses=48):
+    rng = np.random.default_rng(7)
+    saltos = np.repeat(rng.normal(0, 3, (num_series, 4)), meses // 4, axis=1)
+    return saltos + np.cumsum(rng.normal(0, 0.3, (num_series, meses)), axis=1) + rng.normal(0, 1, (num_series, meses))
+
+
+@pytest.mark.parametrize('modelo', list(cp.MODELOS_SEGMENTO))
+def test_pelt_e_lote_iguais_forca_bruta(series, modelo):
+    lote = cp.detectar_rupturas_lote(series, modelo, MIN_TAMANHO, PENALIDADE)
+    for i, valores in enumerate(series):
+        pelt = cp.detectar_rupturas(valores, modelo, MIN_TAMANHO, PENALIDADE).tolist()
+        assert pelt == _particao_otima_referencia(valores, modelo, MIN_TAMANHO, PENALIDADE), f'{modelo}/{i}'
+        assert pelt == lote[i].tolist(), f'{modelo}/{i}'
+
+
+@pytest.fixture(scope='module')
+def frota():
+    """Empresa_0002 com histórico curto e salto de 10 pontos na sinistralidade da Empresa_0003 em 01/2024."""
+    frota = gerar_dados_frota(NUM_MESES_HISTORICO, 6)
+    frota = frota[~((frota['Empresa'] == 'Empresa_0002') & (frota.groupby('Empresa').cumcount() < 12))]
+    empresa_3 = frota['Empresa'] == 'Empresa_0003'
+    frota.loc[empresa_3, 'Sinistralidade_Realizada'] += np.where(frota.loc[empresa_3, 'Data'] >= '2024-01-01', 10.0, 0.0)
+    return frota
+
+
+def test_frota_igual_segmentar_serie(frota):
+    sequencial = cp.detectar_rupturas_frota(frota, processos=1)
+    for (empresa, coluna), segmentos in sequencial.groupby(level=['Empresa', 'Coluna'], sort=False):
+        historico = frota[frota['Empresa'] == empresa]
+        esperado = cp.segmentar_serie(historico[coluna], historico['Data'], cp.MODELOS_RUPTURA[coluna])
+        obtido = segmentos.reset_index(drop=True)
+        np.testing.assert_allclose(obtido.drop(columns=['Inicio', 'Fim']).to_numpy(dtype=float),
+                                   esperado.drop(columns=['Inicio', 'Fim']).to_numpy(dtype=float), rtol=1e-9)
+        assert (obtido[['Inicio', 'Fim']].to_numpy() == esperado[['Inicio', 'Fim']].to_numpy()).all()
+
+
+def test_frota_independe_do_numero_de_processos(frota):
+    assert cp.detectar_rupturas_frota(frota, processos=1).equals(cp.detectar_rupturas_frota(frota, processos=2))
+
+
+def test_salto_injetado_detectado(frota):
+    """O salto deve ser encontrado com no máximo um mês de diferença."""
+    segmentos = cp.detectar_rupturas_frota(frota, processos=1).reset_index()
+    ruptura = segmentos.loc[(segmentos['Empresa'] == 'Empresa_0003') & (segmentos['Segmento'] > 0)
+                            & (segmentos['Coluna'] == 'Sinistralidade_Realizada'), 'Inicio']
+    assert any(abs((data - pd.Timestamp('2024-01-01')).days) <= 31 for data in ruptura)
+
+
+@pytest.mark.parametrize('renderizacao, tipo', [('svg', 'scatter'), ('webgl', 'scattergl')])
+def test_regimes_no_grafico_com_a_mesma_classe_de_traco(frota, renderizacao, tipo):
+    """O nível por regime segue o modo de renderização do resto do gráfico de sinistralidade."""
+    from visualizations import criar_grafico_sinistralidade
+
+    historico = frota[frota['Empresa'] == 'Empresa_0003']
+    rupturas = cp.segmentar_serie(historico['Sinistralidade_Realizada'], historico['Data'],
+                                  cp.MODELOS_RUPTURA['Sinistralidade_Realizada'])
+    fig = criar_grafico_sinistralidade(historico, renderizacao, rupturas=rupturas)
+
+    assert len(rupturas) > 1 and len(fig.data) == 3
+    assert {trace.type for trace in fig.data} == {tipo}
@@ -0,0 +1,57 @@
+"""Seleção de features: branch-and-bound e buscas passo a passo conferidos por força bruta."""
+import itertools
+
+import numpy as np
+import pytest
+
+from data_generator import gerar_dados_assistencia
+from model import preparar_candidatos, ModeloInterceptoMensal
+from feature_selection import sistema_normal, busca_forward, busca_backward, busca_exaustiva, selecionar_features
+from config import NUM_MESES_HISTORICO, OBSERVACOES_POR_FEATURE_SELECAO
+
+MAX_FEATURES = 3
+
+
+@pytest.fixture(scope='module')
+def sistema():
+    df_modelo, candidatas = preparar_candidatos(gerar_dados_assistencia(NUM_MESES_HISTORICO))
+    treino = df_modelo.iloc[:len(df_modelo) - int(np.ceil(0.2 * len(df_modelo)))]
+    gram, correlacao, soma_quadrados, _ = sistema_normal(
+        treino[candidatas].to_numpy(), treino['Faturamento'].to_numpy(), treino['Mes'].to_numpy()
+    )
+
+    def rss(indices):
+        modelo = ModeloInterceptoMensal().fit(treino[[candidatas[j] for j in indices]], treino['Faturamento'], treino['Mes'])
+        return float(np.sum((treino['Faturamento'] - modelo.predict(treino)) ** 2))
+
+    return gram, correlacao, soma_quadrados, rss, len(candidatas)
+
+
+def test_busca_exaustiva_igual_forca_bruta(sistema, tolerancia=1e-8):
+    """O branch-and-bound deve achar o mesmo RSS mínimo de cada tamanho que lstsq em todos os subconjuntos."""
+    gram, correlacao, soma_quadrados, rss, num_candidatas = sistema
+    exaustiva, _ = busca_exaustiva(gram, correlacao, soma_quadrados, MAX_FEATURES)
+    for tamanho in range(1, MAX_FEATURES + 1):
+        forca_bruta = min(rss(indices) for indices in itertools.combinations(range(num_candidatas), tamanho))
+        assert exaustiva[tamanho][1] == pytest.approx(forca_bruta, rel=tolerancia)
+
+
+@pytest.mark.parametrize('busca', [busca_forward, busca_backward])
+def test_rss_passo_a_passo_igual_reajuste(sistema, busca, tolerancia=1e-8):
+    """Os RSS atualizados a cada passo devem coincidir com reajustar cada subconjunto do caminho."""
+    gram, correlacao, soma_quadrados, rss, _ = sistema
+    caminho, _ = busca(gram, correlacao, soma_quadrados, 2 * MAX_FEATURES)
+    for indices, valor in caminho[1:]:
+        assert valor == pytest.approx(rss(list(indices)), rel=tolerancia)
+
+
+@pytest.mark.parametrize('metodo', ['forward', 'backward'])
+@pytest.mark.parametrize('max_features', [None, 100])
+def test_tamanho_limitado_longe_da_saturacao(metodo, max_features):
+    """Sem limite explícito, os subconjuntos param em (n_treino - 12 interceptos) / OBSERVACOES_POR_FEATURE_SELECAO."""
+    df = gerar_dados_assistencia(NUM_MESES_HISTORICO)
+    df_modelo, _ = preparar_candidatos(df)
+    n_treino = len(df_modelo) - int(np.ceil(0.2 * len(df_modelo)))
+    resultado = selecionar_features(df, metodo, max_features=max_features)
+
+    assert resultado['caminho']['Num_Features'].max() == (n_treino - 12) // OBSERVACOES_POR_FEATURE_SELECAO
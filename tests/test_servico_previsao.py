@@ -0,0 +1,82 @@
+"""Serviço de previsões: entrada inválida vira 400, falha inesperada vira 500 e caminhos
+desconhecidos não multiplicam as chaves de latência."""
+import asyncio
+import json
+
+import pytest
+
+from gerador_carga import _ler_resposta
+from servico_previsao import carregar_servico
+from config import FEATURES_MODELO
+
+
+@pytest.fixture(scope='module')
+def servico():
+    return carregar_servico()
+
+
+@pytest.fixture(scope='module')
+def cenario():
+    cenario = {f: 1.0 for f in FEATURES_MODELO}
+    cenario['mes_prev'] = 7
+    return cenario
+
+
+def _requisitar(servico, corpos, caminho='/previsao'):
+    """Envia os corpos em uma conexão keep-alive e devolve [(status, resposta)]."""
+    async def _conversar():
+        servico.agendador.iniciar()
+        servidor = await asyncio.start_server(servico._tratar_conexao, '127.0.0.1', 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+        respostas = []
+        try:
+            for corpo in corpos:
+                dados = corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode('utf-8')
+                writer.write(f'POST {caminho} HTTP/1.1\r\nContent-Length: {len(dados)}\r\n\r\n'.encode('latin-1') + dados)
+                await writer.drain()
+                status, resposta = await _ler_resposta(reader)
+                respostas.append((status, json.loads(resposta)))
+        finally:
+            writer.close()
+            servidor.close()
+            await servico.agendador.parar()
+        return respostas
+    return asyncio.run(_conversar())
+
+
+def test_entradas_invalidas_recebem_400(servico, cenario):
+    corpos = [{**cenario, 'mes_prev': 13}, {**cenario, 'mes_prev': 0}, {**cenario, 'NPS': 'alto'},
+              5, [], [cenario, [1, 2]], b'{', cenario]
+    respostas = _requisitar(servico, corpos)
+
+    assert [status for status, _ in respostas] == [400] * 7 + [200]
+    assert 'mes_prev' in respostas[0][1]['erro']
+    assert 'faturamento_previsto' in respostas[-1][1]
+
+
+def test_falha_inesperada_recebe_500_e_conexao_continua(servico, cenario, monkeypatch):
+    original = servico._rotear
+    chamadas = []
+
+    async def _rotear_falho(metodo, caminho, corpo):
+        chamadas.append(caminho)
+        if len(chamadas) == 1:
+            raise RuntimeError('falha simulada')
+        return await original(metodo, caminho, corpo)
+
+    monkeypatch.setattr(servico, '_rotear', _rotear_falho)
+    respostas = _requisitar(servico, [cenario, cenario])
+
+    assert respostas[0][0] == 500 and 'falha simulada' in respostas[0][1]['erro']
+    assert respostas[1][0] == 200
+
+
+def test_caminhos_desconhecidos_dividem_uma_chave_de_latencia(servico, cenario):
+    for i in range(5):
+        assert _requisitar(servico, [cenario], caminho=f'/inexistente/{i}')[0][0] == 404
+    _requisitar(servico, [cenario])
+
+    rotas = servico.metricas()['rotas']
+    assert set(rotas) <= {'/previsao', '<desconhecido>'}
+    assert rotas['<desconhecido>']['amostras'] >= 5
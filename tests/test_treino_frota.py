@@ -0,0 +1,19 @@
+"""treinar_frota: treino em lote igual ao treino empresa a empresa."""
+import numpy as np
+
+from data_generator import gerar_dados_frota
+from model import treinar_modelo, treinar_frota
+from config import NUM_MESES_HISTORICO
+
+
+def test_treino_frota_igual_por_empresa(tolerancia=1e-8, num_empresas=20):
+    """Coeficientes, interceptos por mês e métricas de cada empresa devem reproduzir treinar_modelo."""
+    frota = gerar_dados_frota(NUM_MESES_HISTORICO, num_empresas)
+    modelos, _, metricas = treinar_frota(frota)
+    for empresa, df in frota.groupby('Empresa'):
+        modelo, _, esperadas, *_ = treinar_modelo(df.drop(columns='Empresa').reset_index(drop=True), penalidade='ols')
+        pares = [(modelos[empresa].coef_, modelo.coef_), (modelos[empresa].interceptos_mes_, modelo.interceptos_mes_)]
+        pares += [(metricas.loc[empresa, nome], valor) for nome, valor in esperadas.items()]
+        for obtido, esperado in pares:
+            desvio = np.max(np.abs(np.asarray(obtido) - esperado) / np.maximum(np.abs(esperado), 1e-12))
+            assert desvio <= tolerancia, empresa
@@ -0,0 +1,51 @@
+"""Memória de sessão dos apps e a assinatura de argumentos que decide quando ela vale."""
+import streamlit
+
+from data_generator import gerar_dados_assistencia
+from utils import assinatura_valor, memo_sessao
+
+
+def test_mesmo_conteudo_mesma_assinatura():
+    """Dados regenerados com os mesmos valores (outra cópia) não invalidam a memória."""
+    dados = gerar_dados_assistencia(48)
+    assert assinatura_valor((dados, ['NPS'])) == assinatura_valor((dados.copy(), ['NPS']))
+    assert assinatura_valor(dados['NPS'].to_numpy()) == assinatura_valor(dados['NPS'].to_numpy().copy())
+
+
+def test_conteudo_diferente_muda_assinatura():
+    dados = gerar_dados_assistencia(48)
+    alterados = dados.copy()
+    alterados.loc[alterados.index[-1], 'Faturamento'] += 1
+    valores = dados['NPS'].to_numpy()
+
+    assert assinatura_valor(dados) != assinatura_valor(alterados)
+    assert assinatura_valor(dados) != assinatura_valor(gerar_dados_assistencia(60))
+    assert assinatura_valor(valores) != assinatura_valor(valores[:-1])
+    assert assinatura_valor({'tipo': 'faturamento'}) != assinatura_valor({'tipo': 'atendimentos'})
+
+
+def test_objetos_sem_hash_pela_identidade():
+    class Modelo:
+        __hash__ = None
+
+    modelo = Modelo()
+    assert assinatura_valor(modelo) == assinatura_valor(modelo)
+    assert assinatura_valor(modelo) != assinatura_valor(Modelo())
+    assert assinatura_valor(1.5) == 1.5
+
+
+def test_memo_sessao_recalcula_so_com_argumentos_novos(monkeypatch):
+    monkeypatch.setattr(streamlit, 'session_state', {})
+    chamadas = []
+
+    def somar(dados, coluna):
+        chamadas.append(coluna)
+        return dados[coluna].sum()
+
+    dados = gerar_dados_assistencia(48)
+    total = memo_sessao('total', somar, dados, 'NPS')
+    assert memo_sessao('total', somar, dados.copy(), 'NPS') == total
+    assert chamadas == ['NPS']
+
+    memo_sessao('total', somar, dados, coluna='Faturamento')
+    assert chamadas == ['NPS', 'Faturamento']
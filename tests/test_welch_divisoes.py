@@ -0,0 +1,27 @@
+"""Teste de Welch por somas acumuladas em todas as divisões e janelas."""
+import numpy as np
+import pytest
+
+import statistical_analysis as sa
+from data_generator import gerar_dados_assistencia
+from config import NUM_MESES_HISTORICO
+
+
+@pytest.mark.parametrize('janela', [None, 3, 7, 24])
+def test_welch_igual_ttest_ind(janela, tolerancia=1e-9):
+    """Deve reproduzir scipy.stats.ttest_ind(equal_var=False) chamado comparação a comparação."""
+    from scipy import stats
+
+    valores = gerar_dados_assistencia(NUM_MESES_HISTORICO)['Faturamento'].to_numpy()
+    resultado = sa.teste_welch_divisoes(valores, None if janela is None else [janela])
+    for coluna, divisao in enumerate(resultado['divisao']):
+        inicio = 0 if janela is None else divisao - janela
+        fim = len(valores) if janela is None else divisao + janela
+        t_obtido = np.ravel(resultado['t_statistic'])[coluna]
+        p_obtido = np.ravel(resultado['p_value'])[coluna]
+        if inicio < 0 or fim > len(valores):
+            assert np.isnan(t_obtido) and np.isnan(p_obtido), f'divisão {divisao}: esperado NaN fora da série'
+            continue
+        t_esperado, p_esperado = stats.ttest_ind(valores[divisao:fim], valores[inicio:divisao], equal_var=False)
+        assert t_obtido == pytest.approx(t_esperado, rel=tolerancia)
+        assert p_obtido == pytest.approx(p_esperado, rel=tolerancia)